@@ -36,7 +36,8 @@ async def run_pipeline(user_messages: list[str]) -> dict[str, Any]:
 
     state = SessionState()
     # Simulate Intake phase: we already have final user messages, so we store transcript.
-    state.transcript = [{"role": "user", "content": m} for m in user_messages]
+    for m in user_messages:
+        state.add_user_message(m)
 
     # 1. Parser agent – build intake_json from transcript
     parser_out = await collect_context(messages=state.transcript)
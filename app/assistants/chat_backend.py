@@ -0,0 +1,133 @@
+"""Chat Completions backend for :class:`OrchestratorAssistant`.
+
+The Assistants API needs at least three sequential round trips per turn
+(``messages.create``, ``runs.create`` plus ``runs.poll`` with its delay, and
+``messages.list``) and two more per tool round.  This backend sends the
+locally held transcript (``SessionState.transcript``) plus the same
+``get_tools()`` schemas in **one streaming** ``chat.completions.create``
+request per step and assembles the text and tool calls from the deltas.
+
+Select it per deployment with ``ORCHESTRATOR_BACKEND=chat`` (default
+``assistants``).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+import os
+from typing import Any
+
+from app.assistants.tokens import PhaseBudget, count_tool_tokens, fit_messages
+
+BACKEND_ASSISTANTS = "assistants"
+BACKEND_CHAT = "chat"
+BACKENDS = (BACKEND_ASSISTANTS, BACKEND_CHAT)
+
+OnDelta = Callable[[str], Awaitable[None]]
+
+
+def default_backend() -> str:
+    """Return the backend selected by ``ORCHESTRATOR_BACKEND``.
+
+    Raises:
+        ValueError: For an unknown backend name
+    """
+
+    backend = os.getenv("ORCHESTRATOR_BACKEND", BACKEND_ASSISTANTS).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown ORCHESTRATOR_BACKEND: {backend!r}")
+    return backend
+
+
+@dataclass
+class ChatStep:
+    """Result of one streamed completion."""
+
+    content: str = ""
+    tool_calls: list[dict[str, Any]] = field(default_factory=list)
+    finish_reason: str | None = None
+    usage: Any = None
+
+
+def build_messages(
+    instructions: str,
+    transcript: Sequence[dict[str, Any]],
+    budget: PhaseBudget,
+    tools: Sequence[dict[str, Any]] = (),
+) -> list[dict[str, Any]]:
+    """Return the request messages: instructions plus the transcript, fitted to *budget*.
+
+    The *tools* sent with the request count against the same input budget.
+    """
+
+    messages = fit_messages(
+        [{"role": "system", "content": instructions}, *transcript],
+        budget.max_input_tokens - count_tool_tokens(tools),
+        call="chat_orchestrator",
+    )
+    # Trimming may cut between an assistant tool call and its results; a
+    # ``tool`` message without the preceding call is rejected by the API.
+    head = 0
+    while head < len(messages) and messages[head]["role"] == "system":
+        head += 1
+    end = head
+    while end < len(messages) and messages[end]["role"] == "tool":
+        end += 1
+    return messages[:head] + messages[end:]
+
+
+async def stream_step(
+    client: Any,
+    *,
+    model: str,
+    messages: list[dict[str, Any]],
+    tools: list[dict[str, Any]],
+    max_tokens: int,
+    on_delta: OnDelta | None = None,
+) -> ChatStep:
+    """Run one streaming completion and collect its text and tool calls.
+
+    Text deltas are forwarded to *on_delta* as they arrive, so a caller can
+    stream them to the user before the step finishes.
+    """
+
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        tools=tools,
+        max_tokens=max_tokens,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    step = ChatStep()
+    parts: list[str] = []
+    calls: dict[int, dict[str, Any]] = {}
+    async for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            step.usage = chunk.usage
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        delta = choice.delta
+        if delta.content:
+            parts.append(delta.content)
+            if on_delta is not None:
+                await on_delta(delta.content)
+        for tc in delta.tool_calls or ():
+            call = calls.setdefault(tc.index, {"id": "", "name": "", "arguments": []})
+            if tc.id:
+                call["id"] = tc.id
+            if tc.function is not None:
+                if tc.function.name:
+                    call["name"] += tc.function.name
+                if tc.function.arguments:
+                    call["arguments"].append(tc.function.arguments)
+        if choice.finish_reason:
+            step.finish_reason = choice.finish_reason
+    step.content = "".join(parts)
+    step.tool_calls = [
+        {"id": c["id"], "name": c["name"], "arguments": "".join(c["arguments"])}
+        for _, c in sorted(calls.items())
+    ]
+    return step
@@ -3,13 +3,36 @@
 Each function *name* must match the registration in the published Assistant.
 They are regular async callables so they can be imported by both the OpenAI
 runtime and our internal unit tests.
+
+Exports are resolved lazily on first attribute access: importing the package
+does not pull in ReportLab, Google Cloud Storage or the language-detection
+stack until the corresponding tool is actually used.
 """
 
-from .analyse import analyse_and_reframe
-from .collect import collect_context
-from .escalate import escalate_crisis, safe_complete
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+# ``gcs_upload`` shares its name with its submodule, so it is bound eagerly:
+# a lazy export would be shadowed by the submodule attribute the import system
+# sets on the package.  The module itself only imports google-cloud on use.
 from .gcs_upload import gcs_upload
-from .pdf import generate_pdf
+
+if TYPE_CHECKING:
+    from .analyse import analyse_and_reframe
+    from .collect import collect_context
+    from .escalate import escalate_crisis, safe_complete
+    from .pdf import generate_pdf
+
+# Public name → submodule that defines it
+_EXPORTS: dict[str, str] = {
+    "analyse_and_reframe": ".analyse",
+    "collect_context": ".collect",
+    "escalate_crisis": ".escalate",
+    "generate_pdf": ".pdf",
+    "safe_complete": ".escalate",
+}
 
 __all__ = [
     "analyse_and_reframe",
@@ -19,3 +42,17 @@ __all__ = [
     "gcs_upload",
     "safe_complete",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    # Cache on the package so later lookups bypass __getattr__ entirely.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -8,26 +8,21 @@ from __future__ import annotations
 
 import json
 import os
-import re
 from typing import Any
 
 from app.assistants.client import get_openai_client
+from app.assistants.tokens import (
+    DEFAULT_MODEL,
+    budget_for,
+    count_message_tokens,
+    fit_json,
+    log_call,
+)
+from app.core.safety import detect_crisis
+from app.services.tracing.otel import upstream_span
 
-# ---------------------------------------------------------------------------
-# Crisis phrases (same list as SafetyGuard)
-# ---------------------------------------------------------------------------
-
-_CRISIS_PHRASES = [
-    r"kill myself",
-    r"end my life",
-    r"suicide\s*(?:attempt|plan)?",
-    r"self[-\s]?harm",
-    r"me quiero suicidar",
-    r"quiero quitarme la vida",
-    r"no quiero vivir",
-]
-
-_CRISIS_RE = re.compile("|".join(_CRISIS_PHRASES), re.IGNORECASE)
+# Token budget phase of this call (see ``Settings.token_budgets``)
+_PHASE = "analyst_qa"
 
 
 # ---------------------------------------------------------------------------
@@ -50,7 +45,7 @@ async def analyse_and_reframe(
     # 0. Crisis fast-path (FR-5)
     # ---------------------------------------------------------------------
     reason = (intake_json.get("reason") or "").lower()
-    if _CRISIS_RE.search(reason):
+    if detect_crisis(reason):
         return {"crisis": True}
 
     # ---------------------------------------------------------------------
@@ -73,18 +68,30 @@ async def analyse_and_reframe(
                 "certainty_before, certainty_after."
             )
 
-            completion = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                temperature=0.7,
-                messages=[
-                    {"role": "system", "content": sys_prompt},
-                    {
-                        "role": "user",
-                        "content": f"```json\n{json.dumps(intake_json, ensure_ascii=False)}\n```",
-                    },
-                ],
-                max_tokens=300,
+            budget = budget_for(_PHASE)
+            # Cap the intake payload so the whole prompt fits the phase budget.
+            room = budget.max_input_tokens - count_message_tokens(
+                [{"role": "system", "content": sys_prompt}, {"role": "user", "content": "```json\n\n```"}]
             )
+            messages = [
+                {"role": "system", "content": sys_prompt},
+                {"role": "user", "content": f"```json\n{fit_json(intake_json, room)}\n```"},
+            ]
+
+            with upstream_span("openai", "chat.completions", **{"llm.model_name": DEFAULT_MODEL}):
+                completion = await client.chat.completions.create(
+                    model=DEFAULT_MODEL,
+                    temperature=0.7,
+                    messages=messages,
+                    max_tokens=budget.max_output_tokens,
+                )
+                log_call(
+                    "analyse_and_reframe",
+                    phase=_PHASE,
+                    prompt_tokens=count_message_tokens(messages),
+                    max_output_tokens=budget.max_output_tokens,
+                    usage=getattr(completion, "usage", None),
+                )
 
             raw = completion.choices[0].message.content or "{}"
             # The model *should* return JSON but we parse defensively.
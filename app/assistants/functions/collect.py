@@ -4,8 +4,9 @@ The goal is to capture **name**, **age**, and **reason for consulting** in at
 most ``max_turns`` user messages (FR-1).  The function can operate in two
 modes:
 
-1. **Runtime** – OpenAI Assistants passes the current ``thread_id``; we fetch
-   messages via the API.
+1. **Runtime** – OpenAI Assistants passes the current ``thread_id``; new
+   messages are fetched incrementally through a per-thread
+   :class:`~app.assistants.thread_mirror.ThreadMirror`.
 2. **Unit-test** – A list of ``messages`` can be injected directly to avoid
    network calls.
 """
@@ -16,7 +17,10 @@ import re
 from typing import Any
 
 from app.assistants.client import get_openai_client
-from app.callbacks.lang_detect import LangCallback
+from app.assistants.thread_mirror import get_thread_mirror
+from app.assistants.tokens import budget_for, fit_messages
+from app.core.lang import detect_lang
+from app.core.safety import CRISIS_RE
 
 # ---------------------------------------------------------------------------
 # Regex helpers
@@ -27,21 +31,6 @@ _NAME_RE = re.compile(r"\b(?:my name is|me llamo|i am|soy)\s+([A-ZÁÉÍÓÚÑ][
 
 _AGE_RE = re.compile(r"\b(\d{1,3})\s*(?:years?\s*old|yo|años?)", re.IGNORECASE)
 
-# A *very* broad crisis phrase detector (re-uses the same phrases as
-# SafetyGuard but without ADK dependencies).
-
-_CRISIS_PHRASES = [
-    r"kill myself",
-    r"end my life",
-    r"suicide\s*(?:attempt|plan)?",
-    r"self[-\s]?harm",
-    r"me quiero suicidar",
-    r"quiero quitarme la vida",
-    r"no quiero vivir",
-]
-
-_CRISIS_RE = re.compile("|".join(_CRISIS_PHRASES), re.IGNORECASE)
-
 
 # ---------------------------------------------------------------------------
 # Public entry-point
@@ -76,13 +65,16 @@ async def collect_context(
         if thread_id is None:
             raise ValueError("Either `thread_id` or `messages` must be provided")
 
-        client = get_openai_client()
-        # We request in ascending order so the first element is the earliest.
-        resp = await client.beta.threads.messages.list(thread_id, order="asc")
-        messages = [m.model_dump() for m in resp.data]  # type: ignore[attr-defined]
+        # The mirror only downloads messages added since the previous turn;
+        # records are oldest first.
+        messages = await get_thread_mirror(thread_id).fetch(get_openai_client())
 
-    # Keep only *user* messages (role=="user") and trim to the last max_turns
+    # Keep only *user* messages (role=="user") and trim to the last max_turns,
+    # then to the intake token budget (oldest dropped first, no summary).
     user_msgs = [m for m in messages if m.get("role") == "user"][-max_turns:]
+    user_msgs = fit_messages(
+        user_msgs, budget_for("intake").max_input_tokens, summary_tokens=0, call="collect_context"
+    )
 
     # Intake fields (see design.md §C)
     trigger_situation: str | None = None
@@ -168,9 +160,9 @@ async def collect_context(
     # ---------------------------------------------------------------------
     # 3. Detect language + crisis phrases
     # ---------------------------------------------------------------------
-    lang = LangCallback._detect_lang(" ".join(_normalise(m) for m in user_msgs))  # type: ignore
+    lang = detect_lang(" ".join(_normalise(m) for m in user_msgs))
 
-    crisis_detected = any(_CRISIS_RE.search(_normalise(m)) for m in user_msgs)
+    crisis_detected = any(CRISIS_RE.search(_normalise(m)) for m in user_msgs)
 
     # ---------------------------------------------------------------------
     # 4. Produce response
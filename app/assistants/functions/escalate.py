@@ -1,18 +1,14 @@
 """escalate_crisis – safe-completion function.
 
 Returns the Spanish crisis hotline and EU emergency number.  The text mirrors
-`SafetyGuard`.
+`SafetyGuard` (both come from :mod:`app.core.safety`).
 """
 
 from __future__ import annotations
 
-_CRISIS_MSG = (
-    "Parece que estás pasando por un momento muy difícil y podrías estar pensando en hacerte daño. "
-    "Por favor, llama inmediatamente al **024** (línea de ayuda en España, 24 h, gratuita) o al "
-    "**112** si tu vida está en peligro. Si te encuentras fuera de España, marca el número de "
-    "emergencias local o consulta https://findahelpline.com. Un profesional se pondrá en contacto "
-    "contigo en breve."
-)
+from typing import Any
+
+from app.core.safety import CRISIS_MESSAGE as _CRISIS_MSG
 
 
 def escalate_crisis(msg: str | None = None) -> dict[str, str | bool]:
@@ -31,8 +27,6 @@ async def safe_complete(reason: str) -> dict[str, Any]:
     Returns:
         Dictionary with crisis detection info and resources
     """
-    from typing import Any
-    
     # Call the original escalate_crisis function
     crisis_result = escalate_crisis(reason)
     
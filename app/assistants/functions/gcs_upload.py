@@ -5,10 +5,13 @@ from __future__ import annotations
 import base64
 import os
 from datetime import datetime
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
-from google.cloud import storage
-from google.oauth2 import service_account
+from app.services.tracing.otel import upstream_span
+
+if TYPE_CHECKING:
+    from google.cloud import storage
 
 
 # GCS Configuration from Team β
@@ -17,6 +20,15 @@ GCS_PROJECT_ID = "macayaven"
 GCS_SERVICE_ACCOUNT_EMAIL = "reframe-edge-sa@macayaven.iam.gserviceaccount.com"
 
 
+@lru_cache(maxsize=1)
+def get_storage_client() -> storage.Client:
+    """Return a memoised GCS client so uploads reuse its connection pool."""
+    # Imported here so loading the tool package does not pull in google-cloud.
+    from google.cloud import storage
+
+    return storage.Client(project=GCS_PROJECT_ID)
+
+
 async def gcs_upload(
     pdf_base64: str,
     filename: str,
@@ -47,10 +59,9 @@ async def gcs_upload(
         # Decode base64 PDF
         pdf_bytes = base64.b64decode(pdf_base64)
         
-        # Initialize GCS client
         # In production, credentials would be provided via environment
         # For now, we'll use default credentials
-        client = storage.Client(project=GCS_PROJECT_ID)
+        client = get_storage_client()
         bucket = client.bucket(GCS_BUCKET_NAME)
         
         # Generate unique filename with timestamp
@@ -59,10 +70,12 @@ async def gcs_upload(
         
         # Create blob and upload
         blob = bucket.blob(unique_filename)
-        blob.upload_from_string(pdf_bytes, content_type="application/pdf")
+        with upstream_span("gcs", "upload", **{"gcs.bucket": GCS_BUCKET_NAME, "gcs.bytes": len(pdf_bytes)}):
+            blob.upload_from_string(pdf_bytes, content_type="application/pdf")
         
         # Make the blob publicly readable
-        blob.make_public()
+        with upstream_span("gcs", "make_public", **{"gcs.bucket": GCS_BUCKET_NAME}):
+            blob.make_public()
         
         # Return public URL
         public_url = blob.public_url
@@ -8,8 +8,11 @@ from __future__ import annotations
 from datetime import datetime
 import json
 import os
+import time
 from typing import Any
 
+from app.services.metrics.registry import REGISTRY
+from app.services.tracing.otel import span, upstream_span
 from app.tools.pdf_generator import build_pdf_bytes
 
 try:
@@ -25,6 +28,24 @@ BUCKET_NAME = os.environ.get("GCS_BUCKET_NAME", "reframe-apd-pdf")
 PROJECT_ID = os.environ.get("GCS_PROJECT_ID", "macayaven")
 SECRET_NAME = os.environ.get("GCS_SERVICE_ACCOUNT_SECRET", "reframe-edge-sa-key")
 
+_RENDER_SECONDS = REGISTRY.histogram("pdf_render_seconds", "Time to render a summary PDF")
+_PDF_BYTES = REGISTRY.histogram(
+    "pdf_size_bytes",
+    "Size of rendered summary PDFs",
+    buckets=(4_096, 8_192, 16_384, 32_768, 65_536, 131_072, 262_144, 524_288, 1_048_576),
+)
+
+
+def _render(intake_data: dict[str, Any], analysis_output: str) -> bytes:
+    """``build_pdf_bytes`` with render time and size recorded."""
+
+    start = time.perf_counter()
+    with span("pdf.render"):
+        pdf_bytes = build_pdf_bytes(intake_data=intake_data, analysis_output=analysis_output)
+    _RENDER_SECONDS.observe(time.perf_counter() - start)
+    _PDF_BYTES.observe(len(pdf_bytes))
+    return pdf_bytes
+
 
 def _get_gcs_client():  # pragma: no cover – GCS client setup
     if storage is None or service_account is None or secretmanager is None:
@@ -56,10 +77,7 @@ def generate_pdf_legacy(session_dict: dict[str, Any]) -> dict[str, str]:
         Dict containing at least ``intake_data`` and ``analysis_output``.
     """
 
-    pdf_bytes = build_pdf_bytes(
-        intake_data=session_dict.get("intake_data", {}),
-        analysis_output=session_dict.get("analysis_output", ""),
-    )
+    pdf_bytes = _render(session_dict.get("intake_data", {}), session_dict.get("analysis_output", ""))
 
     # Upload to Google Cloud Storage (or gracefully fall back to data URL)
     public_url: str
@@ -74,7 +92,8 @@ def generate_pdf_legacy(session_dict: dict[str, Any]) -> dict[str, str]:
 
             # Upload the PDF
             blob = bucket.blob(filename)
-            blob.upload_from_string(pdf_bytes, content_type="application/pdf")
+            with upstream_span("gcs", "upload", **{"gcs.bucket": BUCKET_NAME, "gcs.bytes": len(pdf_bytes)}):
+                blob.upload_from_string(pdf_bytes, content_type="application/pdf")
 
             # Generate a signed URL valid for 7 days
             from datetime import timedelta
@@ -114,10 +133,7 @@ async def generate_pdf(context: dict[str, Any], analysis: dict[str, Any]) -> dic
         "analysis_output": analysis.get("analysis", "")
     }
     
-    pdf_bytes = build_pdf_bytes(
-        intake_data=context,
-        analysis_output=analysis.get("analysis", ""),
-    )
+    pdf_bytes = _render(context, analysis.get("analysis", ""))
     
     # Generate filename
     name = context.get("name", "usuario").lower().replace(" ", "_")
@@ -4,37 +4,128 @@ from __future__ import annotations
 
 import json
 import logging
-import os
+import time
 from typing import Any
 
 from openai import AsyncOpenAI
 
+from app.assistants.chat_backend import (
+    BACKEND_CHAT,
+    BACKENDS,
+    ChatStep,
+    OnDelta,
+    build_messages,
+    default_backend,
+    stream_step,
+)
+from app.assistants.client import get_openai_client
 from app.assistants.state import Phase, SessionState, get_next_phase
 from app.assistants.stubs import OrchestratorStubs
+from app.assistants.thread_pool import get_thread_pool
+from app.assistants.tokens import (
+    budget_for,
+    count_message_tokens,
+    count_tokens,
+    count_tool_tokens,
+    log_call,
+)
+from app.assistants.usage import UsageLedger, charge
+from app.core.transcript import ROLE_ASSISTANT, ROLE_TOOL, CompactTranscript
+from app.services.metrics.registry import REGISTRY
+from app.services.tracing.otel import span, upstream_span
 
 logger = logging.getLogger(__name__)
 
+# Bumped whenever the layout returned by ``OrchestratorAssistant.snapshot`` changes
+SNAPSHOT_VERSION = 1
+
+ORCHESTRATOR_MODEL = "gpt-4o-mini"
+ORCHESTRATOR_INSTRUCTIONS = """You are a supportive mental health assistant helping users with Avoidant Personality Disorder (AvPD).
+Your role is to:
+1. Collect user information (name, age, reason for seeking help)
+2. Check for crisis situations and provide resources if needed
+3. Perform cognitive reframing analysis
+4. Offer to generate a PDF summary
+5. Upload the PDF if accepted
+
+Always respond in Spanish unless the user writes in English.
+Be empathetic, supportive, and non-judgmental."""
+
+_STEP_SECONDS = REGISTRY.histogram(
+    "orchestrator_step_seconds",
+    "Latency of one LLM orchestration step (user turn or tool-output round)",
+    labels=("backend", "step"),
+)
+_PHASE_SECONDS = REGISTRY.histogram(
+    "orchestrator_phase_seconds", "Latency of one decide_next_action step by starting phase", labels=("phase",)
+)
+_TOOL_SECONDS = REGISTRY.histogram("tool_seconds", "Tool execution latency", labels=("tool",))
+_CRISIS = REGISTRY.counter("crisis_escalations_total", "Turns routed to the crisis path (safe_complete)")
+_INCOMPLETE = REGISTRY.counter(
+    "orchestrator_incomplete_total", "LLM steps cut short by a token limit", labels=("backend", "reason")
+)
+
+# A chat step whose tool call hit the phase's output cap is retried once with this much more room
+_LENGTH_RETRY_FACTOR = 4
+
+# Run states the Assistants API reports before a run needs us or finishes
+_PENDING_RUN_STATUSES = frozenset({"queued", "in_progress", "cancelling"})
+
 
 class OrchestratorAssistant:
     """Manages conversation flow through different phases."""
 
-    def __init__(self, use_stubs: bool = False, openai_client: AsyncOpenAI | None = None):
+    def __init__(
+        self,
+        use_stubs: bool = False,
+        openai_client: AsyncOpenAI | None = None,
+        backend: str | None = None,
+    ):
         """Initialize the orchestrator.
         
         Args:
             use_stubs: If True, use offline stubs instead of real tools
             openai_client: Optional OpenAI client instance
+            backend: ``"assistants"`` or ``"chat"``; defaults to ``ORCHESTRATOR_BACKEND``
         """
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(f"Unknown orchestrator backend: {backend!r}")
+        self.backend = backend or default_backend()
         self.current_phase = Phase.S0_START
         self.session_state = SessionState()
         self.tool_results: dict[str, Any] = {}
         self.use_stubs = use_stubs
-        self.openai_client = openai_client or AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Share the process-wide client so every session reuses one connection pool.
+        self.openai_client = openai_client or get_openai_client()
         self.assistant_id: str | None = None
         self.thread_id: str | None = None
+        # Tokens and estimated cost of every OpenAI call made for this session
+        self.usage = UsageLedger()
 
     async def decide_next_action(self, user_message: str | None = None) -> dict[str, Any]:
         """Decide what action to take based on current state and user input.
+
+        Traced as one ``orchestrator.phase`` span per step; see :meth:`_decide_next_action`.
+        """
+        phase = self.current_phase.value
+        start = time.perf_counter()
+        with span("orchestrator.phase", phase=phase) as current:
+            try:
+                action = await self._decide_next_action(user_message)
+            finally:
+                _PHASE_SECONDS.labels(phase).observe(time.perf_counter() - start)
+            current.set_attribute("phase.next", self.current_phase.value)
+            current.set_attribute("action", action["action"])
+            if action["action"] == "tool_call":
+                current.set_attribute("tool.name", action["tool"])
+                if action["tool"] == "safe_complete":
+                    # Crisis path to S7_DONE: always exported by the tail sampler.
+                    current.set_attribute("session.crisis", True)
+                    _CRISIS.inc()
+            return action
+
+    async def _decide_next_action(self, user_message: str | None = None) -> dict[str, Any]:
+        """Decide what action to take based on current state and user input.
         
         Args:
             user_message: Optional user message input
@@ -176,6 +267,21 @@ class OrchestratorAssistant:
             "message": "Disculpa, no entendí. ¿Podrías repetir?"
         }
 
+    async def respond(self, user_message: str | None = None) -> dict[str, Any]:
+        """Advance the session for one incoming message, running any tool calls.
+
+        Args:
+            user_message: Optional user message input
+
+        Returns:
+            The first non-tool action (normally ``{"action": "message", ...}``)
+        """
+        action = await self.decide_next_action(user_message)
+        while action["action"] == "tool_call":
+            await self.execute_tool_with_stubs(action["tool"], action["arguments"])
+            action = await self.decide_next_action()
+        return action
+
     def process_tool_result(self, tool_name: str, result: Any) -> None:
         """Process the result from a tool call.
         
@@ -347,6 +453,55 @@ class OrchestratorAssistant:
             }
         ]
 
+    def snapshot(self) -> dict[str, Any]:
+        """Return the resumable state of this session as plain JSON-able data.
+
+        The OpenAI client and ``use_stubs`` are deployment settings rather
+        than session state and are supplied again on :meth:`restore`.
+        """
+        state = self.session_state
+        return {
+            "v": SNAPSHOT_VERSION,
+            "phase": self.current_phase.value,
+            "transcript": state.transcript.rows(),
+            "intake_json": state.intake_json,
+            "reframe_json": state.reframe_json,
+            "tool_results": dict(self.tool_results),
+            "assistant_id": self.assistant_id,
+            "thread_id": self.thread_id,
+            "usage": self.usage.to_dict(),
+        }
+
+    @classmethod
+    def restore(
+        cls,
+        data: dict[str, Any],
+        use_stubs: bool = False,
+        openai_client: AsyncOpenAI | None = None,
+    ) -> OrchestratorAssistant:
+        """Rebuild an orchestrator from a :meth:`snapshot` payload.
+
+        Raises:
+            ValueError: If the payload was written by an incompatible version
+        """
+        if data.get("v") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported orchestrator snapshot version: {data.get('v')!r}")
+
+        orchestrator = cls(use_stubs=use_stubs, openai_client=openai_client)
+        transcript = CompactTranscript()
+        transcript.extend_rows(data["transcript"])
+        orchestrator.current_phase = Phase(data["phase"])
+        orchestrator.session_state = SessionState(
+            transcript=transcript,
+            intake_json=data.get("intake_json"),
+            reframe_json=data.get("reframe_json"),
+        )
+        orchestrator.tool_results = dict(data.get("tool_results") or {})
+        orchestrator.assistant_id = data.get("assistant_id")
+        orchestrator.thread_id = data.get("thread_id")
+        orchestrator.usage = UsageLedger.from_dict(data.get("usage"))
+        return orchestrator
+
     def reset(self) -> None:
         """Reset the orchestrator to initial state."""
         self.current_phase = Phase.S0_START
@@ -363,6 +518,15 @@ class OrchestratorAssistant:
         Returns:
             Tool execution result
         """
+        with span(f"tool.{tool_name}", **{"tool.name": tool_name, "tool.stub": self.use_stubs}):
+            start = time.perf_counter()
+            try:
+                with charge(self.usage, tool_name):
+                    return await self._execute_tool(tool_name, arguments)
+            finally:
+                _TOOL_SECONDS.labels(tool_name).observe(time.perf_counter() - start)
+
+    async def _execute_tool(self, tool_name: str, arguments: dict[str, Any]) -> dict[str, Any]:
         if self.use_stubs:
             result = await OrchestratorStubs.execute_tool(tool_name, arguments, self.session_state)
             self.process_tool_result(tool_name, result)
@@ -372,8 +536,8 @@ class OrchestratorAssistant:
         from app.assistants.functions import (
             analyse_and_reframe,
             collect_context,
-            generate_pdf,
             gcs_upload,
+            generate_pdf,
             safe_complete,
         )
         
@@ -407,43 +571,154 @@ class OrchestratorAssistant:
         Returns:
             Assistant ID
         """
-        assistant = await self.openai_client.beta.assistants.create(
-            name="Reframe APD Orchestrator",
-            instructions="""You are a supportive mental health assistant helping users with Avoidant Personality Disorder (AvPD).
-            Your role is to:
-            1. Collect user information (name, age, reason for seeking help)
-            2. Check for crisis situations and provide resources if needed
-            3. Perform cognitive reframing analysis
-            4. Offer to generate a PDF summary
-            5. Upload the PDF if accepted
-            
-            Always respond in Spanish unless the user writes in English.
-            Be empathetic, supportive, and non-judgmental.""",
-            model="gpt-4o-mini",
-            tools=self.get_tools()
-        )
+        with upstream_span("openai", "assistants.create"):
+            assistant = await self.openai_client.beta.assistants.create(
+                name="Reframe APD Orchestrator",
+                instructions=ORCHESTRATOR_INSTRUCTIONS,
+                model=ORCHESTRATOR_MODEL,
+                tools=self.get_tools()
+            )
         self.assistant_id = assistant.id
         return assistant.id
 
     async def create_thread(self) -> str:
-        """Create a new conversation thread.
+        """Create a new conversation thread, taking a pre-created one when pooled.
         
         Returns:
             Thread ID
         """
-        thread = await self.openai_client.beta.threads.create()
+        pool = get_thread_pool()
+        if pool is not None and (thread_id := pool.take()) is not None:
+            self.thread_id = thread_id
+            return thread_id
+        with upstream_span("openai", "threads.create"):
+            thread = await self.openai_client.beta.threads.create()
         self.thread_id = thread.id
         return thread.id
 
-    async def run_assistant(self, user_message: str) -> dict[str, Any]:
+    async def run_assistant(self, user_message: str, on_delta: OnDelta | None = None) -> dict[str, Any]:
         """Run the assistant with a user message.
         
         Args:
             user_message: User input message
+            on_delta: Optional coroutine receiving text deltas (``chat`` backend only)
             
         Returns:
             Assistant response or tool call request
         """
+        start = time.perf_counter()
+        try:
+            with charge(self.usage):
+                if self.backend == BACKEND_CHAT:
+                    self.session_state.add_user_message(user_message)
+                    return await self._chat_step("run", on_delta)
+                return await self._assistants_run(user_message)
+        finally:
+            _STEP_SECONDS.labels(self.backend, "run").observe(time.perf_counter() - start)
+
+    async def submit_tool_outputs(
+        self, run_id: str, tool_outputs: list[dict[str, Any]], on_delta: OnDelta | None = None
+    ) -> dict[str, Any]:
+        """Submit tool outputs back to the assistant.
+        
+        Args:
+            run_id: The run ID requiring tool outputs (ignored by the ``chat`` backend)
+            tool_outputs: List of tool outputs with ``tool_call_id`` and ``output`` fields
+            on_delta: Optional coroutine receiving text deltas (``chat`` backend only)
+            
+        Returns:
+            Run result after submitting outputs
+        """
+        start = time.perf_counter()
+        try:
+            with charge(self.usage):
+                if self.backend == BACKEND_CHAT:
+                    for output in tool_outputs:
+                        self.session_state.transcript.append(
+                            ROLE_TOOL, str(output.get("output", "")), tool_call_id=output["tool_call_id"]
+                        )
+                    return await self._chat_step("tool_outputs", on_delta)
+                return await self._assistants_submit(run_id, tool_outputs)
+        finally:
+            _STEP_SECONDS.labels(self.backend, "tool_outputs").observe(time.perf_counter() - start)
+
+    async def _chat_step(self, call: str, on_delta: OnDelta | None) -> dict[str, Any]:
+        """One streaming Chat Completions request over the local transcript."""
+
+        phase = self.current_phase.value
+        budget = budget_for(phase)
+        tools = self.get_tools()
+        messages = build_messages(ORCHESTRATOR_INSTRUCTIONS, self.session_state.transcript, budget, tools)
+        step = await self._stream_chat(call, phase, messages, tools, budget.max_output_tokens, on_delta)
+        if step.finish_reason == "length":
+            _INCOMPLETE.labels(self.backend, "length").inc()
+            if step.tool_calls:
+                # Arguments cut off mid-JSON are unusable: retry once with room for them.
+                logger.warning("Tool call truncated at %d tokens in %s; retrying", budget.max_output_tokens, phase)
+                step = await self._stream_chat(
+                    call,
+                    phase,
+                    messages,
+                    tools,
+                    budget.max_output_tokens * _LENGTH_RETRY_FACTOR,
+                    None if step.content else on_delta,
+                )
+
+        if step.tool_calls:
+            try:
+                tool_calls = [
+                    {"id": tc["id"], "name": tc["name"], "arguments": json.loads(tc["arguments"] or "{}")}
+                    for tc in step.tool_calls
+                ]
+            except json.JSONDecodeError as e:
+                logger.warning("Malformed tool call arguments in %s (finish %s): %s", phase, step.finish_reason, e)
+                return {
+                    "status": "incomplete" if step.finish_reason == "length" else "failed",
+                    "error": f"Malformed tool call arguments: {e}",
+                }
+            self.session_state.transcript.append(
+                ROLE_ASSISTANT,
+                step.content,
+                tool_calls=[
+                    {"id": tc["id"], "type": "function", "function": {"name": tc["name"], "arguments": tc["arguments"]}}
+                    for tc in step.tool_calls
+                ],
+            )
+            return {"status": "requires_action", "run_id": None, "tool_calls": tool_calls}
+        self.session_state.add_assistant_message(step.content)
+        if step.finish_reason == "length":
+            return {"status": "completed", "message": step.content, "incomplete_reason": "length"}
+        return {"status": "completed", "message": step.content}
+
+    async def _stream_chat(
+        self,
+        call: str,
+        phase: str,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]],
+        max_tokens: int,
+        on_delta: OnDelta | None,
+    ) -> ChatStep:
+        with upstream_span("openai", "chat.completions", **{"llm.model_name": ORCHESTRATOR_MODEL}):
+            step = await stream_step(
+                self.openai_client,
+                model=ORCHESTRATOR_MODEL,
+                messages=messages,
+                tools=tools,
+                max_tokens=max_tokens,
+                on_delta=on_delta,
+            )
+            log_call(
+                f"chat_{call}",
+                model=ORCHESTRATOR_MODEL,
+                phase=phase,
+                prompt_tokens=count_message_tokens(messages) + count_tool_tokens(tools),
+                max_output_tokens=max_tokens,
+                usage=step.usage,
+            )
+        return step
+
+    async def _assistants_run(self, user_message: str) -> dict[str, Any]:
         if not self.assistant_id:
             await self.create_assistant()
 
@@ -451,23 +726,41 @@ class OrchestratorAssistant:
             await self.create_thread()
 
         # Add message to thread
-        await self.openai_client.beta.threads.messages.create(
-            thread_id=self.thread_id,
-            role="user",
-            content=user_message
-        )
+        with upstream_span("openai", "messages.create"):
+            await self.openai_client.beta.threads.messages.create(
+                thread_id=self.thread_id,
+                role="user",
+                content=user_message
+            )
 
-        # Create and poll run
-        run = await self.openai_client.beta.threads.runs.create_and_poll(
-            thread_id=self.thread_id,
-            assistant_id=self.assistant_id
-        )
+        # Create and poll run, bounded by the current phase's token budget
+        phase = self.current_phase.value
+        budget = budget_for(phase)
+        with upstream_span("openai", "runs.create"):
+            run = await self.openai_client.beta.threads.runs.create(
+                thread_id=self.thread_id,
+                assistant_id=self.assistant_id,
+                max_prompt_tokens=budget.max_input_tokens,
+                max_completion_tokens=budget.max_output_tokens,
+                truncation_strategy=budget.truncation_strategy(),
+            )
+        with upstream_span("openai", "runs.poll"):
+            run = await self._poll_run(run)
+            log_call(
+                "assistant_run",
+                model=ORCHESTRATOR_MODEL,
+                phase=phase,
+                prompt_tokens=count_tokens(user_message),
+                max_output_tokens=budget.max_output_tokens,
+                usage=getattr(run, "usage", None),
+            )
 
         if run.status == "requires_action":
             # Handle tool calls
             tool_calls = run.required_action.submit_tool_outputs.tool_calls
             return {
                 "status": "requires_action",
+                "run_id": run.id,
                 "tool_calls": [
                     {
                         "id": tc.id,
@@ -479,46 +772,96 @@ class OrchestratorAssistant:
             }
         if run.status == "completed":
             # Get assistant messages
-            messages = await self.openai_client.beta.threads.messages.list(
-                thread_id=self.thread_id,
-                order="desc",
-                limit=1
-            )
+            with upstream_span("openai", "messages.list"):
+                messages = await self.openai_client.beta.threads.messages.list(
+                    thread_id=self.thread_id,
+                    order="desc",
+                    limit=1
+                )
             return {
                 "status": "completed",
                 "message": messages.data[0].content[0].text.value
             }
+        if run.status == "incomplete":
+            return await self._incomplete_result(run)
         return {
             "status": run.status,
             "error": f"Unexpected run status: {run.status}"
         }
 
-    async def submit_tool_outputs(self, run_id: str, tool_outputs: list[dict[str, Any]]) -> dict[str, Any]:
-        """Submit tool outputs back to the assistant.
-        
-        Args:
-            run_id: The run ID requiring tool outputs
-            tool_outputs: List of tool outputs with id and output fields
-            
-        Returns:
-            Run result after submitting outputs
-        """
-        run = await self.openai_client.beta.threads.runs.submit_tool_outputs_and_poll(
-            thread_id=self.thread_id,
-            run_id=run_id,
-            tool_outputs=tool_outputs
-        )
+    async def _incomplete_result(self, run: Any) -> dict[str, Any]:
+        """Salvage a run stopped by ``max_prompt_tokens``/``max_completion_tokens``.
 
-        if run.status == "completed":
+        The phase budget caps both, so a long answer ends the run as
+        ``incomplete``.  Whatever the run managed to write is still a usable
+        reply; it is returned as completed, tagged with the reason.  A run
+        that wrote nothing (e.g. cut off inside a tool call) is an error.
+        """
+        details = getattr(run, "incomplete_details", None)
+        reason = getattr(details, "reason", None) or "unknown"
+        _INCOMPLETE.labels(self.backend, reason).inc()
+        logger.warning("Assistant run %s incomplete in %s: %s", run.id, self.current_phase.value, reason)
+        with upstream_span("openai", "messages.list"):
             messages = await self.openai_client.beta.threads.messages.list(
                 thread_id=self.thread_id,
+                run_id=run.id,
                 order="desc",
                 limit=1
             )
+        text = "".join(
+            part.text.value
+            for message in messages.data
+            for part in message.content
+            if getattr(part, "text", None) is not None
+        )
+        if text:
+            return {"status": "completed", "message": text, "incomplete_reason": reason}
+        return {
+            "status": "incomplete",
+            "incomplete_reason": reason,
+            "error": f"Run incomplete ({reason}) before producing a reply"
+        }
+
+    async def _poll_run(self, run: Any) -> Any:
+        """Wait for *run* to leave the queued/in-progress states.
+
+        Creation and polling are separate calls (rather than the SDK's
+        ``*_and_poll`` helpers) so their latencies are measured separately.
+        """
+        if run.status not in _PENDING_RUN_STATUSES:
+            return run
+        return await self.openai_client.beta.threads.runs.poll(run.id, thread_id=self.thread_id)
+
+    async def _assistants_submit(self, run_id: str, tool_outputs: list[dict[str, Any]]) -> dict[str, Any]:
+        with upstream_span("openai", "runs.submit_tool_outputs"):
+            run = await self.openai_client.beta.threads.runs.submit_tool_outputs(
+                run_id,
+                thread_id=self.thread_id,
+                tool_outputs=tool_outputs
+            )
+        with upstream_span("openai", "runs.poll"):
+            run = await self._poll_run(run)
+            log_call(
+                "assistant_tool_outputs",
+                model=ORCHESTRATOR_MODEL,
+                phase=self.current_phase.value,
+                prompt_tokens=sum(count_tokens(str(o.get("output", ""))) for o in tool_outputs),
+                usage=getattr(run, "usage", None),
+            )
+
+        if run.status == "completed":
+            with upstream_span("openai", "messages.list"):
+                messages = await self.openai_client.beta.threads.messages.list(
+                    thread_id=self.thread_id,
+                    order="desc",
+                    limit=1
+                )
             return {
                 "status": "completed",
                 "message": messages.data[0].content[0].text.value
             }
+        if run.status == "incomplete":
+            return await self._incomplete_result(run)
         return {
             "status": run.status,
             "error": f"Unexpected run status after tool submission: {run.status}"
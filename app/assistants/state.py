@@ -6,24 +6,27 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
+from app.core.transcript import ROLE_ASSISTANT, ROLE_USER, CompactTranscript
+
 
 @dataclass
 class SessionState:
     """Container passed between the Intake → Parser → Reframe stages."""
 
-    transcript: list[dict[str, str]] = field(default_factory=list)
+    # Compact store; iterating/indexing yields {"role", "content"} dicts.
+    transcript: CompactTranscript = field(default_factory=CompactTranscript)
     intake_json: dict[str, Any] | None = None
     reframe_json: dict[str, Any] | None = None
 
     def add_user_message(self, content: str) -> None:
         """Append a user message to the transcript."""
 
-        self.transcript.append({"role": "user", "content": content})
+        self.transcript.append(ROLE_USER, content)
 
     def add_assistant_message(self, content: str) -> None:
         """Append an assistant message to the transcript."""
 
-        self.transcript.append({"role": "assistant", "content": content})
+        self.transcript.append(ROLE_ASSISTANT, content)
 
 
 class Phase(Enum):
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import base64
+from collections.abc import Sequence
 from typing import Any
 
 
@@ -10,7 +11,7 @@ class OrchestratorStubs:
     """Provides stub implementations of tools for offline testing."""
 
     @staticmethod
-    async def collect_context(transcript: list[dict[str, str]]) -> dict[str, Any]:
+    async def collect_context(transcript: Sequence[dict[str, Any]]) -> dict[str, Any]:
         """Stub implementation of collect_context tool."""
         # Simulate extracting information from transcript
         messages = " ".join([msg["content"] for msg in transcript if msg["role"] == "user"])
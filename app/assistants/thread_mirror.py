@@ -0,0 +1,113 @@
+"""Incremental in-memory mirror of OpenAI Assistants thread messages.
+
+``collect_context`` needs the user messages of a thread on every intake
+turn.  Listing the thread each time re-downloads the whole history (and
+without paging, only its first page).  A :class:`ThreadMirror` keeps
+lightweight ``{"id", "role", "content"}`` records and asks the API only for
+messages *after* the last one it has seen, following ``has_more`` until
+the thread is exhausted, so each sync costs one request per page of *new*
+messages.
+
+Mirrors are kept per thread in a small LRU (:func:`get_thread_mirror`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+import logging
+from typing import Any
+
+from app.services.metrics.registry import REGISTRY
+from app.services.tracing.otel import upstream_span
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 100  # API maximum
+DEFAULT_MAX_MESSAGES = 256
+DEFAULT_MAX_THREADS = 1024
+
+_FETCHED = REGISTRY.counter("thread_mirror_messages_fetched_total", "Thread messages downloaded by mirrors")
+_PAGES = REGISTRY.counter("thread_mirror_pages_total", "Message list requests issued by mirrors")
+
+
+def _field(obj: Any, name: str) -> Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def message_text(message: Any) -> str:
+    """Return the concatenated text blocks of an API message (object or dict)."""
+
+    content = _field(message, "content")
+    if isinstance(content, str):
+        return content
+    parts: list[str] = []
+    for block in content or ():
+        text = _field(block, "text")
+        if text is None:
+            continue
+        value = _field(text, "value")
+        parts.append(value if isinstance(value, str) else str(text))
+    return " ".join(parts)
+
+
+class ThreadMirror:
+    """Messages of one thread, oldest first, synced with the ``after`` cursor."""
+
+    def __init__(self, thread_id: str, *, max_messages: int = DEFAULT_MAX_MESSAGES) -> None:
+        self.thread_id = thread_id
+        self.messages: deque[dict[str, Any]] = deque(maxlen=max_messages)
+        self.cursor: str | None = None  # id of the newest mirrored message
+        self._lock = asyncio.Lock()
+
+    async def sync(self, client: Any) -> int:
+        """Fetch messages newer than :attr:`cursor`; return how many were added."""
+
+        async with self._lock:
+            added = 0
+            while True:
+                params: dict[str, Any] = {"order": "asc", "limit": PAGE_SIZE}
+                if self.cursor is not None:
+                    params["after"] = self.cursor
+                with upstream_span("openai", "messages.list", **{"openai.after": self.cursor}):
+                    page = await client.beta.threads.messages.list(self.thread_id, **params)
+                _PAGES.inc()
+                data = list(page.data)
+                for message in data:
+                    self.messages.append(
+                        {"id": _field(message, "id"), "role": _field(message, "role"), "content": message_text(message)}
+                    )
+                    self.cursor = _field(message, "id")
+                added += len(data)
+                if not data or not getattr(page, "has_more", False):
+                    break
+            _FETCHED.inc(added)
+            return added
+
+    async def fetch(self, client: Any) -> list[dict[str, Any]]:
+        """Sync and return a copy of the mirrored messages."""
+
+        await self.sync(client)
+        return list(self.messages)
+
+
+_mirrors: OrderedDict[str, ThreadMirror] = OrderedDict()
+
+
+def get_thread_mirror(thread_id: str, *, max_threads: int = DEFAULT_MAX_THREADS) -> ThreadMirror:
+    """Return the process-wide mirror of *thread_id*, evicting the least recently used."""
+
+    mirror = _mirrors.get(thread_id)
+    if mirror is None:
+        mirror = _mirrors[thread_id] = ThreadMirror(thread_id)
+        while len(_mirrors) > max_threads:
+            _mirrors.popitem(last=False)
+    else:
+        _mirrors.move_to_end(thread_id)
+    return mirror
+
+
+def clear_thread_mirrors() -> None:
+    """Drop every mirror (tests, or after threads were deleted)."""
+
+    _mirrors.clear()
@@ -0,0 +1,183 @@
+"""Warm pool of pre-created, empty OpenAI threads.
+
+With the Assistants backend every new session would otherwise pay a
+``threads.create`` round trip before its first run.  :class:`ThreadPool`
+keeps up to ``size`` empty threads ready; :meth:`ThreadPool.take` hands one
+out in O(1) and wakes a background task that replenishes the pool.  Threads
+older than ``ttl_seconds`` are not handed out but deleted in the background,
+so a session never starts on a thread that OpenAI may have expired.
+
+When the pool is empty (cold start, burst of sessions, refill errors)
+callers fall back to creating a thread synchronously.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import suppress
+import logging
+import os
+import time
+from typing import Any
+
+from app.services.metrics.registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TTL_SECONDS = 6 * 3600.0
+_RETRY_SECONDS = 5.0
+
+_REQUESTS = REGISTRY.counter(
+    "thread_pool_requests_total", "Threads requested from the warm pool", labels=("result",)
+)
+_AVAILABLE = REGISTRY.gauge("thread_pool_available", "Pre-created threads waiting in the warm pool")
+_CREATED = REGISTRY.counter("thread_pool_created_total", "Threads pre-created by the warm pool")
+
+
+class ThreadPool:
+    """Background-replenished pool of empty threads."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        size: int = DEFAULT_POOL_SIZE,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ) -> None:
+        self.client = client
+        self.size = size
+        self.ttl_seconds = ttl_seconds
+        self._threads: deque[tuple[str, float]] = deque()  # (thread_id, created_at), oldest first
+        self._expired: list[str] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self) -> int:
+        return len(self._threads)
+
+    def take(self) -> str | None:
+        """Return a pre-created thread id, or ``None`` if the pool is empty."""
+
+        now = time.monotonic()
+        while self._threads:
+            thread_id, created_at = self._threads.popleft()
+            if now - created_at < self.ttl_seconds:
+                self.hits += 1
+                _REQUESTS.labels("hit").inc()
+                self._changed()
+                return thread_id
+            self._expired.append(thread_id)
+            _REQUESTS.labels("expired").inc()
+        self.misses += 1
+        _REQUESTS.labels("miss").inc()
+        self._changed()
+        return None
+
+    def _changed(self) -> None:
+        _AVAILABLE.set(len(self._threads))
+        self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Replenishment
+    # ------------------------------------------------------------------
+    async def fill(self) -> None:
+        """Drop expired threads and create threads until the pool is full."""
+
+        now = time.monotonic()
+        while self._threads and now - self._threads[0][1] >= self.ttl_seconds:
+            self._expired.append(self._threads.popleft()[0])
+        while self._expired:
+            thread_id = self._expired.pop()
+            try:
+                await self.client.beta.threads.delete(thread_id)
+            except Exception as e:  # best effort; OpenAI may already have expired it
+                logger.debug("Failed to delete pooled thread %s: %s", thread_id, e)
+        missing = self.size - len(self._threads)
+        if missing > 0:
+            created = await asyncio.gather(
+                *(self.client.beta.threads.create() for _ in range(missing)), return_exceptions=True
+            )
+            errors = [c for c in created if isinstance(c, BaseException)]
+            for thread in created:
+                if not isinstance(thread, BaseException):
+                    self._threads.append((thread.id, time.monotonic()))
+            _CREATED.inc(missing - len(errors))
+            if errors:
+                raise errors[0]
+        _AVAILABLE.set(len(self._threads))
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.fill()
+            except Exception as e:
+                logger.warning("Thread pool refill failed: %s", e)
+                await asyncio.sleep(_RETRY_SECONDS)
+                continue
+            # Wake on the next take(), or when the oldest thread expires.
+            timeout = None
+            if self._threads:
+                timeout = max(0.0, self.ttl_seconds - (time.monotonic() - self._threads[0][1]))
+            with suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout)
+
+    def start(self) -> None:
+        """Start replenishing on the running loop."""
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="thread-pool")
+
+    async def close(self) -> None:
+        """Stop replenishing and delete the threads nobody took."""
+
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._expired.extend(thread_id for thread_id, _ in self._threads)
+        self._threads.clear()
+        _AVAILABLE.set(0)
+        await asyncio.gather(
+            *(self.client.beta.threads.delete(t) for t in self._expired), return_exceptions=True
+        )
+        self._expired.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"available": len(self._threads), "size": self.size, "hits": self.hits, "misses": self.misses}
+
+
+# ---------------------------------------------------------------------------
+# Process-wide pool
+# ---------------------------------------------------------------------------
+
+_pool: ThreadPool | None = None
+
+
+def get_thread_pool() -> ThreadPool | None:
+    """Return the process-wide pool, if one was installed."""
+
+    return _pool
+
+
+def set_thread_pool(pool: ThreadPool | None) -> None:
+    global _pool
+    _pool = pool
+
+
+def create_thread_pool(client: Any) -> ThreadPool | None:
+    """Build the pool configured by ``THREAD_POOL_SIZE`` / ``THREAD_POOL_TTL_SECONDS``.
+
+    Returns ``None`` when the size is 0.
+    """
+
+    size = int(os.getenv("THREAD_POOL_SIZE", DEFAULT_POOL_SIZE))
+    if size <= 0:
+        return None
+    return ThreadPool(client, size=size, ttl_seconds=float(os.getenv("THREAD_POOL_TTL_SECONDS", DEFAULT_TTL_SECONDS)))
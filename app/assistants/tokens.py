@@ -0,0 +1,313 @@
+"""Token counting and per-phase token budgets for LLM calls.
+
+* :func:`count_tokens`, :func:`count_message_tokens` and
+  :func:`count_tool_tokens` count locally with a cached ``tiktoken``
+  encoding.  When tiktoken (or its BPE file) is not available they fall
+  back to the usual ~4 characters per token estimate.
+* :func:`budget_for` returns the :class:`PhaseBudget` configured in
+  ``Settings.token_budgets`` for an orchestrator phase.
+* :func:`fit_messages` and :func:`fit_json` cap a call's input to a budget:
+  the oldest turns are dropped and replaced by a short extractive summary,
+  and over-long JSON string fields are shortened.
+* :func:`log_call` records the per-call counts and charges API-reported
+  usage to the session's :mod:`usage ledger <app.assistants.usage>`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+import json
+import logging
+import os
+from typing import Any
+
+from app.assistants.usage import record_usage
+from app.services.metrics.registry import REGISTRY
+from app.services.tracing.otel import set_token_attributes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4o-mini"
+DEFAULT_ENCODING = "o200k_base"
+CHARS_PER_TOKEN = 4
+# Chat format overhead (see OpenAI's cookbook): per message, plus reply priming
+TOKENS_PER_MESSAGE = 3
+TOKENS_REPLY_PRIMING = 3
+TOKENS_PER_TOOL_CALL = 3
+
+_TOKENS = REGISTRY.counter("llm_tokens_total", "Tokens sent to / received from LLM calls", labels=("call", "kind"))
+_TRIMMED = REGISTRY.counter("llm_messages_trimmed_total", "Messages dropped to fit a token budget", labels=("call",))
+
+
+# ---------------------------------------------------------------------------
+# Counting
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model: str = DEFAULT_MODEL) -> Any | None:
+    """Return the tiktoken encoding for *model*, or ``None`` if unavailable.
+
+    The first call per model may read (or download) the BPE file, so the
+    warm-up runs it at startup; the result is cached for the process.
+    """
+
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:  # BPE download failed (offline), corrupt cache, …
+        logger.warning("tiktoken encoding for %s unavailable, estimating tokens: %s", model, e)
+        return None
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Return the number of tokens in *text* for *model*."""
+
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _content(message: Mapping[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        content = " ".join(str(part) for part in content)
+    return str(content)
+
+
+def _message_tokens(message: Mapping[str, Any], model: str) -> int:
+    tokens = TOKENS_PER_MESSAGE + count_tokens(_content(message), model)
+    # An assistant tool round has content=None; its calls are the payload.
+    for call in message.get("tool_calls") or ():
+        function = call.get("function") or {}
+        tokens += (
+            TOKENS_PER_TOOL_CALL
+            + count_tokens(function.get("name") or "", model)
+            + count_tokens(function.get("arguments") or "", model)
+        )
+    return tokens
+
+
+def count_message_tokens(messages: Sequence[Mapping[str, Any]], model: str = DEFAULT_MODEL) -> int:
+    """Return the prompt tokens of a chat *messages* list, including format overhead."""
+
+    return TOKENS_REPLY_PRIMING + sum(_message_tokens(m, model) for m in messages)
+
+
+def count_tool_tokens(tools: Sequence[Mapping[str, Any]], model: str = DEFAULT_MODEL) -> int:
+    """Return the prompt tokens taken by the ``tools`` definitions sent with a call.
+
+    The API renders the schemas in its own format; their compact JSON is a
+    slight overestimate of it, which is the safe side for a budget.
+    """
+
+    if not tools:
+        return 0
+    return count_tokens(json.dumps(list(tools), ensure_ascii=False, separators=(",", ":")), model)
+
+
+# ---------------------------------------------------------------------------
+# Budgets
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class PhaseBudget:
+    """Token limits for LLM calls made in one orchestrator phase."""
+
+    max_input_tokens: int
+    max_output_tokens: int
+    # Assistants runs: ``truncation_strategy`` keeps this many recent thread messages
+    last_messages: int
+
+    def truncation_strategy(self) -> dict[str, Any]:
+        return {"type": "last_messages", "last_messages": self.last_messages}
+
+
+@lru_cache(maxsize=1)
+def _phase_budgets() -> dict[str, PhaseBudget]:
+    """Merge the ``TOKEN_BUDGETS`` override onto the default budgets.
+
+    The override may list only some phases, and only some limits of a
+    phase; everything it leaves out keeps its default.
+
+    Raises:
+        ValueError: If a budget is incomplete or ``"default"`` is missing
+    """
+
+    from app.config.base import Settings
+
+    defaults: dict[str, dict[str, int]] = Settings.model_fields["token_budgets"].default
+    try:
+        override = Settings().token_budgets
+    except Exception:
+        # Settings also requires the ADK/Langfuse variables, which the
+        # Assistants deployment may not set; read our field on its own.
+        raw = os.getenv("TOKEN_BUDGETS")
+        override = json.loads(raw) if raw else {}
+
+    budgets = {phase: dict(values) for phase, values in defaults.items()}
+    for phase, values in override.items():
+        base = budgets.get(phase) or budgets.get("default", {})
+        budgets[phase] = {**base, **values}
+    if "default" not in budgets:
+        raise ValueError('TOKEN_BUDGETS needs a "default" budget')
+    try:
+        return {phase: PhaseBudget(**values) for phase, values in budgets.items()}
+    except TypeError as e:
+        raise ValueError(f"Invalid TOKEN_BUDGETS: {e}") from e
+
+
+def budget_for(phase: str) -> PhaseBudget:
+    """Return the budget of *phase* (an orchestrator ``Phase`` value), or ``"default"``."""
+
+    budgets = _phase_budgets()
+    return budgets.get(phase) or budgets["default"]
+
+
+# ---------------------------------------------------------------------------
+# Fitting input to a budget
+# ---------------------------------------------------------------------------
+
+
+def _summary(dropped: Sequence[Mapping[str, Any]], max_tokens: int, model: str) -> dict[str, str] | None:
+    """Extractive summary of *dropped* turns: the first sentence of each user message."""
+
+    if max_tokens <= TOKENS_PER_MESSAGE:
+        return None
+    header = f"Earlier conversation ({len(dropped)} messages) summarised: "
+    lines: list[str] = []
+    used = TOKENS_PER_MESSAGE + count_tokens(header, model)
+    for message in dropped:
+        if message.get("role") != "user":
+            continue
+        first = _content(message).strip().split(". ")[0][:200]
+        cost = count_tokens(first, model) + 1
+        if not first or used + cost > max_tokens:
+            continue
+        lines.append(first)
+        used += cost
+    if not lines:
+        return None
+    return {"role": "system", "content": header + " | ".join(lines)}
+
+
+def fit_messages(
+    messages: Sequence[Mapping[str, Any]],
+    max_tokens: int,
+    *,
+    model: str = DEFAULT_MODEL,
+    summary_tokens: int = 128,
+    call: str = "chat",
+) -> list[dict[str, Any]]:
+    """Return the newest *messages* that fit in *max_tokens* prompt tokens.
+
+    Leading ``system`` messages are always kept.  When older turns are
+    dropped, a short extractive summary of them (at most *summary_tokens*)
+    is inserted after the system messages if it still fits.
+    """
+
+    if count_message_tokens(messages, model) <= max_tokens:
+        return [dict(m) for m in messages]
+
+    head_len = 0
+    while head_len < len(messages) and messages[head_len].get("role") == "system":
+        head_len += 1
+    head = [dict(m) for m in messages[:head_len]]
+    body = messages[head_len:]
+
+    used = count_message_tokens(head, model)
+    kept: list[dict[str, Any]] = []
+    reserve = min(summary_tokens, max(0, max_tokens - used) // 4)
+    for message in reversed(body):
+        cost = _message_tokens(message, model)
+        if used + cost > max_tokens - reserve and kept:
+            break
+        kept.append(dict(message))
+        used += cost
+    kept.reverse()
+
+    dropped = body[: len(body) - len(kept)]
+    if not dropped:
+        return head + kept
+    _TRIMMED.labels(call).inc(len(dropped))
+    summary = _summary(dropped, min(summary_tokens, max_tokens - used), model)
+    return head + ([summary] if summary else []) + kept
+
+
+def fit_json(obj: dict[str, Any], max_tokens: int, *, model: str = DEFAULT_MODEL) -> str:
+    """Serialise *obj* to JSON within *max_tokens*, shortening the longest strings first."""
+
+    obj = json.loads(json.dumps(obj, ensure_ascii=False))  # deep copy, JSON-safe
+    text = json.dumps(obj, ensure_ascii=False)
+    for _ in range(32):
+        tokens = count_tokens(text, model)
+        if tokens <= max_tokens:
+            break
+        longest: tuple[int, dict[str, Any] | list[Any] | None, Any] = (0, None, None)
+        stack: list[Any] = [obj]
+        while stack:
+            node = stack.pop()
+            items = node.items() if isinstance(node, dict) else enumerate(node)
+            for key, value in items:
+                if isinstance(value, str) and len(value) > longest[0]:
+                    longest = (len(value), node, key)
+                elif isinstance(value, dict | list):
+                    stack.append(value)
+        length, parent, key = longest
+        if parent is None or length <= 16:
+            break
+        # Shrink proportionally to the overshoot, at least by a quarter.
+        keep = max(16, min(int(length * 0.75), length - (tokens - max_tokens) * CHARS_PER_TOKEN))
+        parent[key] = parent[key][:keep] + "…"
+        text = json.dumps(obj, ensure_ascii=False)
+    return text
+
+
+# ---------------------------------------------------------------------------
+# Logging
+# ---------------------------------------------------------------------------
+
+
+def log_call(
+    call: str,
+    *,
+    phase: str,
+    prompt_tokens: int,
+    max_output_tokens: int | None = None,
+    completion_tokens: int | None = None,
+    usage: Any = None,
+    model: str = DEFAULT_MODEL,
+) -> None:
+    """Log the token counts of one LLM call (local estimate and API usage).
+
+    The counts are also set on the current span, i.e. the call's upstream span.
+    """
+
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or prompt_tokens
+        completion_tokens = getattr(usage, "completion_tokens", None) or completion_tokens
+        record_usage(model, phase, prompt_tokens, completion_tokens or 0)
+    set_token_attributes(prompt_tokens, completion_tokens, max_output_tokens)
+    _TOKENS.labels(call, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        _TOKENS.labels(call, "completion").inc(completion_tokens)
+    logger.info(
+        "llm_call call=%s phase=%s prompt_tokens=%d completion_tokens=%s max_output_tokens=%s",
+        call,
+        phase,
+        prompt_tokens,
+        completion_tokens,
+        max_output_tokens,
+    )
@@ -0,0 +1,148 @@
+"""Per-session token usage and cost ledger.
+
+Every OpenAI response that reports ``usage`` goes through
+:func:`app.assistants.tokens.log_call`, which charges it to the ledger bound
+to the current context with :func:`charge`.  The orchestrator binds its own
+:class:`UsageLedger` around LLM steps and tool executions, so usage lands in
+the session that caused it, split by phase and by tool (``"orchestrator"``
+for the orchestrator's own steps).
+
+Costs are estimates from :data:`PRICES` (USD per million tokens), which the
+``LLM_PRICES`` environment variable (JSON, same shape) extends or overrides.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+import json
+import os
+from typing import Any
+
+from app.services.metrics.registry import REGISTRY
+
+ORCHESTRATOR = "orchestrator"
+
+# USD per 1M tokens: (input, output)
+PRICES: dict[str, tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+_COST = REGISTRY.counter("llm_cost_usd_total", "Estimated LLM spend", labels=("phase", "tool"))
+_USAGE = REGISTRY.counter(
+    "llm_usage_tokens_total", "API-reported tokens by phase and tool", labels=("phase", "tool", "kind")
+)
+
+_current: ContextVar[tuple[UsageLedger, str] | None] = ContextVar("usage_ledger", default=None)
+
+
+@lru_cache(maxsize=1)
+def _prices() -> dict[str, tuple[float, float]]:
+    prices = dict(PRICES)
+    if raw := os.getenv("LLM_PRICES"):
+        prices.update({model: tuple(pair) for model, pair in json.loads(raw).items()})
+    return prices
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Return the USD cost of one call; unknown models cost 0."""
+
+    input_price, output_price = _prices().get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+@dataclass(slots=True)
+class Usage:
+    """Token and cost totals of one bucket."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    calls: int = 0
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cost_usd: float) -> None:
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost_usd += cost_usd
+        self.calls += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "calls": self.calls,
+        }
+
+
+@dataclass(slots=True)
+class UsageLedger:
+    """Usage of one session, accumulated per phase and per tool."""
+
+    total: Usage = field(default_factory=Usage)
+    by_phase: dict[str, Usage] = field(default_factory=dict)
+    by_tool: dict[str, Usage] = field(default_factory=dict)
+
+    def record(
+        self, *, model: str, phase: str, tool: str, prompt_tokens: int, completion_tokens: int
+    ) -> float:
+        """Add one call and return its estimated cost."""
+
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        for usage in (
+            self.total,
+            self.by_phase.setdefault(phase, Usage()),
+            self.by_tool.setdefault(tool, Usage()),
+        ):
+            usage.add(prompt_tokens, completion_tokens, cost)
+        return cost
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total.to_dict(),
+            "by_phase": {phase: usage.to_dict() for phase, usage in self.by_phase.items()},
+            "by_tool": {tool: usage.to_dict() for tool, usage in self.by_tool.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> UsageLedger:
+        if not data:
+            return cls()
+        return cls(
+            total=Usage(**data["total"]),
+            by_phase={phase: Usage(**usage) for phase, usage in data.get("by_phase", {}).items()},
+            by_tool={tool: Usage(**usage) for tool, usage in data.get("by_tool", {}).items()},
+        )
+
+
+@contextmanager
+def charge(ledger: UsageLedger, tool: str = ORCHESTRATOR) -> Iterator[UsageLedger]:
+    """Charge LLM usage reported inside the block to *ledger* under *tool*."""
+
+    token = _current.set((ledger, tool))
+    try:
+        yield ledger
+    finally:
+        _current.reset(token)
+
+
+def record_usage(model: str, phase: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Charge one API-reported call to the current ledger and the cost metrics."""
+
+    bound = _current.get()
+    if bound is None:
+        tool, cost = ORCHESTRATOR, estimate_cost(model, prompt_tokens, completion_tokens)
+    else:
+        ledger, tool = bound
+        cost = ledger.record(
+            model=model, phase=phase, tool=tool, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+    _COST.labels(phase, tool).inc(cost)
+    _USAGE.labels(phase, tool, "prompt").inc(prompt_tokens)
+    _USAGE.labels(phase, tool, "completion").inc(completion_tokens)
@@ -4,17 +4,58 @@ The callback appends **two** entries per turn:
     1. The user message (role == ``"user"``)
     2. The assistant/model reply (role == ``"assistant"``)
 
-The entire transcript lives under ``state["conv_raw"]`` as a simple list so it
-can be easily serialised or displayed later on.
+ADK persists every state write as part of the event's ``state_delta``, so
+rewriting the whole list each turn would cost O(n²) bytes over a session.
+Instead the transcript is stored append-only:
+
+* ``state["conv_raw"]`` – snapshot of every turn before ``conv_base``
+* ``state["conv_delta_<slot>"]`` – the new entries of one later turn; slots
+  are reused cyclically (``turn % compact_every``)
+* ``state["conv_seq"]`` – index of the next turn
+
+Each turn writes only its own entries.  Every ``compact_every`` turns the
+pending deltas are folded into a fresh ``conv_raw`` snapshot, which frees
+their slots.  Use :func:`read_transcript` to get the full list back.
 """
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+from typing import Any
+
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_response import LlmResponse
 
+from app.core.transcript import parts_text, turn_entries
+
+SNAPSHOT_KEY = "conv_raw"
+BASE_KEY = "conv_base"
+SEQ_KEY = "conv_seq"
+DELTA_PREFIX = "conv_delta_"
+DEFAULT_COMPACT_EVERY = 16
+
+
+def _delta_key(turn: int, compact_every: int) -> str:
+    return f"{DELTA_PREFIX}{turn % compact_every}"
+
+
+def read_transcript(
+    state: Mapping[str, Any], compact_every: int = DEFAULT_COMPACT_EVERY
+) -> list[dict[str, str]]:
+    """Reassemble the full transcript from the snapshot plus pending deltas."""
+
+    transcript = list(state.get(SNAPSHOT_KEY) or [])
+    base = state.get(BASE_KEY, 0)
+    seq = state.get(SEQ_KEY, base)
+    for turn in range(base, seq):
+        transcript.extend(state.get(_delta_key(turn, compact_every)) or [])
+    return transcript
+
 
 class TranscriptAccumulator:
+    def __init__(self, compact_every: int = DEFAULT_COMPACT_EVERY) -> None:
+        self.compact_every = compact_every
+
     def __call__(
         self,
         *,
@@ -23,28 +64,29 @@ class TranscriptAccumulator:
     ) -> LlmResponse | None:  # type: ignore[override]
         state = callback_context.state
 
-        transcript: list[dict[str, str]] = state.get("conv_raw", [])  # type: ignore[assignment]
-
-        # --------------------------- user message --------------------------- #
         user_content = callback_context.user_content
-        if user_content and user_content.parts:
-            user_text = "".join(
-                part.text or "" for part in user_content.parts if hasattr(part, "text")
-            ).strip()
-            if user_text:
-                transcript.append({"role": "user", "text": user_text})
-
-        # ------------------------ assistant message ------------------------ #
-        if llm_response and llm_response.content and llm_response.content.parts:
-            assistant_text = "".join(
-                part.text or "" for part in llm_response.content.parts if hasattr(part, "text")
-            ).strip()
-            if assistant_text:
-                transcript.append({"role": "assistant", "text": assistant_text})
-
-        # Persist back to state - the object returned by ``state[...]`` is delta-aware
-        # so direct mutation registers a state_delta in the event.
-        state["conv_raw"] = transcript
+        user_text = parts_text(user_content.parts, sep="") if user_content else ""
+        assistant_text = (
+            parts_text(llm_response.content.parts, sep="")
+            if llm_response and llm_response.content
+            else ""
+        )
+        entries = turn_entries(user_text, assistant_text)
+        if not entries:
+            return None
+
+        turn: int = state.get(SEQ_KEY, 0)  # type: ignore[assignment]
+        base: int = state.get(BASE_KEY, 0)  # type: ignore[assignment]
+
+        # The state object is delta-aware: each assignment below lands in the
+        # event's state_delta, so we only assign what changed this turn.
+        if turn == 0 or turn - base >= self.compact_every:
+            # First turn (or pre-delta state) and periodic compaction.
+            state[SNAPSHOT_KEY] = read_transcript(state, self.compact_every) + entries
+            state[BASE_KEY] = turn + 1
+        else:
+            state[_delta_key(turn, self.compact_every)] = entries
+        state[SEQ_KEY] = turn + 1
 
         # We do **not** modify the model response, therefore return ``None``.
         return None
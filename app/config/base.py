@@ -78,6 +78,27 @@ class Settings(BaseSettings):
     langfuse_public_key: str = Field(default="", alias="LANGFUSE_PUBLIC_KEY")
     langfuse_secret_key: str = Field(default="", alias="LANGFUSE_SECRET_KEY")
 
+    # Prompt cache
+    prompt_cache_dir: str = "/tmp/reframe_prompts"
+    prompt_cache_ttl_seconds: float = 300.0
+    prompt_cache_max_entries: int = 64
+    prompt_bundle_path: str | None = Field(default=None, alias="PROMPT_BUNDLE_PATH")
+
+    # Token budgets per orchestrator phase; JSON in TOKEN_BUDGETS is merged
+    # onto these (see app.assistants.tokens), so it may list only some phases.
+    # "default" applies to phases without their own entry
+    token_budgets: dict[str, dict[str, int]] = Field(
+        default={
+            "default": {"max_input_tokens": 4000, "max_output_tokens": 300, "last_messages": 20},
+            "intake": {"max_input_tokens": 2000, "max_output_tokens": 300, "last_messages": 20},
+            "crisis_check": {"max_input_tokens": 1000, "max_output_tokens": 200, "last_messages": 10},
+            "analyst_qa": {"max_input_tokens": 3000, "max_output_tokens": 400, "last_messages": 20},
+            "reframe": {"max_input_tokens": 3000, "max_output_tokens": 400, "last_messages": 20},
+            "pdf_offer": {"max_input_tokens": 1500, "max_output_tokens": 200, "last_messages": 10},
+        },
+        alias="TOKEN_BUDGETS",
+    )
+
     # Arize AX Configuration (OPTIONAL)
     arize_space_id: str | None = Field(default=None, alias="ARIZE_SPACE_ID")
     arize_api_key: str | None = Field(default=None, alias="ARIZE_API_KEY")
@@ -0,0 +1,55 @@
+"""Language detection without any Google ADK dependency.
+
+Uses the Google Cloud Translation API when ``GOOGLE_API_KEY`` is set and the
+client library is installed; otherwise falls back to a character heuristic
+(Spanish-specific letters and punctuation ⇒ ``"es"``).
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from app.services.tracing.otel import upstream_span
+
+_ES_CHARS = frozenset("áéíóúÁÉÍÓÚñÑ¿¡üÜçÇ")
+
+_translate_client: Any = None
+
+
+def get_translate_client() -> Any:
+    """Lazily create the Translation client; ``None`` when unavailable."""
+
+    global _translate_client
+    if _translate_client is None and os.environ.get("GOOGLE_API_KEY"):
+        try:
+            from google.cloud import translate_v2 as translate  # type: ignore[import-untyped]
+        except ImportError:  # pragma: no cover – optional dependency
+            return None
+        _translate_client = translate.Client()
+    return _translate_client
+
+
+def detect_lang(text: str) -> str:
+    """Return ``"es"`` or ``"en"`` for *text*.
+
+    The Translation API result is only trusted above 0.7 confidence; API
+    failures and other languages fall through to the character heuristic.
+    """
+
+    client = get_translate_client()
+    if client:
+        try:
+            with upstream_span("translate", "detect_language", **{"translate.chars": len(text)}):
+                result = client.detect_language(text)
+            detected_lang = result.get("language", "")
+            confidence = result.get("confidence", 0)
+            if detected_lang in ("es", "en") and confidence > 0.7:
+                return str(detected_lang)
+        except Exception:
+            # API failure, fall back to character detection
+            pass
+
+    if not _ES_CHARS.isdisjoint(text):
+        return "es"
+    return "en"
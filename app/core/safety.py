@@ -0,0 +1,81 @@
+"""Crisis and PII screening shared by the ADK callbacks and the OpenAI tools.
+
+Pure-stdlib so the OpenAI Assistants path can use it without importing
+Google ADK.  ``SafetyGuard`` (ADK) and ``collect_context`` /
+``analyse_and_reframe`` (OpenAI) all delegate here.
+"""
+
+from __future__ import annotations
+
+import re
+
+# ---------------------------------------------------------------------------
+# Patterns
+# ---------------------------------------------------------------------------
+
+# Very conservative crisis phrases (matched case-insensitively)
+CRISIS_PHRASES: tuple[str, ...] = (
+    r"kill myself",  # en
+    r"end my life",
+    r"suicide\s*(?:attempt|plan)?",
+    r"self[-\s]?harm",
+    r"me quiero suicidar",  # es
+    r"quiero quitarme la vida",
+    r"no quiero vivir",
+)
+
+CRISIS_RE = re.compile("|".join(CRISIS_PHRASES), re.IGNORECASE)
+
+SSN_REGEXES: tuple[re.Pattern[str], ...] = (
+    re.compile(r"\bssn\b", re.IGNORECASE),
+    re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),  # 123‑45‑6789
+    re.compile(r"\b\d{9}\b"),  # 123456789
+)
+
+# ---------------------------------------------------------------------------
+# Safe-completion texts
+# ---------------------------------------------------------------------------
+
+CRISIS_MESSAGE = (
+    "Parece que estás pasando por un momento muy difícil y podrías estar pensando en hacerte daño. "
+    "Por favor, llama inmediatamente al **024** (línea de ayuda en España, 24 h, gratuita) o al "
+    "**112** si tu vida está en peligro. Si te encuentras fuera de España, marca el número de "
+    "emergencias local o consulta https://findahelpline.com. Un profesional se pondrá en contacto "
+    "contigo en breve."
+)
+
+PII_MESSAGE = (
+    "I'm sorry, but I can't process personal data like Social "
+    "Security Numbers. A team member will review your last "
+    "message shortly."
+)
+
+# ---------------------------------------------------------------------------
+# Detection
+# ---------------------------------------------------------------------------
+
+
+def detect_crisis(text: str) -> bool:
+    """Return ``True`` when *text* contains a self-harm / suicide cue."""
+
+    return CRISIS_RE.search(text) is not None
+
+
+def detect_pii(text: str) -> bool:
+    """Return ``True`` when *text* looks like it contains a US SSN."""
+
+    return any(r.search(text) for r in SSN_REGEXES)
+
+
+def screen(text: str) -> str | None:
+    """Classify *text* as ``"crisis"``, ``"pii"`` or ``None`` (safe).
+
+    Crisis takes precedence over PII, matching the order in which the
+    guard escalates.
+    """
+
+    if detect_crisis(text):
+        return "crisis"
+    if detect_pii(text):
+        return "pii"
+    return None
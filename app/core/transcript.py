@@ -0,0 +1,182 @@
+"""Transcript helpers shared by the ADK callbacks and the OpenAI orchestrator.
+
+* :func:`parts_text` / :func:`turn_entries` turn raw message parts into
+  transcript entries.
+* :class:`CompactTranscript` is the memory-lean transcript held per session.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+import sys
+from typing import Any, overload
+
+
+def parts_text(parts: Iterable[Any] | None, sep: str = " ") -> str:
+    """Join the ``text`` attribute of message *parts* (ADK/GenAI or similar).
+
+    Parts without text (function calls, inline data, …) are skipped.
+    """
+
+    if not parts:
+        return ""
+    return sep.join(text for part in parts if (text := getattr(part, "text", None))).strip()
+
+
+def turn_entries(
+    user_text: str | None, assistant_text: str | None, *, text_key: str = "text"
+) -> list[dict[str, str]]:
+    """Return the transcript entries for one turn, skipping empty sides."""
+
+    entries: list[dict[str, str]] = []
+    if user_text:
+        entries.append({"role": "user", text_key: user_text})
+    if assistant_text:
+        entries.append({"role": "assistant", text_key: assistant_text})
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# Compact transcript
+# ---------------------------------------------------------------------------
+
+ROLE_USER = sys.intern("user")
+ROLE_ASSISTANT = sys.intern("assistant")
+ROLE_SYSTEM = sys.intern("system")
+ROLE_TOOL = sys.intern("tool")
+
+
+class TranscriptRecord:
+    """One message: interned role plus the byte span of its text in the buffer.
+
+    ``meta`` holds rarely-used extra keys (e.g. ``tool_call_id``) and stays
+    ``None`` for plain chat messages.
+    """
+
+    __slots__ = ("end", "meta", "role", "start")
+
+    def __init__(
+        self, role: str, start: int, end: int, meta: dict[str, Any] | None = None
+    ) -> None:
+        self.role = role
+        self.start = start
+        self.end = end
+        self.meta = meta
+
+
+class CompactTranscript(Sequence[dict[str, Any]]):
+    """Append-only transcript storing all message text in one UTF-8 buffer.
+
+    Per message we keep a single slotted :class:`TranscriptRecord` instead of
+    a ``dict`` plus a ``str``; roles are interned so thousands of sessions
+    share the same role objects.  Indexing or iterating yields the familiar
+    ``{"role": ..., "content": ...}`` dicts, built on demand, so existing
+    callers (and the OpenAI client) keep working unchanged.
+    """
+
+    __slots__ = ("_buf", "_records")
+
+    def __init__(self, messages: Iterable[Mapping[str, Any]] = ()) -> None:
+        self._buf = bytearray()
+        self._records: list[TranscriptRecord] = []
+        for message in messages:
+            extra = {k: v for k, v in message.items() if k not in ("role", "content")}
+            self.append(message["role"], message.get("content") or "", **extra)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def append(self, role: str, content: str, **meta: Any) -> None:
+        start = len(self._buf)
+        self._buf += content.encode("utf-8")
+        self._records.append(TranscriptRecord(sys.intern(role), start, len(self._buf), meta or None))
+
+    def clear(self) -> None:
+        self._buf = bytearray()
+        self._records.clear()
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    def role(self, index: int) -> str:
+        return self._records[index].role
+
+    def text(self, index: int) -> str:
+        rec = self._records[index]
+        return self._buf[rec.start : rec.end].decode("utf-8")
+
+    def texts(self, role: str | None = None) -> Iterator[str]:
+        """Yield message texts, optionally only those with *role*."""
+
+        buf = self._buf
+        for rec in self._records:
+            if role is None or rec.role == role:
+                yield buf[rec.start : rec.end].decode("utf-8")
+
+    def _as_dict(self, rec: TranscriptRecord) -> dict[str, Any]:
+        message: dict[str, Any] = {
+            "role": rec.role,
+            "content": self._buf[rec.start : rec.end].decode("utf-8"),
+        }
+        if rec.meta:
+            message.update(rec.meta)
+        return message
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(self, index: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        if isinstance(index, slice):
+            return [self._as_dict(rec) for rec in self._records[index]]
+        return self._as_dict(self._records[index])
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for rec in self._records:
+            yield self._as_dict(rec)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactTranscript | list | tuple):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"CompactTranscript({list(self)!r})"
+
+    def rows(self, start: int = 0) -> list[list[Any]]:
+        """Return messages from *start* on as ``[role, content]`` or ``[role, content, meta]``.
+
+        This is the compact form used for persistence; see :meth:`extend_rows`.
+        """
+
+        buf = self._buf
+        return [
+            [rec.role, buf[rec.start : rec.end].decode("utf-8"), rec.meta]
+            if rec.meta
+            else [rec.role, buf[rec.start : rec.end].decode("utf-8")]
+            for rec in self._records[start:]
+        ]
+
+    def extend_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        """Append messages produced by :meth:`rows`."""
+
+        for row in rows:
+            self.append(row[0], row[1], **(row[2] if len(row) > 2 else {}))
+
+    def as_openai_messages(self) -> list[dict[str, Any]]:
+        """Materialise the dict view expected by the OpenAI chat APIs."""
+
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the text buffer in bytes."""
+
+        return len(self._buf)
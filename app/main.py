@@ -1,12 +1,34 @@
+import asyncio
+import hmac
 import json
 import logging
 import os
+import time
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
-from app.assistants.orchestrator_assistant import OrchestratorAssistant
-from app.assistants.state import SessionState
+from app.assistants.chat_backend import BACKEND_ASSISTANTS, default_backend
+from app.assistants.thread_pool import ThreadPool, create_thread_pool, set_thread_pool
+from app.services.metrics import exposition
+from app.services.metrics.registry import REGISTRY
+from app.services.persistence.event_log import DEFAULT_SNAPSHOT_EVERY
+from app.services.persistence.session_manager import (
+    DEFAULT_IDLE_SECONDS,
+    DEFAULT_SWEEP_SECONDS,
+    SessionManager,
+)
+from app.services.persistence.session_store import (
+    SessionLockTimeoutError,
+    SessionStore,
+    create_session_store,
+)
+from app.services.persistence.write_behind import WriteBehindEventLog, create_session_log
+from app.services.tracing import flight, profiler
+from app.services.tracing.logs import configure_logging, shutdown_logging
+from app.services.tracing.otel import configure_tracing, shutdown_tracing, span
+from app.warmup import WarmupRunner, default_steps
 
 app = FastAPI(title="Reframe Edge API")
 
@@ -19,11 +41,42 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store active connections
+# Store active connections (per worker process)
 active_connections: dict[str, WebSocket] = {}
 
+_CONNECTIONS = REGISTRY.gauge(
+    "ws_connections", "Open WebSocket connections in this worker", fn=lambda: len(active_connections)
+)
+# Client frame types; anything else is counted as "other" to bound label values
+_CLIENT_FRAME_TYPES = frozenset({"init", "user_msg"})
+_SESSIONS = REGISTRY.counter("ws_sessions_total", "WebSocket sessions opened")
+_FRAMES = REGISTRY.counter("ws_frames_total", "WebSocket frames by direction and type", labels=("direction", "type"))
+# Buckets around the 1.5 s p95 turn target
+_TURN_SECONDS = REGISTRY.histogram(
+    "ws_turn_seconds",
+    "Latency of one user turn, by phase at the start of the turn",
+    labels=("phase",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
+# Orchestrator state is journaled to the session event log (SQLite, or Postgres
+# with SESSION_DB_URL) through the write-behind queue, and the shared store
+# (SESSION_STORE) holds the per-session locks, so any worker can serve any
+# session.  Created on startup; the manager keeps active sessions resident
+# and hibernates idle ones.
+session_store: SessionStore | None = None
+session_log: WriteBehindEventLog | None = None
+session_manager: SessionManager | None = None
+USE_STUBS = os.getenv("OFFLINE", "1") == "1"
+# Pre-created OpenAI threads for the Assistants backend (see THREAD_POOL_SIZE)
+thread_pool: ThreadPool | None = None
+
+# Cold-start warm-up; /ready reports 503 until every step has finished
+warmup = WarmupRunner(default_steps())
+_warmup_task: asyncio.Task | None = None
+
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -37,27 +90,130 @@ async def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+async def metrics():
+    return Response(content=exposition.render(), media_type=exposition.CONTENT_TYPE)
+
+
+def require_debug_token(authorization: str | None = Header(default=None)) -> None:
+    """Bearer auth for /debug routes; they do not exist unless DEBUG_TOKEN is set."""
+
+    token = os.getenv("DEBUG_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404)
+    if authorization is None or not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/debug/sessions/{session_id}/timeline", dependencies=[Depends(require_debug_token)])
+async def session_timeline(session_id: str):
+    """Turns of *session_id* recorded by the worker that serves this request.
+
+    Recorders are per worker process: with several workers, only the turns
+    this one ran are listed, and ``worker`` names its pid.
+    """
+
+    recorder = flight.get_recorder(session_id, create=False)
+    if recorder is None:
+        raise HTTPException(
+            status_code=404, detail=f"No turns recorded for this session in worker {os.getpid()}"
+        )
+    return {"session_id": session_id, "worker": os.getpid(), "turns": recorder.timeline()}
+
+
+def require_profiling() -> None:
+    """Profiling routes also need PROFILING_ENABLED=1 (404 otherwise)."""
+
+    if not profiler.enabled():
+        raise HTTPException(status_code=404)
+
+
+_PROFILING = [Depends(require_profiling), Depends(require_debug_token)]
+
+
+@app.get("/debug/profile/cpu", dependencies=_PROFILING)
+async def profile_cpu(
+    seconds: float = Query(default=10.0, gt=0, le=profiler.MAX_SECONDS),
+    interval_ms: float = Query(default=10.0, ge=1, le=1000),
+):
+    """Collapsed stacks of every thread, sampled for *seconds* (flamegraph input)."""
+
+    try:
+        stacks, samples = await asyncio.to_thread(profiler.sample_stacks, seconds, interval_ms / 1000)
+    except profiler.ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    return Response(content=stacks, media_type="text/plain", headers={"X-Profile-Samples": str(samples)})
+
+
+@app.get("/debug/profile/allocations", dependencies=_PROFILING)
+async def profile_allocations(
+    seconds: float = Query(default=5.0, ge=0, le=profiler.MAX_SECONDS),
+    top: int = Query(default=25, ge=1, le=500),
+):
+    """Top tracemalloc allocation sites over a *seconds* window."""
+
+    try:
+        return await asyncio.to_thread(profiler.allocation_snapshot, seconds, top)
+    except profiler.ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+
+@app.get("/ready")
+async def readiness_check():
+    report = warmup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+
+async def handle_user_message(session_id: str, user_message: str) -> tuple[str, str, dict]:
+    """Run one turn of *session_id* under its lock; return (reply, phase name, usage)."""
+
+    if session_manager is None:
+        raise RuntimeError("Session manager not initialised; startup has not run")
+    with flight.recording(session_id), span(
+        "ws.turn", **{"session.id": session_id, "message.chars": len(user_message)}
+    ) as turn:
+        start = time.perf_counter()
+        async with session_manager.session(session_id) as orchestrator:
+            phase_start = orchestrator.current_phase.value
+            turn.set_attribute("phase.start", phase_start)
+            action = await orchestrator.respond(user_message)
+            phase = orchestrator.current_phase.name
+            usage = orchestrator.usage.to_dict()
+        _TURN_SECONDS.labels(phase_start).observe(time.perf_counter() - start)
+        turn.set_attribute("phase.end", orchestrator.current_phase.value)
+    return action.get("message", ""), phase, usage
+
+
+async def _send(websocket: WebSocket, frame: dict) -> None:
+    _FRAMES.labels("out", frame["type"]).inc()
+    await websocket.send_json(frame)
+
+
 @app.websocket("/chat/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await websocket.accept()
     active_connections[session_id] = websocket
+    _SESSIONS.inc()
 
-    logger.info(f"WebSocket connection established for session: {session_id}")
+    logger.info("WebSocket connection established", extra={"session_id": session_id})
 
     try:
-        # Create orchestrator
-        orchestrator = OrchestratorAssistant(use_stubs=True)
-
         while True:
             # Receive message from client
             data = await websocket.receive_text()
             message = json.loads(data)
+            frame_type = message.get("type")
+            _FRAMES.labels("in", frame_type if frame_type in _CLIENT_FRAME_TYPES else "other").inc()
 
-            logger.info(f"Received message: {message}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Frame received",
+                    extra={"session_id": session_id, "frame_type": frame_type, "chars": len(data)},
+                )
 
             if message.get("type") == "init":
                 # Send acknowledgment
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "init_ack",
                     "session_id": session_id
                 })
@@ -65,36 +221,71 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             elif message.get("type") == "user_msg":
                 user_message = message.get("data", {}).get("message", "")
 
-                # Simple echo response for now
-                await websocket.send_json({
+                try:
+                    reply, phase, usage = await handle_user_message(session_id, user_message)
+                except SessionLockTimeoutError:
+                    await _send(websocket, {
+                        "type": "error",
+                        "data": {"session_id": session_id, "message": "Session busy, please retry"}
+                    })
+                    continue
+
+                await _send(websocket, {
                     "type": "assistant_stream",
                     "data": {
-                        "content": f"Echo: {user_message}",
-                        "phase": "S0_START"
+                        "content": reply,
+                        "phase": phase
                     }
                 })
 
                 # Send completion signal
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "complete",
                     "data": {
                         "session_id": session_id,
-                        "phase": "S0_START"
+                        "phase": phase,
+                        # Session totals so far (tokens and estimated USD)
+                        "usage": usage
                     }
                 })
 
     except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected for session: {session_id}")
+        logger.info("WebSocket disconnected", extra={"session_id": session_id})
         del active_connections[session_id]
     except Exception as e:
-        logger.error(f"WebSocket error for session {session_id}: {e!s}")
+        logger.error("WebSocket error", exc_info=e, extra={"session_id": session_id})
         active_connections.pop(session_id, None)
         await websocket.close()
 
 
 @app.on_event("startup")
 async def startup_event():
+    global _warmup_task, session_store, session_log, session_manager, thread_pool
     logger.info("Reframe Edge API started")
+    configure_tracing()
+    flight.install()
+    session_store = create_session_store()
+    session_log = create_session_log(shared=session_store.shared)
+    await session_log.start()
+    session_manager = SessionManager(
+        session_store,
+        session_log,
+        idle_seconds=float(os.getenv("SESSION_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)),
+        sweep_interval=float(os.getenv("SESSION_SWEEP_SECONDS", DEFAULT_SWEEP_SECONDS)),
+        snapshot_every=int(os.getenv("SESSION_SNAPSHOT_EVERY", DEFAULT_SNAPSHOT_EVERY)),
+        use_stubs=USE_STUBS,
+    )
+    session_manager.start()
+    if not USE_STUBS and os.getenv("OPENAI_API_KEY") and default_backend() == BACKEND_ASSISTANTS:
+        from app.assistants.client import get_openai_client
+
+        thread_pool = create_thread_pool(get_openai_client())
+        if thread_pool is not None:
+            set_thread_pool(thread_pool)
+            thread_pool.start()
+    # Warm up in the background so /health answers immediately while /ready
+    # holds traffic back until the expensive first-use costs are paid.
+    _warmup_task = asyncio.create_task(warmup.run())
 
 
 @app.on_event("shutdown")
@@ -103,3 +294,15 @@ async def shutdown_event():
     # Close all active connections
     for session_id, websocket in active_connections.items():
         await websocket.close()
+    if session_manager is not None:
+        await session_manager.close()
+    if session_log is not None:
+        # Flushes every queued journal write
+        await session_log.close()
+    if session_store is not None:
+        await session_store.close()
+    if thread_pool is not None:
+        set_thread_pool(None)
+        await thread_pool.close()
+    await shutdown_tracing()
+    shutdown_logging()
@@ -0,0 +1,57 @@
+"""Prometheus text exposition of a :class:`~.registry.Registry`.
+
+Scraping walks the registry and renders the current values; the hot path
+(``inc``/``observe``) is untouched, so serving ``/metrics`` adds no cost to
+turns.  Histogram buckets are stored per slot and made cumulative here.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import math
+
+from app.services.metrics.registry import REGISTRY, Counter, Gauge, Histogram, Registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: tuple[str, str] | None = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render(registry: Registry = REGISTRY) -> str:
+    """Return every metric of *registry* in the Prometheus text format."""
+
+    lines: list[str] = []
+    for metric in registry.metrics():
+        lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for values, child in metric.samples():
+            if isinstance(child, Histogram):
+                cumulative = 0
+                bounds = (*child.buckets, math.inf)
+                for bound, count in zip(bounds, list(child.bucket_counts), strict=True):
+                    cumulative += count
+                    le = _labels(metric.label_names, values, ("le", _format_value(bound)))
+                    lines.append(f"{metric.name}_bucket{le} {cumulative}")
+                labels = _labels(metric.label_names, values)
+                lines.append(f"{metric.name}_sum{labels} {_format_value(child.sum)}")
+                lines.append(f"{metric.name}_count{labels} {cumulative}")
+            elif isinstance(child, Counter | Gauge):
+                lines.append(f"{metric.name}{_labels(metric.label_names, values)} {_format_value(child.value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,203 @@
+"""Tiny in-process metrics registry (counters, gauges, histograms).
+
+The primitives are deliberately minimal: an update is a couple of attribute
+writes with no locking, so they are cheap enough to call on every turn.  We
+rely on the GIL for atomicity of the individual writes; an increment racing
+with another thread may occasionally be lost, which is acceptable for
+monitoring data.
+
+Metrics are registered once at import time of the module that owns them::
+
+    _HITS = REGISTRY.counter("prompt_cache_hits_total", "Prompt cache hits")
+    _HITS.inc()
+
+Labelled metrics return a cached child per label value tuple::
+
+    _LATENCY = REGISTRY.histogram("tool_seconds", "Tool latency", labels=("tool",))
+    _LATENCY.labels("collect_context").observe(0.012)
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from typing import Any
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    1.5,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _Metric:
+    """Base class handling names, help text and label children."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._children: dict[tuple[str, ...], Any] = {}
+
+    def labels(self, *values: str) -> Any:
+        """Return the child metric for *values* (created on first use)."""
+
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self) -> Any:  # pragma: no cover – overridden
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[tuple[tuple[str, ...], Any]]:
+        """Yield ``(label_values, child)`` pairs; unlabelled metrics yield ``((), self)``."""
+
+        if self.label_names:
+            yield from list(self._children.items())
+        else:
+            yield (), self
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self.value = 0.0
+
+    def _new_child(self) -> Counter:
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed on scrape."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        fn: Callable[[], float] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self._value = 0.0
+        self._fn = fn
+
+    def _new_child(self) -> Gauge:
+        return Gauge(self.name, self.documentation)
+
+    @property
+    def value(self) -> float:
+        return float(self._fn()) if self._fn is not None else self._value
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._value -= amount
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the gauge lazily from *fn* whenever it is read."""
+
+        self._fn = fn
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed bucket upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bound plus the implicit +Inf bucket.  Counts are stored
+        # per bucket (not cumulative) so an observation touches one slot only.
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self) -> Histogram:
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Named collection of metrics; names are unique within a registry."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))  # type: ignore[no-any-return]
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        fn: Callable[[], float] | None = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labels, fn))  # type: ignore[no-any-return]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(  # type: ignore[no-any-return]
+            Histogram(name, documentation, labels, buckets)
+        )
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+    def metrics(self) -> list[_Metric]:
+        return list(self._metrics.values())
+
+
+REGISTRY = Registry()
@@ -0,0 +1,57 @@
+"""Compact binary encoding for persisted session payloads.
+
+Layout::
+
+    magic      2 bytes  b"RS"
+    version    u8       FORMAT_VERSION
+    flags      u8       bit 0 = zlib-compressed body
+    body       …        compact UTF-8 JSON (optionally deflated)
+
+Small payloads (most per-turn events) are stored uncompressed because zlib's
+own header would outweigh the saving; snapshots cross the threshold quickly.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any
+import zlib
+
+MAGIC = b"RS"
+FORMAT_VERSION = 1
+FLAG_ZLIB = 0x01
+COMPRESS_THRESHOLD = 512
+
+_HEADER = struct.Struct("<2sBB")
+
+
+def encode(obj: Any, *, compress_threshold: int = COMPRESS_THRESHOLD, level: int = 6) -> bytes:
+    """Serialise *obj* to the compact binary format."""
+
+    body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    flags = 0
+    if len(body) >= compress_threshold:
+        deflated = zlib.compress(body, level)
+        if len(deflated) < len(body):
+            body, flags = deflated, FLAG_ZLIB
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, flags) + body
+
+
+def decode(data: bytes) -> Any:
+    """Inverse of :func:`encode`.
+
+    Raises:
+        ValueError: If *data* is not a payload of a supported format version
+    """
+
+    if len(data) < _HEADER.size:
+        raise ValueError("Payload too short")
+    magic, version, flags = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"Bad payload magic: {magic!r}")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported payload format version: {version}")
+    body = memoryview(data)[_HEADER.size :]
+    raw = zlib.decompress(body) if flags & FLAG_ZLIB else bytes(body)
+    return json.loads(raw)
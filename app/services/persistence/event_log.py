@@ -0,0 +1,450 @@
+"""Append-only event log plus periodic snapshots of orchestrator sessions.
+
+An :class:`~app.assistants.orchestrator_assistant.OrchestratorAssistant` lives
+in process memory; this module lets a session survive scale-in or a redeploy
+and resume on another instance.
+
+* Every :meth:`SessionJournal.record` call diffs the orchestrator against
+  what was last persisted and appends only the change (new transcript
+  messages, new tool results, phase/id updates) as one small event.
+* Every ``snapshot_every`` events the full state is written as a snapshot and
+  the events it covers are dropped, so the log per session stays short.
+* :func:`resume` reads the snapshot, replays the few events after it and
+  rebuilds the orchestrator.
+
+Payloads use the compact binary format from :mod:`.codec`.  The SQLite
+backend is a single-file stand-in for a shared database; calls are blocking
+(sub-millisecond in WAL mode), so async callers should wrap them in
+``asyncio.to_thread`` when latency matters.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from functools import lru_cache
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from app.services.metrics.registry import REGISTRY
+from app.services.persistence.codec import decode, encode
+
+if TYPE_CHECKING:
+    from app.assistants.orchestrator_assistant import OrchestratorAssistant
+    from app.core.transcript import CompactTranscript
+
+DEFAULT_SNAPSHOT_EVERY = 32
+DEFAULT_LOG_PATH = "sessions.sqlite3"
+
+_BYTES_WRITTEN = REGISTRY.counter(
+    "session_log_bytes_total", "Bytes written to the session event log", labels=("kind",)
+)
+_RESUME_SECONDS = REGISTRY.histogram(
+    "session_resume_seconds", "Time to load and replay a persisted session"
+)
+
+# Scalar snapshot keys that are copied into an event whenever they change
+_SCALAR_KEYS = ("phase", "assistant_id", "thread_id", "intake_json", "reframe_json", "usage")
+
+
+# ---------------------------------------------------------------------------
+# Storage backends
+# ---------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class StoredSession:
+    """Raw persisted records of one session."""
+
+    snapshot_seq: int
+    snapshot: bytes | None
+    events: list[tuple[int, bytes]]
+
+    @property
+    def last_seq(self) -> int:
+        return self.events[-1][0] if self.events else self.snapshot_seq
+
+
+@dataclass(slots=True)
+class SessionWrite:
+    """Pending writes of one session: an optional snapshot, then later events."""
+
+    session_id: str
+    snapshot: tuple[int, bytes] | None = None
+    events: list[tuple[int, bytes]] = field(default_factory=list)
+
+
+class EventSink(ABC):
+    """Write side of a log: what :class:`SessionJournal` needs."""
+
+    @abstractmethod
+    def append(self, session_id: str, seq: int, payload: bytes) -> None:
+        """Append event *seq* of *session_id*."""
+
+    @abstractmethod
+    def put_snapshot(self, session_id: str, seq: int, payload: bytes) -> None:
+        """Store a snapshot covering events up to *seq* and drop those events."""
+
+
+class EventLog(EventSink):
+    """Storage for per-session snapshots and the events recorded after them."""
+
+    @abstractmethod
+    def load(self, session_id: str) -> StoredSession | None:
+        """Return the latest snapshot and later events, or ``None`` if unknown."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Forget everything stored for *session_id*."""
+
+    def write_batch(self, writes: list[SessionWrite]) -> None:
+        """Apply several sessions' writes; backends override to use one transaction."""
+
+        for write in writes:
+            if write.snapshot is not None:
+                self.put_snapshot(write.session_id, *write.snapshot)
+            for seq, payload in write.events:
+                self.append(write.session_id, seq, payload)
+
+    def close(self) -> None:
+        """Release backend resources (optional hook)."""
+
+
+class MemoryEventLog(EventLog):
+    """Process-local event log for a single worker (``SESSION_STORE=memory``) and tests."""
+
+    def __init__(self) -> None:
+        # Guarded: ThreadedEventLog calls in from executor threads
+        self._lock = threading.Lock()
+        self._snapshots: dict[str, tuple[int, bytes]] = {}
+        self._events: dict[str, dict[int, bytes]] = {}
+
+    def append(self, session_id: str, seq: int, payload: bytes) -> None:
+        with self._lock:
+            self._events.setdefault(session_id, {})[seq] = payload
+
+    def put_snapshot(self, session_id: str, seq: int, payload: bytes) -> None:
+        with self._lock:
+            self._snapshots[session_id] = (seq, payload)
+            events = self._events.get(session_id)
+            if events:
+                self._events[session_id] = {n: p for n, p in events.items() if n > seq}
+
+    def load(self, session_id: str) -> StoredSession | None:
+        with self._lock:
+            snapshot_seq, snapshot = self._snapshots.get(session_id, (0, None))
+            events = sorted(
+                (n, p) for n, p in self._events.get(session_id, {}).items() if n > snapshot_seq
+            )
+        if snapshot is None and not events:
+            return None
+        return StoredSession(snapshot_seq, snapshot, events)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._snapshots.pop(session_id, None)
+            self._events.pop(session_id, None)
+
+
+class SQLiteEventLog(EventLog):
+    """Event log in a local SQLite file (WAL mode, one shared connection)."""
+
+    _UPSERT_SNAPSHOT = (
+        "INSERT INTO session_snapshots (session_id, seq, payload) VALUES (?, ?, ?) "
+        "ON CONFLICT (session_id) DO UPDATE SET seq = excluded.seq, payload = excluded.payload"
+    )
+    _DROP_COVERED = "DELETE FROM session_events WHERE session_id = ? AND seq <= ?"
+    # Idempotent so a retried batch that had already committed does not conflict
+    _INSERT_EVENT = "INSERT OR REPLACE INTO session_events (session_id, seq, payload) VALUES (?, ?, ?)"
+
+    def __init__(self, path: str = DEFAULT_LOG_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS session_snapshots (
+                session_id TEXT PRIMARY KEY,
+                seq        INTEGER NOT NULL,
+                payload    BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS session_events (
+                session_id TEXT NOT NULL,
+                seq        INTEGER NOT NULL,
+                payload    BLOB NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    def _transaction(self, writes: list[SessionWrite]) -> None:
+        conn = self._conn
+        with self._lock:
+            conn.execute("BEGIN")
+            try:
+                for write in writes:
+                    if write.snapshot is not None:
+                        seq, payload = write.snapshot
+                        conn.execute(self._UPSERT_SNAPSHOT, (write.session_id, seq, payload))
+                        conn.execute(self._DROP_COVERED, (write.session_id, seq))
+                    if write.events:
+                        conn.executemany(
+                            self._INSERT_EVENT,
+                            [(write.session_id, seq, payload) for seq, payload in write.events],
+                        )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def append(self, session_id: str, seq: int, payload: bytes) -> None:
+        with self._lock:
+            self._conn.execute(self._INSERT_EVENT, (session_id, seq, payload))
+
+    def put_snapshot(self, session_id: str, seq: int, payload: bytes) -> None:
+        self._transaction([SessionWrite(session_id, (seq, payload))])
+
+    def write_batch(self, writes: list[SessionWrite]) -> None:
+        self._transaction(writes)
+
+    def load(self, session_id: str) -> StoredSession | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq, payload FROM session_snapshots WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            snapshot_seq, snapshot = row if row else (0, None)
+            events = self._conn.execute(
+                "SELECT seq, payload FROM session_events WHERE session_id = ? AND seq > ? ORDER BY seq",
+                (session_id, snapshot_seq),
+            ).fetchall()
+        if snapshot is None and not events:
+            return None
+        return StoredSession(snapshot_seq, snapshot, events)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM session_snapshots WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM session_events WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@lru_cache
+def get_event_log() -> EventLog:
+    """Return the process-wide event log (path from ``SESSION_LOG_PATH``)."""
+
+    return SQLiteEventLog(os.getenv("SESSION_LOG_PATH", DEFAULT_LOG_PATH))
+
+
+# ---------------------------------------------------------------------------
+# Diff / replay
+# ---------------------------------------------------------------------------
+
+
+def apply_event(state: dict[str, Any], event: dict[str, Any]) -> None:
+    """Apply one recorded *event* to a snapshot-shaped *state* in place."""
+
+    for key in _SCALAR_KEYS:
+        if key in event:
+            state[key] = event[key]
+    if "messages" in event:
+        offset, rows = event["messages"]
+        del state["transcript"][offset:]
+        state["transcript"].extend(rows)
+    if event.get("tool_results_reset"):
+        state["tool_results"] = {}
+    if "tool_results" in event:
+        state["tool_results"].update(event["tool_results"])
+
+
+def merge_events(older: dict[str, Any], newer: dict[str, Any]) -> dict[str, Any]:
+    """Combine two consecutive events into one with the same replay effect."""
+
+    merged = dict(older)
+    for key in _SCALAR_KEYS:
+        if key in newer:
+            merged[key] = newer[key]
+    if "messages" in newer:
+        new_offset, new_rows = newer["messages"]
+        if "messages" in merged and new_offset >= merged["messages"][0]:
+            offset, rows = merged["messages"]
+            merged["messages"] = [offset, rows[: new_offset - offset] + new_rows]
+        else:
+            merged["messages"] = newer["messages"]
+    if newer.get("tool_results_reset"):
+        merged["tool_results_reset"] = True
+        merged["tool_results"] = dict(newer.get("tool_results") or {})
+    elif "tool_results" in newer:
+        merged["tool_results"] = {**merged.get("tool_results", {}), **newer["tool_results"]}
+    return merged
+
+
+@dataclass(slots=True)
+class _Mark:
+    """What the journal last persisted, kept to diff the next call against."""
+
+    scalars: dict[str, Any]
+    transcript: CompactTranscript
+    transcript_len: int
+    tool_results: dict[str, Any]
+
+
+def _scalars(orchestrator: OrchestratorAssistant) -> dict[str, Any]:
+    state = orchestrator.session_state
+    return {
+        "phase": orchestrator.current_phase.value,
+        "assistant_id": orchestrator.assistant_id,
+        "thread_id": orchestrator.thread_id,
+        "intake_json": dict(state.intake_json) if state.intake_json is not None else None,
+        "reframe_json": dict(state.reframe_json) if state.reframe_json is not None else None,
+        "usage": orchestrator.usage.to_dict(),
+    }
+
+
+class SessionJournal:
+    """Persists one orchestrator session as events plus periodic snapshots."""
+
+    def __init__(
+        self,
+        log: EventSink,
+        session_id: str,
+        *,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        seq: int = 0,
+        pending: int = 0,
+    ) -> None:
+        self.log = log
+        self.session_id = session_id
+        self.snapshot_every = snapshot_every
+        self.seq = seq
+        self.pending = pending  # events written since the last snapshot
+        self._mark: _Mark | None = None
+
+    def _remember(self, orchestrator: OrchestratorAssistant) -> None:
+        transcript = orchestrator.session_state.transcript
+        self._mark = _Mark(
+            _scalars(orchestrator), transcript, len(transcript), dict(orchestrator.tool_results)
+        )
+
+    def _diff(self, orchestrator: OrchestratorAssistant) -> dict[str, Any]:
+        mark = self._mark
+        assert mark is not None
+        event: dict[str, Any] = {}
+
+        for key, value in _scalars(orchestrator).items():
+            if value != mark.scalars[key]:
+                event[key] = value
+
+        transcript = orchestrator.session_state.transcript
+        if transcript is not mark.transcript or len(transcript) < mark.transcript_len:
+            event["messages"] = [0, transcript.rows()]  # replaced (e.g. reset())
+        elif len(transcript) > mark.transcript_len:
+            event["messages"] = [mark.transcript_len, transcript.rows(mark.transcript_len)]
+
+        results = orchestrator.tool_results
+        if any(name not in results for name in mark.tool_results):
+            event["tool_results_reset"] = True
+            changed = dict(results)
+        else:
+            changed = {
+                name: value
+                for name, value in results.items()
+                if name not in mark.tool_results or mark.tool_results[name] is not value
+            }
+        if changed:
+            event["tool_results"] = changed
+        return event
+
+    def checkpoint(self, orchestrator: OrchestratorAssistant) -> int:
+        """Write a full snapshot now; return the number of bytes written."""
+
+        self.seq += 1
+        payload = encode(orchestrator.snapshot())
+        self.log.put_snapshot(self.session_id, self.seq, payload)
+        self.pending = 0
+        self._remember(orchestrator)
+        _BYTES_WRITTEN.labels("snapshot").inc(len(payload))
+        return len(payload)
+
+    def record(self, orchestrator: OrchestratorAssistant) -> int:
+        """Persist what changed since the last call; return bytes written."""
+
+        if self._mark is None or self.pending >= self.snapshot_every:
+            return self.checkpoint(orchestrator)
+        event = self._diff(orchestrator)
+        if not event:
+            return 0
+        self.seq += 1
+        payload = encode(event)
+        self.log.append(self.session_id, self.seq, payload)
+        self.pending += 1
+        self._remember(orchestrator)
+        _BYTES_WRITTEN.labels("event").inc(len(payload))
+        return len(payload)
+
+
+def replay(session_id: str, stored: StoredSession) -> dict[str, Any]:
+    """Return the snapshot-shaped state after replaying *stored* events."""
+
+    if stored.snapshot is None:
+        # Events without a snapshot cannot be replayed; the journal always
+        # starts with a snapshot, so this only happens after manual edits.
+        raise ValueError(f"Session {session_id!r} has events but no snapshot")
+    state = decode(stored.snapshot)
+    for _, payload in stored.events:
+        apply_event(state, decode(payload))
+    return state
+
+
+def restore_stored(
+    log: EventSink,
+    session_id: str,
+    stored: StoredSession,
+    *,
+    snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+    **restore_kwargs: Any,
+) -> tuple[OrchestratorAssistant, SessionJournal]:
+    """Replay *stored* into an orchestrator and a journal appending to *log*."""
+
+    from app.assistants.orchestrator_assistant import OrchestratorAssistant
+
+    state = replay(session_id, stored)
+    orchestrator = OrchestratorAssistant.restore(state, **restore_kwargs)
+    journal = SessionJournal(
+        log,
+        session_id,
+        snapshot_every=snapshot_every,
+        seq=stored.last_seq,
+        pending=len(stored.events),
+    )
+    journal._remember(orchestrator)
+    return orchestrator, journal
+
+
+def resume(
+    log: EventLog,
+    session_id: str,
+    *,
+    snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+    **restore_kwargs: Any,
+) -> tuple[OrchestratorAssistant, SessionJournal] | None:
+    """Rebuild a persisted session and a journal that continues its log.
+
+    ``restore_kwargs`` are passed to :meth:`OrchestratorAssistant.restore`.
+    Returns ``None`` when nothing is stored for *session_id*.
+    """
+
+    start = time.perf_counter()
+    stored = log.load(session_id)
+    if stored is None:
+        return None
+    resumed = restore_stored(log, session_id, stored, snapshot_every=snapshot_every, **restore_kwargs)
+    _RESUME_SECONDS.observe(time.perf_counter() - start)
+    return resumed
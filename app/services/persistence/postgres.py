@@ -0,0 +1,142 @@
+"""Pooled asyncpg backend for the session event log.
+
+Used behind :class:`~app.services.persistence.write_behind.WriteBehindEventLog`:
+one flush is one transaction with three statements (upsert snapshots, drop
+covered events, insert events), each executed with ``executemany`` over every
+dirty session.  asyncpg prepares a statement once per connection and keeps it
+in its statement cache.
+
+Pool sizing: with write-behind, each worker has at most one flush in flight
+plus occasional resume reads, so a small pool (default 1–4 connections per
+worker) is enough and keeps ``workers × max_size`` below the database's
+connection limit.  Behind Supabase's transaction-mode pooler (port 6543)
+server-side prepared statements are unavailable; set
+``SESSION_DB_STATEMENT_CACHE=0`` there.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Any
+
+from app.services.persistence.event_log import SessionWrite, StoredSession
+from app.services.persistence.write_behind import AsyncEventLog
+
+if TYPE_CHECKING:
+    import asyncpg
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_snapshots (
+    session_id TEXT PRIMARY KEY,
+    seq        BIGINT NOT NULL,
+    payload    BYTEA NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_events (
+    session_id TEXT NOT NULL,
+    seq        BIGINT NOT NULL,
+    payload    BYTEA NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+"""
+
+_UPSERT_SNAPSHOT = """
+INSERT INTO session_snapshots (session_id, seq, payload) VALUES ($1, $2, $3)
+ON CONFLICT (session_id) DO UPDATE SET seq = EXCLUDED.seq, payload = EXCLUDED.payload
+"""
+_DROP_COVERED = "DELETE FROM session_events WHERE session_id = $1 AND seq <= $2"
+# Idempotent so a retried batch that had already committed does not conflict
+_INSERT_EVENT = """
+INSERT INTO session_events (session_id, seq, payload) VALUES ($1, $2, $3)
+ON CONFLICT (session_id, seq) DO UPDATE SET payload = EXCLUDED.payload
+"""
+_SELECT_SNAPSHOT = "SELECT seq, payload FROM session_snapshots WHERE session_id = $1"
+_SELECT_EVENTS = (
+    "SELECT seq, payload FROM session_events WHERE session_id = $1 AND seq > $2 ORDER BY seq"
+)
+
+
+class PostgresEventLog(AsyncEventLog):
+    """Session snapshots and events in Postgres through an asyncpg pool."""
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        min_size: int = 1,
+        max_size: int = 4,
+        statement_cache_size: int = 100,
+        command_timeout: float = 10.0,
+    ) -> None:
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.command_timeout = command_timeout
+        self._pool: asyncpg.Pool | None = None
+
+    @classmethod
+    def from_env(cls, dsn: str) -> PostgresEventLog:
+        return cls(
+            dsn,
+            min_size=int(os.getenv("SESSION_DB_POOL_MIN", "1")),
+            max_size=int(os.getenv("SESSION_DB_POOL_MAX", "4")),
+            statement_cache_size=int(os.getenv("SESSION_DB_STATEMENT_CACHE", "100")),
+        )
+
+    @property
+    def pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            raise RuntimeError("PostgresEventLog.open() has not been awaited")
+        return self._pool
+
+    async def open(self) -> None:
+        if self._pool is not None:
+            return
+        import asyncpg
+
+        self._pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size,
+            command_timeout=self.command_timeout,
+        )
+        async with self._pool.acquire() as conn:
+            await conn.execute(_SCHEMA)
+
+    async def write_batch(self, writes: list[SessionWrite]) -> None:
+        snapshots: list[tuple[Any, ...]] = []
+        covered: list[tuple[Any, ...]] = []
+        events: list[tuple[Any, ...]] = []
+        for write in writes:
+            if write.snapshot is not None:
+                seq, payload = write.snapshot
+                snapshots.append((write.session_id, seq, payload))
+                covered.append((write.session_id, seq))
+            events.extend((write.session_id, seq, payload) for seq, payload in write.events)
+
+        async with self.pool.acquire() as conn, conn.transaction():
+            if snapshots:
+                await conn.executemany(_UPSERT_SNAPSHOT, snapshots)
+                await conn.executemany(_DROP_COVERED, covered)
+            if events:
+                await conn.executemany(_INSERT_EVENT, events)
+
+    async def load(self, session_id: str) -> StoredSession | None:
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow(_SELECT_SNAPSHOT, session_id)
+            snapshot_seq, snapshot = (row["seq"], bytes(row["payload"])) if row else (0, None)
+            rows = await conn.fetch(_SELECT_EVENTS, session_id, snapshot_seq)
+        if snapshot is None and not rows:
+            return None
+        return StoredSession(snapshot_seq, snapshot, [(r["seq"], bytes(r["payload"])) for r in rows])
+
+    async def delete(self, session_id: str) -> None:
+        async with self.pool.acquire() as conn, conn.transaction():
+            await conn.execute("DELETE FROM session_snapshots WHERE session_id = $1", session_id)
+            await conn.execute("DELETE FROM session_events WHERE session_id = $1", session_id)
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
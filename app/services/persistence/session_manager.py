@@ -0,0 +1,264 @@
+"""Resident tier of orchestrator sessions on top of the session journal.
+
+A WebSocket connection lives on one worker, so while a user is chatting the
+worker keeps the session's :class:`OrchestratorAssistant` resident together
+with its :class:`~.event_log.SessionJournal`.  Every frame runs under the
+session's lock in the :class:`SessionStore` and ends with
+:meth:`SessionJournal.record`: only what changed is appended as an event (a
+full snapshot every ``snapshot_every`` events) to the
+:class:`~.write_behind.WriteBehindEventLog`, which batches it to SQLite or
+Postgres off the request path.
+
+Users often leave the chat open (typically at ``S5_PDF_OFFER``) and come
+back minutes later; sessions idle for longer than ``idle_seconds`` are
+*hibernated*: their pending journal writes are flushed and they are dropped
+from memory.  The next frame for that ``session_id`` – on this worker or any
+other – resumes it from the log (snapshot + replayed events).
+
+With a shared store, the frame also records the journal *head* (its latest
+sequence number) in the store.  A resident copy is used only while the head
+is still the one this worker wrote; otherwise the session moved to another
+worker and back, and is resumed from the log.  Because the log trails the
+head by up to the write-behind delay, a resume waits (up to
+``handoff_seconds``) for the previous owner's writes to land before replaying.
+A single-process memory store skips the head: the resident copy is always
+current.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any
+
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.services.metrics.registry import REGISTRY
+from app.services.persistence.event_log import (
+    DEFAULT_SNAPSHOT_EVERY,
+    SessionJournal,
+    StoredSession,
+    restore_stored,
+)
+from app.services.persistence.session_store import SessionStore
+from app.services.persistence.write_behind import WriteBehindEventLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_SECONDS = 120.0
+DEFAULT_SWEEP_SECONDS = 15.0
+DEFAULT_HANDOFF_SECONDS = 2.0
+
+_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+_RESIDENT = REGISTRY.gauge("sessions_resident", "Orchestrator sessions resident in worker memory")
+_HIBERNATE_SECONDS = REGISTRY.histogram(
+    "session_hibernate_seconds", "Time to hibernate one idle session", buckets=_LATENCY_BUCKETS
+)
+_REHYDRATE_SECONDS = REGISTRY.histogram(
+    "session_rehydrate_seconds", "Time to rehydrate a session from the event log", buckets=_LATENCY_BUCKETS
+)
+_HANDOFF_LAGGED = REGISTRY.counter(
+    "session_handoff_lagged_total", "Resumes that gave up waiting for the previous owner's writes"
+)
+
+
+@dataclass(slots=True)
+class _Resident:
+    orchestrator: OrchestratorAssistant
+    journal: SessionJournal
+    last_used: float
+    busy: int = 0
+
+
+class SessionManager:
+    """Serve orchestrators per frame from memory, the event log, or a fresh start."""
+
+    def __init__(
+        self,
+        store: SessionStore,
+        log: WriteBehindEventLog,
+        *,
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        sweep_interval: float = DEFAULT_SWEEP_SECONDS,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        handoff_seconds: float = DEFAULT_HANDOFF_SECONDS,
+        use_stubs: bool = False,
+    ) -> None:
+        self.store = store
+        self.log = log
+        self.idle_seconds = idle_seconds
+        self.sweep_interval = sweep_interval
+        self.snapshot_every = snapshot_every
+        self.handoff_seconds = handoff_seconds
+        self.use_stubs = use_stubs
+        self._resident: dict[str, _Resident] = {}
+        self._task: asyncio.Task | None = None
+        self.hibernations = 0
+        self.rehydrations = 0
+
+    @property
+    def resident(self) -> int:
+        return len(self._resident)
+
+    def is_resident(self, session_id: str) -> bool:
+        return session_id in self._resident
+
+    def _update_gauge(self) -> None:
+        _RESIDENT.set(len(self._resident))
+
+    # ------------------------------------------------------------------
+    # Per-frame access
+    # ------------------------------------------------------------------
+    async def _load(self, session_id: str, head: int | None) -> StoredSession | None:
+        """Read the log, waiting for it to catch up with *head* if it trails."""
+
+        deadline = time.monotonic() + self.handoff_seconds
+        while True:
+            stored = await self.log.load(session_id)
+            last_seq = stored.last_seq if stored is not None else 0
+            if head is None or last_seq >= head:
+                return stored
+            if time.monotonic() >= deadline:
+                # The previous owner died with writes still queued.
+                _HANDOFF_LAGGED.inc()
+                logger.warning(
+                    "Session log behind its head; resuming from the log",
+                    extra={"session_id": session_id, "head": head, "log_seq": last_seq},
+                )
+                return stored
+            await asyncio.sleep(min(0.01, self.log.max_delay))
+
+    async def _resume(self, session_id: str, head: int | None) -> _Resident:
+        stored = await self._load(session_id, head)
+        if stored is None:
+            orchestrator = OrchestratorAssistant(use_stubs=self.use_stubs)
+            journal = SessionJournal(self.log, session_id, snapshot_every=self.snapshot_every)
+        else:
+            start = time.perf_counter()
+            orchestrator, journal = restore_stored(
+                self.log, session_id, stored, snapshot_every=self.snapshot_every, use_stubs=self.use_stubs
+            )
+            _REHYDRATE_SECONDS.observe(time.perf_counter() - start)
+            self.rehydrations += 1
+        if head is not None and journal.seq < head:
+            # Continue above the lost writes and start over with a snapshot,
+            # which also supersedes them should they still land.
+            journal.seq = head
+            journal.pending = journal.snapshot_every
+        return _Resident(orchestrator, journal, time.monotonic())
+
+    async def _checkout(self, session_id: str) -> tuple[_Resident, int | None]:
+        head = await self.store.get_head(session_id) if self.store.shared else None
+        entry = self._resident.get(session_id)
+        if entry is not None and (head is None or head == entry.journal.seq):
+            return entry, head
+
+        entry = await self._resume(session_id, head)
+        self._resident[session_id] = entry
+        self._update_gauge()
+        return entry, head
+
+    @asynccontextmanager
+    async def session(self, session_id: str) -> AsyncIterator[OrchestratorAssistant]:
+        """Lock *session_id* and yield its orchestrator; journal the changes on exit."""
+
+        async with self.store.lock(session_id):
+            entry, head = await self._checkout(session_id)
+            entry.busy += 1
+            try:
+                try:
+                    yield entry.orchestrator
+                except BaseException:
+                    # Partially mutated; the log still has the last recorded state.
+                    self._resident.pop(session_id, None)
+                    self._update_gauge()
+                    raise
+                entry.journal.record(entry.orchestrator)
+                if self.store.shared and entry.journal.seq != head:
+                    await self.store.set_head(session_id, entry.journal.seq)
+            finally:
+                entry.busy -= 1
+                entry.last_used = time.monotonic()
+
+    async def turn(self, session_id: str, user_message: str | None) -> dict[str, Any]:
+        """Run one turn and return the resulting action."""
+
+        async with self.session(session_id) as orchestrator:
+            return await orchestrator.respond(user_message)
+
+    # ------------------------------------------------------------------
+    # Hibernation
+    # ------------------------------------------------------------------
+    async def hibernate(self, session_id: str, *, idle_before: float | None = None) -> bool:
+        """Flush the journal writes of one resident session and drop it.
+
+        With *idle_before*, the session is kept if it was used after that
+        (monotonic) time, e.g. by a frame that arrived while we waited for the lock.
+        """
+
+        async with self.store.lock(session_id):
+            entry = self._resident.get(session_id)
+            if entry is None or entry.busy:
+                return False
+            if idle_before is not None and entry.last_used > idle_before:
+                return False
+            start = time.perf_counter()
+            await self.log.flush_session(session_id)
+            del self._resident[session_id]
+            _HIBERNATE_SECONDS.observe(time.perf_counter() - start)
+        self.hibernations += 1
+        self._update_gauge()
+        return True
+
+    async def hibernate_idle(self, now: float | None = None) -> int:
+        """Hibernate every session idle for longer than ``idle_seconds``."""
+
+        cutoff = (time.monotonic() if now is None else now) - self.idle_seconds
+        idle = [sid for sid, entry in self._resident.items() if not entry.busy and entry.last_used <= cutoff]
+        count = 0
+        for session_id in idle:
+            try:
+                if await self.hibernate(session_id, idle_before=cutoff):
+                    count += 1
+            except Exception:
+                logger.exception("Failed to hibernate session %s", session_id)
+        return count
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.hibernate_idle()
+
+    def start(self) -> None:
+        """Start the background idle sweep on the running loop."""
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep(), name="session-hibernation")
+
+    async def close(self) -> None:
+        """Stop sweeping and drop every resident session.
+
+        Every frame is already journaled; close the log afterwards
+        (:meth:`WriteBehindEventLog.close`) to flush what is still queued.
+        """
+
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._resident.clear()
+        self._update_gauge()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "resident": len(self._resident),
+            "hibernations": self.hibernations,
+            "rehydrations": self.rehydrations,
+            "idle_seconds": self.idle_seconds,
+            "shared": self.store.shared,
+        }
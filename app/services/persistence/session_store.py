@@ -0,0 +1,318 @@
+"""Per-session locks and journal heads shared by the uvicorn workers.
+
+Session *state* lives in the event log (:mod:`.event_log` journal deltas
+plus periodic snapshots, written through :mod:`.write_behind`); this store
+only coordinates the workers that serve it:
+
+* an exclusive per-session lock, held for the duration of one frame, so frames
+  of one conversation may land on different workers without interleaving;
+* the session's *head* – the journal sequence number of its latest write –
+  recorded when a frame releases the session.  The log lags behind by up to
+  the write-behind delay, so the next worker compares the head with what the
+  log returns to tell an up-to-date resident copy or log from a stale one
+  (see :class:`~.session_manager.SessionManager`).
+
+Backends
+--------
+* :class:`MemorySessionStore` – dict + ``asyncio.Lock``; single process only
+  (tests, ``--workers 1``).
+* :class:`SQLiteSessionStore` – WAL-mode file shared by the workers of one
+  container; locks are lease rows so a crashed worker cannot wedge a session.
+* :class:`RedisSessionStore` – any Redis-protocol server (Redis, Valkey,
+  Memorystore); required when sessions must move between instances.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+from contextlib import asynccontextmanager
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+import uuid
+
+from app.services.metrics.registry import REGISTRY
+
+# Separate from the event log's file (event_log.DEFAULT_LOG_PATH)
+DEFAULT_STORE_PATH = "session_locks.sqlite3"
+DEFAULT_LOCK_TIMEOUT = 10.0
+DEFAULT_LEASE_SECONDS = 30.0
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+_LOCK_WAIT = REGISTRY.histogram(
+    "session_lock_wait_seconds", "Time spent waiting for a session lock", labels=("backend",)
+)
+
+
+class SessionLockTimeoutError(TimeoutError):
+    """Raised when a session lock cannot be acquired in time."""
+
+
+class SessionStore(ABC):
+    """Per-session locks plus the journal head of each session."""
+
+    backend = "abstract"
+    # Whether other processes see this store (False only for the memory backend)
+    shared = True
+
+    @abstractmethod
+    async def get_head(self, session_id: str) -> int | None:
+        """Return the journal sequence last recorded for *session_id*, or ``None``."""
+
+    @abstractmethod
+    async def set_head(self, session_id: str, seq: int) -> None:
+        """Record *seq* as the latest journal sequence of *session_id*."""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """Forget *session_id*."""
+
+    @abstractmethod
+    def _lock(self, session_id: str, timeout: float) -> Any:
+        """Return the backend's async lock context manager."""
+
+    @asynccontextmanager
+    async def lock(self, session_id: str, timeout: float = DEFAULT_LOCK_TIMEOUT) -> AsyncIterator[None]:
+        """Hold the exclusive lock of *session_id* across all workers.
+
+        Raises:
+            SessionLockTimeoutError: If the lock is not acquired within *timeout* seconds
+        """
+
+        start = time.perf_counter()
+        async with self._lock(session_id, timeout):
+            _LOCK_WAIT.labels(self.backend).observe(time.perf_counter() - start)
+            yield
+
+    async def close(self) -> None:  # noqa: B027 – optional hook
+        """Release backend resources."""
+
+
+# ---------------------------------------------------------------------------
+# In-memory
+# ---------------------------------------------------------------------------
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store; sessions are not shared between workers."""
+
+    backend = "memory"
+    shared = False
+
+    def __init__(self) -> None:
+        self._heads: dict[str, int] = {}
+        # session_id → [lock, holders + waiters]; dropped when nobody uses it
+        self._locks: dict[str, list[Any]] = {}
+
+    async def get_head(self, session_id: str) -> int | None:
+        return self._heads.get(session_id)
+
+    async def set_head(self, session_id: str, seq: int) -> None:
+        self._heads[session_id] = seq
+
+    async def delete(self, session_id: str) -> None:
+        self._heads.pop(session_id, None)
+
+    @asynccontextmanager
+    async def _lock(self, session_id: str, timeout: float) -> AsyncIterator[None]:
+        entry = self._locks.setdefault(session_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            try:
+                await asyncio.wait_for(entry[0].acquire(), timeout)
+            except TimeoutError:
+                raise SessionLockTimeoutError(f"Session {session_id!r} is locked") from None
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[session_id]
+
+
+# ---------------------------------------------------------------------------
+# SQLite (WAL)
+# ---------------------------------------------------------------------------
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a WAL-mode SQLite file shared by the workers of one host.
+
+    Locks are rows in ``session_locks`` with an owner token and an expiry
+    (``lease_seconds``): a worker that dies mid-frame blocks its session for
+    at most one lease.  Coroutines of the same worker first queue on a local
+    ``asyncio.Lock`` so only one of them polls the table.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, *, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._db_lock = threading.Lock()
+        self._local = MemorySessionStore()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS session_heads (
+                session_id TEXT PRIMARY KEY,
+                seq        INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS session_locks (
+                session_id TEXT PRIMARY KEY,
+                owner      TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+
+    def _execute(self, sql: str, params: tuple[Any, ...]) -> sqlite3.Cursor:
+        with self._db_lock:
+            return self._conn.execute(sql, params)
+
+    def _fetchone(self, sql: str, params: tuple[Any, ...]) -> tuple[Any, ...] | None:
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    async def get_head(self, session_id: str) -> int | None:
+        row = await asyncio.to_thread(
+            self._fetchone, "SELECT seq FROM session_heads WHERE session_id = ?", (session_id,)
+        )
+        return int(row[0]) if row else None
+
+    async def set_head(self, session_id: str, seq: int) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO session_heads (session_id, seq, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET seq = excluded.seq, updated_at = excluded.updated_at",
+            (session_id, seq, time.time()),
+        )
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM session_heads WHERE session_id = ?", (session_id,))
+
+    def _try_acquire(self, session_id: str, owner: str) -> bool:
+        now = time.time()
+        cursor = self._execute(
+            "INSERT INTO session_locks (session_id, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE session_locks.expires_at < ?",
+            (session_id, owner, now + self.lease_seconds, now),
+        )
+        return cursor.rowcount == 1
+
+    def _release(self, session_id: str, owner: str) -> None:
+        self._execute("DELETE FROM session_locks WHERE session_id = ? AND owner = ?", (session_id, owner))
+
+    @asynccontextmanager
+    async def _lock(self, session_id: str, timeout: float) -> AsyncIterator[None]:
+        deadline = time.monotonic() + timeout
+        async with self._local._lock(session_id, timeout):
+            owner = uuid.uuid4().hex
+            delay = 0.002
+            while not await asyncio.to_thread(self._try_acquire, session_id, owner):
+                if time.monotonic() + delay > deadline:
+                    raise SessionLockTimeoutError(f"Session {session_id!r} is locked")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.05)
+            try:
+                yield
+            finally:
+                await asyncio.to_thread(self._release, session_id, owner)
+
+    async def close(self) -> None:
+        with self._db_lock:
+            self._conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Redis protocol
+# ---------------------------------------------------------------------------
+
+
+class RedisSessionStore(SessionStore):
+    """Sessions in a Redis-protocol server with ``SET NX PX`` lease locks."""
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        url: str | None = None,
+        *,
+        client: Any = None,
+        prefix: str = "reframe:session:",
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ) -> None:
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url or "redis://localhost:6379/0")
+        self._client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+
+    async def get_head(self, session_id: str) -> int | None:
+        value = await self._client.get(self.prefix + session_id)
+        return int(value) if value is not None else None
+
+    async def set_head(self, session_id: str, seq: int) -> None:
+        await self._client.set(self.prefix + session_id, seq, ex=self.ttl_seconds)
+
+    async def delete(self, session_id: str) -> None:
+        await self._client.delete(self.prefix + session_id)
+
+    @asynccontextmanager
+    async def _lock(self, session_id: str, timeout: float) -> AsyncIterator[None]:
+        from redis.exceptions import LockError
+
+        lock = self._client.lock(
+            f"{self.prefix}{session_id}:lock",
+            timeout=self.lease_seconds,
+            sleep=0.005,
+            blocking_timeout=timeout,
+        )
+        if not await lock.acquire():
+            raise SessionLockTimeoutError(f"Session {session_id!r} is locked")
+        try:
+            yield
+        finally:
+            with contextlib.suppress(LockError):  # lease expired while we held it
+                await lock.release()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+# ---------------------------------------------------------------------------
+# Factory
+# ---------------------------------------------------------------------------
+
+
+def create_session_store() -> SessionStore:
+    """Build the store selected by ``SESSION_STORE`` (``memory``/``sqlite``/``redis``).
+
+    ``sqlite`` (the default) uses ``SESSION_STORE_PATH``; ``redis`` uses
+    ``SESSION_STORE_URL``.
+    """
+
+    kind = os.getenv("SESSION_STORE", "sqlite").lower()
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_STORE_PATH", DEFAULT_STORE_PATH))
+    if kind == "redis":
+        return RedisSessionStore(os.getenv("SESSION_STORE_URL"))
+    raise ValueError(f"Unknown SESSION_STORE backend: {kind!r}")
+
@@ -0,0 +1,338 @@
+"""Write-behind batching in front of an async session event-log backend.
+
+:class:`SessionJournal` writes synchronously, once per orchestrator step.  Sent
+straight to a remote database, that is one round trip per step on the
+request path.  :class:`WriteBehindEventLog` accepts those writes without
+blocking and keeps at most one snapshot and one event per session:
+
+* a new snapshot supersedes everything still pending for the session;
+* consecutive events are merged with :func:`.event_log.merge_events`.
+
+A background task flushes everything pending at most ``max_delay`` seconds
+after the first unflushed write (sooner once ``max_batch`` sessions are
+dirty).  It writes all dirty sessions through
+:meth:`AsyncEventLog.write_batch`, one transaction per ``max_batch``
+sessions.  :meth:`WriteBehindEventLog.close` flushes before returning, so
+call it from the application's shutdown hook.
+
+Journal writes must come from the event-loop thread that runs the flusher.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+import contextlib
+from dataclasses import dataclass
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any
+
+from app.services.metrics.registry import REGISTRY
+from app.services.persistence.codec import decode, encode
+from app.services.persistence.event_log import (
+    DEFAULT_LOG_PATH,
+    DEFAULT_SNAPSHOT_EVERY,
+    EventLog,
+    EventSink,
+    MemoryEventLog,
+    SessionJournal,
+    SessionWrite,
+    SQLiteEventLog,
+    StoredSession,
+    merge_events,
+    restore_stored,
+)
+
+if TYPE_CHECKING:
+    from app.assistants.orchestrator_assistant import OrchestratorAssistant
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DELAY = 0.2
+DEFAULT_MAX_BATCH = 256
+
+_FLUSH_SECONDS = REGISTRY.histogram(
+    "session_write_behind_flush_seconds", "Duration of one write-behind flush"
+)
+_FLUSHED_SESSIONS = REGISTRY.counter(
+    "session_write_behind_sessions_total", "Session writes flushed by the write-behind queue"
+)
+_COALESCED = REGISTRY.counter(
+    "session_write_behind_coalesced_total", "Journal writes absorbed by a pending write"
+)
+_FLUSH_ERRORS = REGISTRY.counter(
+    "session_write_behind_errors_total", "Write-behind flushes that failed and were re-queued"
+)
+
+
+class AsyncEventLog(ABC):
+    """Async storage backend for the write-behind queue."""
+
+    async def open(self) -> None:  # noqa: B027 – optional hook
+        """Acquire connections / create tables."""
+
+    @abstractmethod
+    async def write_batch(self, writes: list[SessionWrite]) -> None:
+        """Apply several sessions' writes atomically."""
+
+    @abstractmethod
+    async def load(self, session_id: str) -> StoredSession | None:
+        """Return the latest snapshot and later events, or ``None`` if unknown."""
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        """Forget everything stored for *session_id*."""
+
+    async def close(self) -> None:  # noqa: B027 – optional hook
+        """Release backend resources."""
+
+
+class ThreadedEventLog(AsyncEventLog):
+    """Run a blocking :class:`EventLog` (e.g. SQLite) in the default executor."""
+
+    def __init__(self, log: EventLog) -> None:
+        self.log = log
+
+    async def write_batch(self, writes: list[SessionWrite]) -> None:
+        await asyncio.to_thread(self.log.write_batch, writes)
+
+    async def load(self, session_id: str) -> StoredSession | None:
+        return await asyncio.to_thread(self.log.load, session_id)
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self.log.delete, session_id)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.log.close)
+
+
+@dataclass(slots=True)
+class _Pending:
+    """Coalesced, not yet flushed writes of one session."""
+
+    snapshot: tuple[int, bytes] | None = None
+    event_seq: int = 0
+    event_raw: bytes | None = None  # kept encoded while there is a single event
+    event: dict[str, Any] | None = None  # decoded once a second event is merged
+
+    def add_event(self, seq: int, payload: bytes) -> None:
+        if self.event_raw is None and self.event is None:
+            self.event_raw = payload
+        else:
+            older = self.event if self.event is not None else decode(self.event_raw or b"")
+            self.event = merge_events(older, decode(payload))
+            self.event_raw = None
+            _COALESCED.inc()
+        self.event_seq = seq
+
+    def set_snapshot(self, seq: int, payload: bytes) -> None:
+        if self.snapshot is not None or self.event_raw is not None or self.event is not None:
+            _COALESCED.inc()
+        self.snapshot = (seq, payload)
+        self.event_raw = self.event = None
+
+    def absorb_newer(self, newer: _Pending) -> _Pending:
+        """Return this (older, failed) write with *newer* applied on top."""
+
+        if newer.snapshot is not None:
+            return newer
+        if newer.event_raw is not None or newer.event is not None:
+            self.add_event(newer.event_seq, newer.event_raw or encode(newer.event))
+        return self
+
+    def to_write(self, session_id: str) -> SessionWrite:
+        write = SessionWrite(session_id, self.snapshot)
+        if self.event_raw is not None:
+            write.events.append((self.event_seq, self.event_raw))
+        elif self.event is not None:
+            write.events.append((self.event_seq, encode(self.event)))
+        return write
+
+
+class WriteBehindEventLog(EventSink):
+    """Coalescing, batching :class:`EventSink` in front of an :class:`AsyncEventLog`."""
+
+    def __init__(
+        self,
+        backend: AsyncEventLog,
+        *,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ) -> None:
+        self.backend = backend
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._pending: dict[str, _Pending] = {}
+        self._dirty = asyncio.Event()
+        self._full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self.flushes = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of sessions with unflushed writes."""
+
+        return len(self._pending)
+
+    # ------------------------------------------------------------------
+    # EventSink (called by SessionJournal on the event-loop thread)
+    # ------------------------------------------------------------------
+    def _slot(self, session_id: str) -> _Pending:
+        if self._closed:
+            raise RuntimeError("WriteBehindEventLog is closed")
+        slot = self._pending.get(session_id)
+        if slot is None:
+            slot = self._pending[session_id] = _Pending()
+            self._dirty.set()
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+        return slot
+
+    def append(self, session_id: str, seq: int, payload: bytes) -> None:
+        self._slot(session_id).add_event(seq, payload)
+
+    def put_snapshot(self, session_id: str, seq: int, payload: bytes) -> None:
+        self._slot(session_id).set_snapshot(seq, payload)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    async def start(self) -> None:
+        """Open the backend and start the background flusher."""
+
+        await self.backend.open()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="session-write-behind")
+
+    async def close(self) -> None:
+        """Stop the flusher, write everything pending and close the backend.
+
+        The flusher is stopped, not cancelled: a flush already in flight runs
+        to completion (its batch has left ``_pending``, so cancelling it would
+        lose the batch), then the final flush writes whatever is left.
+        """
+
+        self._closed = True
+        if self._task is not None:
+            self._stop.set()
+            # Wake the flusher wherever it waits
+            self._dirty.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        await self.backend.close()
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            await self._dirty.wait()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._full.wait(), self.max_delay)
+            try:
+                await self.flush()
+            except Exception:  # re-queued by _write(); retry on the next cycle
+                if not self._stop.is_set():
+                    await asyncio.sleep(self.max_delay)
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+    async def _write(self, pending: dict[str, _Pending]) -> None:
+        items = list(pending.items())
+        for i in range(0, len(items), self.max_batch):
+            chunk = items[i : i + self.max_batch]
+            try:
+                await self.backend.write_batch([slot.to_write(sid) for sid, slot in chunk])
+            except BaseException as e:
+                # Also on cancellation: the batch is no longer in _pending, so
+                # not re-queueing it would drop it.  Backends write idempotently,
+                # so a batch that did commit before the error is safe to repeat.
+                if isinstance(e, Exception):
+                    _FLUSH_ERRORS.inc()
+                    logger.exception("Session write-behind flush failed; re-queueing %d sessions", len(items) - i)
+                for sid, slot in items[i:]:
+                    newer = self._pending.get(sid)
+                    self._pending[sid] = slot.absorb_newer(newer) if newer else slot
+                self._dirty.set()
+                raise
+            _FLUSHED_SESSIONS.inc(len(chunk))
+
+    async def flush(self) -> None:
+        """Write everything pending now."""
+
+        async with self._flush_lock:
+            if not self._pending:
+                self._dirty.clear()
+                return
+            pending, self._pending = self._pending, {}
+            self._dirty.clear()
+            self._full.clear()
+            start = time.perf_counter()
+            await self._write(pending)
+            self.flushes += 1
+            _FLUSH_SECONDS.observe(time.perf_counter() - start)
+
+    async def flush_session(self, session_id: str) -> None:
+        """Write pending data of one session now (e.g. before reading it back)."""
+
+        async with self._flush_lock:
+            slot = self._pending.pop(session_id, None)
+            if slot is not None:
+                await self._write({session_id: slot})
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    async def load(self, session_id: str) -> StoredSession | None:
+        await self.flush_session(session_id)
+        return await self.backend.load(session_id)
+
+    async def delete(self, session_id: str) -> None:
+        self._pending.pop(session_id, None)
+        await self.backend.delete(session_id)
+
+
+async def aresume(
+    log: WriteBehindEventLog,
+    session_id: str,
+    *,
+    snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+    **restore_kwargs: Any,
+) -> tuple[OrchestratorAssistant, SessionJournal] | None:
+    """Async counterpart of :func:`.event_log.resume` for the write-behind log."""
+
+    stored = await log.load(session_id)
+    if stored is None:
+        return None
+    return restore_stored(log, session_id, stored, snapshot_every=snapshot_every, **restore_kwargs)
+
+
+def create_session_log(*, shared: bool = True) -> WriteBehindEventLog:
+    """Build the write-behind log configured by the environment.
+
+    ``SESSION_DB_URL`` selects the pooled Postgres backend; without it the
+    SQLite file at ``SESSION_LOG_PATH`` is used.  With ``shared=False`` (a
+    single-process :class:`~.session_store.MemorySessionStore`) the log is
+    kept in process memory as well.  Call :meth:`~WriteBehindEventLog.start`
+    from the running event loop before use.
+    """
+
+    backend: AsyncEventLog
+    if not shared:
+        backend = ThreadedEventLog(MemoryEventLog())
+    elif dsn := os.getenv("SESSION_DB_URL"):
+        from app.services.persistence.postgres import PostgresEventLog
+
+        backend = PostgresEventLog.from_env(dsn)
+    else:
+        backend = ThreadedEventLog(SQLiteEventLog(os.getenv("SESSION_LOG_PATH", DEFAULT_LOG_PATH)))
+    return WriteBehindEventLog(
+        backend,
+        max_delay=float(os.getenv("SESSION_WRITE_MAX_DELAY", DEFAULT_MAX_DELAY)),
+        max_batch=int(os.getenv("SESSION_WRITE_MAX_BATCH", DEFAULT_MAX_BATCH)),
+    )
@@ -0,0 +1,269 @@
+"""Versioned prompt cache with TTL and stale-while-revalidate semantics.
+
+Every cached prompt carries the Langfuse version it was compiled from, an
+ETag-style validator and the time it was fetched.  Lookups never block on the
+network once a prompt has been seen: an expired entry is still served while a
+background worker re-fetches it, and a failed refresh simply keeps the stale
+copy around until the next attempt.
+
+The cache is bounded (LRU) and mirrors its entries to ``<cache_dir>/<name>.json``
+so a restarted process can start from the previous snapshot.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+from app.services.metrics.registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_REQUESTS = REGISTRY.counter(
+    "prompt_cache_requests_total",
+    "Prompt cache lookups by result (hit, stale, disk, miss)",
+    labels=("result",),
+)
+_REFRESH_SECONDS = REGISTRY.histogram(
+    "prompt_cache_refresh_seconds", "Latency of prompt fetches from Langfuse"
+)
+_REFRESH_ERRORS = REGISTRY.counter(
+    "prompt_cache_refresh_errors_total", "Background prompt refreshes that failed"
+)
+
+
+def content_etag(text: str) -> str:
+    """Return a strong validator for *text* (hex SHA-256)."""
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class PromptEntry:
+    """A compiled prompt plus the metadata needed to revalidate it."""
+
+    name: str
+    text: str
+    version: int | None
+    etag: str
+    fetched_at: float
+
+    def age(self, now: float | None = None) -> float:
+        return (now if now is not None else time.time()) - self.fetched_at
+
+    def is_valid(self) -> bool:
+        """Return ``True`` when *text* still matches the stored ETag."""
+
+        return content_etag(self.text) == self.etag
+
+
+class PromptCache:
+    """Bounded LRU of :class:`PromptEntry` objects keyed by prompt name.
+
+    Parameters
+    ----------
+    fetcher
+        Callable that downloads a prompt and returns a fresh :class:`PromptEntry`.
+    ttl_seconds
+        Age after which an entry is considered stale and revalidated in the
+        background.
+    max_entries
+        Upper bound on the number of prompts kept in memory.
+    cache_dir
+        Optional directory used as a persistent second tier.
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[str], PromptEntry],
+        *,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 64,
+        cache_dir: str | None = None,
+    ) -> None:
+        self._fetcher = fetcher
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache_dir = cache_dir
+        self._entries: OrderedDict[str, PromptEntry] = OrderedDict()
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._stats = {"hits": 0, "stale": 0, "disk": 0, "misses": 0, "refresh_errors": 0}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def get(self, name: str) -> PromptEntry:
+        """Return the entry for *name*, fetching synchronously only on a cold miss."""
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+
+        if entry is not None:
+            if entry.age() <= self.ttl_seconds:
+                self._count("hits", "hit")
+            else:
+                self._count("stale", "stale")
+                self._schedule_refresh(name)
+            return entry
+
+        entry = self._load_from_disk(name)
+        if entry is not None:
+            self._count("disk", "disk")
+            self._store(entry, persist=False)
+            if entry.age() > self.ttl_seconds:
+                self._schedule_refresh(name)
+            return entry
+
+        self._count("misses", "miss")
+        entry = self._fetch(name)
+        self._store(entry)
+        return entry
+
+    def put(self, entry: PromptEntry, *, persist: bool = True) -> None:
+        """Insert *entry* directly (used to seed the cache from a snapshot)."""
+
+        self._store(entry, persist=persist)
+
+    def peek(self, name: str) -> PromptEntry | None:
+        """Return the in-memory entry for *name* without touching LRU order or stats."""
+
+        with self._lock:
+            return self._entries.get(name)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate(self, name: str) -> None:
+        """Drop *name* from memory and disk so the next lookup refetches it."""
+
+        with self._lock:
+            self._entries.pop(name, None)
+        path = self._disk_path(name)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def clear(self) -> None:
+        """Drop every cached prompt (memory and disk tiers)."""
+
+        with self._lock:
+            self._entries.clear()
+        if self._cache_dir and os.path.isdir(self._cache_dir):
+            for file in os.listdir(self._cache_dir):
+                # ``.txt`` files are the pre-versioning cache format.
+                if file.endswith((".json", ".txt")):
+                    os.remove(os.path.join(self._cache_dir, file))
+
+    def wait_for_refreshes(self, timeout: float | None = None) -> None:
+        """Block until in-flight background refreshes finish (tests / shutdown)."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self._refreshing:
+                    return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.005)
+
+    def stats(self) -> dict[str, Any]:
+        """Return counters plus the current number of resident entries."""
+
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "refreshing": len(self._refreshing)}
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _count(self, key: str, label: str) -> None:
+        self._stats[key] += 1
+        _REQUESTS.labels(label).inc()
+
+    def _fetch(self, name: str) -> PromptEntry:
+        start = time.perf_counter()
+        try:
+            return self._fetcher(name)
+        finally:
+            _REFRESH_SECONDS.observe(time.perf_counter() - start)
+
+    def _store(self, entry: PromptEntry, *, persist: bool = True) -> None:
+        with self._lock:
+            self._entries[entry.name] = entry
+            self._entries.move_to_end(entry.name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if persist:
+            self._save_to_disk(entry)
+
+    def _schedule_refresh(self, name: str) -> None:
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="prompt-refresh"
+                )
+            executor = self._executor
+        executor.submit(self._refresh, name)
+
+    def _refresh(self, name: str) -> None:
+        try:
+            fresh = self._fetch(name)
+            current = self.peek(name)
+            if current is not None and current.etag == fresh.etag:
+                # Unchanged upstream: only extend the entry's lifetime.
+                fresh = PromptEntry(
+                    current.name, current.text, fresh.version, current.etag, fresh.fetched_at
+                )
+            self._store(fresh)
+        except Exception as e:
+            self._stats["refresh_errors"] += 1
+            _REFRESH_ERRORS.inc()
+            logger.warning("Prompt refresh failed for %s: %s", name, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+    def _disk_path(self, name: str) -> str | None:
+        if not self._cache_dir:
+            return None
+        return os.path.join(self._cache_dir, f"{name}.json")
+
+    def _load_from_disk(self, name: str) -> PromptEntry | None:
+        path = self._disk_path(name)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = PromptEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        # A truncated or hand-edited file is treated as a miss.
+        return entry if entry.is_valid() else None
+
+    def _save_to_disk(self, entry: PromptEntry) -> None:
+        path = self._disk_path(entry.name)
+        if not path:
+            return
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(entry), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not persist prompt %s: %s", entry.name, e)
@@ -1,11 +1,14 @@
 """Prompt manager that downloads and caches prompts from Langfuse."""
 
-from functools import lru_cache
-import os
+import time
+from typing import Any
 
 from langfuse import Langfuse
 
 from app.config.base import Settings
+from app.services.prompts.bundle import DEFAULT_BUNDLE_PATH, REQUIRED_PROMPTS, load_bundle
+from app.services.prompts.cache import PromptCache, PromptEntry, content_etag
+from app.services.tracing.otel import upstream_span
 
 
 class _LangfusePromptManager:
@@ -14,10 +17,15 @@ class _LangfusePromptManager:
     def __init__(self) -> None:
         """Initialize the prompt manager."""
         self.settings = Settings()
-        self._prompts: dict[str, str] = {}
         self._langfuse: Langfuse | None = None
-        self._cache_dir = "/tmp/reframe_prompts"
-        os.makedirs(self._cache_dir, exist_ok=True)
+        self._cache_dir = self.settings.prompt_cache_dir
+        self._cache = PromptCache(
+            self._fetch_from_langfuse,
+            ttl_seconds=self.settings.prompt_cache_ttl_seconds,
+            max_entries=self.settings.prompt_cache_max_entries,
+            cache_dir=self._cache_dir,
+        )
+        self._seed_from_bundle()
         self._download_all_prompts()
 
     def _get_langfuse_client(self) -> Langfuse:
@@ -30,87 +38,68 @@ class _LangfusePromptManager:
             )
         return self._langfuse
 
-    def _get_cache_path(self, prompt_name: str) -> str:
-        """Get the cache file path for a prompt."""
-        return os.path.join(self._cache_dir, f"{prompt_name}.txt")
+    def _seed_from_bundle(self) -> None:
+        """Load the build-time prompt bundle (if present) into the cache.
+
+        Bundled prompts are served without any network access and count as
+        fresh from the moment they are loaded (not from build time, which would
+        make every bundled prompt stale on every cold start); Langfuse is only
+        contacted for prompts missing from the bundle, or in the background once
+        this process has held a bundled entry longer than the cache TTL.
+        """
+        self._bundle = load_bundle(self.settings.prompt_bundle_path or DEFAULT_BUNDLE_PATH)
+        if self._bundle is None:
+            return
+        for entry in self._bundle.entries(loaded_at=time.time()):
+            self._cache.put(entry, persist=False)
+
+    def _fetch_from_langfuse(self, prompt_name: str) -> PromptEntry:
+        """Fetch *prompt_name* from Langfuse, bypassing the SDK's own cache."""
+        langfuse = self._get_langfuse_client()
+        with upstream_span("langfuse", "get_prompt", **{"langfuse.prompt": prompt_name}):
+            prompt_obj = langfuse.get_prompt(prompt_name, cache_ttl_seconds=0)
+        prompt = str(prompt_obj.compile())
+        # The SDK does not surface the HTTP ETag, so we derive an equivalent
+        # validator from the compiled text.
+        return PromptEntry(
+            name=prompt_name,
+            text=prompt,
+            version=getattr(prompt_obj, "version", None),
+            etag=content_etag(prompt),
+            fetched_at=time.time(),
+        )
 
     def _download_prompt(self, prompt_name: str) -> str:
-        """Download a prompt from Langfuse and cache it."""
+        """Return a prompt from the cache, downloading it from Langfuse on a cold miss."""
         try:
-            # Try to load from memory cache first
-            if prompt_name in self._prompts:
-                return self._prompts[prompt_name]
-
-            # Try to load from file cache
-            cache_path = self._get_cache_path(prompt_name)
-            if os.path.exists(cache_path):
-                with open(cache_path, encoding="utf-8") as f:
-                    prompt = f.read()
-                    self._prompts[prompt_name] = prompt
-                    return prompt
-
-            # Download from Langfuse
-            langfuse = self._get_langfuse_client()
-            prompt_obj = langfuse.get_prompt(prompt_name)
-            prompt = str(prompt_obj.compile())
-
-            # Cache in memory and file
-            self._prompts[prompt_name] = prompt
-            with open(cache_path, "w", encoding="utf-8") as f:
-                f.write(prompt)
-
-            return prompt
-
+            return self._cache.get(prompt_name).text
         except Exception as e:
             raise RuntimeError(f"Failed to download prompt '{prompt_name}': {e!s}") from e
 
     def _download_all_prompts(self) -> dict[str, str]:
         """Download all required prompts and cache them."""
-        # Prefetch both legacy ADK prompts and the new OpenAI-Assistants versions so we
-        # can switch seamlessly at runtime / in tests without additional network
-        # round-trips (FR-10).  These names correspond to the versions defined in
-        # `design.md` and must stay in sync with the Assistants that reference
-        # them.
-        required_prompts = [
-            # Legacy agents (kept for backwards-compat / regression tests)
-            "intake-agent-adk-instructions",
-            "reframe-agent-adk-instructions",
-            "synthesis-agent-adk-instructions",
-
-            # OpenAI Assistants v0.2 prompts
-            "intake-agent-oai-v0.2",
-            "reframe-agent-oai-v0.2",
-            # Parser agent prompt
-            "parser-agent-oai-v0.3",
-            "intake-agent-oai-v0.3",
-            "reframe-agent-oai-v0.3",
-        ]
-
-        for prompt_name in required_prompts:
-            self._download_prompt(prompt_name)
-
-        return self._prompts
+        return {name: self._download_prompt(name) for name in REQUIRED_PROMPTS}
 
     def _get_prompt(self, prompt_name: str) -> str:
         """Get a prompt, downloading if necessary."""
-        if prompt_name not in self._prompts:
-            return self._download_prompt(prompt_name)
-        return self._prompts[prompt_name]
-
-    def clear_cache(self) -> None:
-        """Clear all cached prompts."""
-        self._prompts.clear()
-        # Optionally remove cache files
-        for file in os.listdir(self._cache_dir):
-            if file.endswith(".txt"):
-                os.remove(os.path.join(self._cache_dir, file))
-
-    @lru_cache  # noqa: B019
+        return self._download_prompt(prompt_name)
+
+    def clear_cache(self, prompt_name: str | None = None) -> None:
+        """Invalidate one cached prompt, or all of them when *prompt_name* is omitted."""
+        if prompt_name is None:
+            self._cache.clear()
+        else:
+            self._cache.invalidate(prompt_name)
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Return hit/miss/refresh counters of the prompt cache."""
+        return self._cache.stats()
+
     def fetch_prompt(self, name: str) -> str:
         """Return the compiled prompt string by name.
 
-        The prompt is cached in memory by the PromptManager; an additional
-        `lru_cache` here lets us skip the attribute lookup entirely on hot paths.
+        Served from the versioned cache; stale entries are returned immediately
+        and revalidated in the background.
         """
         return self._get_prompt(name)
 
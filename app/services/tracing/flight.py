@@ -0,0 +1,156 @@
+"""Per-session flight recorder of turn stage timings.
+
+Every block run under :func:`~.otel.span` / :func:`~.otel.upstream_span`
+(``ws.turn``, ``orchestrator.phase``, ``tool.*``, ``openai.*``,
+``translate.*``, ``pdf.render``, ``gcs.*``) is a *stage*.  While a turn runs
+inside :func:`recording`, each finished stage is written into the session's
+:class:`FlightRecorder`: a fixed-size ring of preallocated slots, so
+recording is a few index stores – the stage strings are stored by
+reference and the timestamps in ``array('d')`` slots – and old turns are
+overwritten instead of growing memory.
+
+Recorders live in this worker's memory (LRU of ``FLIGHT_RECORDER_SESSIONS``
+sessions) and are read back with :meth:`FlightRecorder.timeline`, served by
+``/debug/sessions/{id}/timeline``.  A session whose turns ran on several
+workers therefore has a partial timeline on each; the endpoint reports the
+``worker`` pid that answered.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import time
+from typing import Any
+
+from app.services.tracing import otel
+
+DEFAULT_CAPACITY = 256  # stages per session
+DEFAULT_MAX_SESSIONS = 1024
+
+# perf_counter() → Unix time, fixed once per process
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+
+
+class FlightRecorder:
+    """Ring buffer of the last *capacity* stages of one session."""
+
+    __slots__ = ("_ends", "_names", "_starts", "_systems", "_turns", "capacity", "turn", "written")
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self._systems: list[str] = [""] * capacity
+        self._names: list[str] = [""] * capacity
+        self._starts = array("d", bytes(8 * capacity))
+        self._ends = array("d", bytes(8 * capacity))
+        self._turns = array("q", bytes(8 * capacity))
+        self.turn = 0
+        self.written = 0  # stages ever recorded; the slot is written % capacity
+
+    def record(self, system: str, name: str, start: float, end: float) -> None:
+        slot = self.written % self.capacity
+        self._systems[slot] = system
+        self._names[slot] = name
+        self._starts[slot] = start
+        self._ends[slot] = end
+        self._turns[slot] = self.turn
+        self.written += 1
+
+    def timeline(self) -> list[dict[str, Any]]:
+        """Return the buffered turns, oldest first, with their stages sorted by start.
+
+        Stage offsets are milliseconds from the start of the turn's first stage.
+        """
+
+        first = max(0, self.written - self.capacity)
+        turns: dict[int, list[int]] = {}
+        for i in range(first, self.written):
+            slot = i % self.capacity
+            turns.setdefault(self._turns[slot], []).append(slot)
+
+        result = []
+        for turn, slots in turns.items():
+            slots.sort(key=self._starts.__getitem__)
+            origin = self._starts[slots[0]]
+            stages = [
+                {
+                    "stage": f"{self._systems[s]}.{self._names[s]}" if self._systems[s] else self._names[s],
+                    "offset_ms": round((self._starts[s] - origin) * 1000, 3),
+                    "duration_ms": round((self._ends[s] - self._starts[s]) * 1000, 3),
+                }
+                for s in slots
+            ]
+            result.append(
+                {
+                    "turn": turn,
+                    "started_at": round(origin + _EPOCH_OFFSET, 6),
+                    "duration_ms": round((max(self._ends[s] for s in slots) - origin) * 1000, 3),
+                    "stages": stages,
+                }
+            )
+        return result
+
+
+_current: ContextVar[FlightRecorder | None] = ContextVar("flight_recorder", default=None)
+_recorders: OrderedDict[str, FlightRecorder] = OrderedDict()
+
+
+def _on_stage(system: str, name: str, start: float, end: float) -> None:
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.record(system, name, start, end)
+
+
+def install() -> None:
+    """Feed the span helpers' stage timings to the flight recorders."""
+
+    otel._on_stage = _on_stage
+
+
+def _obtain(session_id: str) -> FlightRecorder:
+    recorder = _recorders.get(session_id)
+    if recorder is not None:
+        _recorders.move_to_end(session_id)
+        return recorder
+    capacity = int(os.getenv("FLIGHT_RECORDER_STAGES", DEFAULT_CAPACITY))
+    recorder = _recorders[session_id] = FlightRecorder(capacity)
+    while len(_recorders) > int(os.getenv("FLIGHT_RECORDER_SESSIONS", DEFAULT_MAX_SESSIONS)):
+        _recorders.popitem(last=False)
+    return recorder
+
+
+def get_recorder(session_id: str, *, create: bool = True) -> FlightRecorder | None:
+    """Return this worker's recorder of *session_id*, evicting the least recently used.
+
+    With ``create=False``, ``None`` if the session ran no turn on this worker.
+    """
+
+    if create:
+        return _obtain(session_id)
+    recorder = _recorders.get(session_id)
+    if recorder is not None:
+        _recorders.move_to_end(session_id)
+    return recorder
+
+
+@contextmanager
+def recording(session_id: str) -> Iterator[FlightRecorder]:
+    """Record the stages of one turn of *session_id* run inside the block."""
+
+    recorder = _obtain(session_id)
+    recorder.turn += 1
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def clear_recorders() -> None:
+    """Drop every recorder (tests)."""
+
+    _recorders.clear()
@@ -0,0 +1,28 @@
+"""Span export to Langfuse's OpenTelemetry endpoint.
+
+Langfuse ingests OTLP/HTTP traces at ``{LANGFUSE_HOST}/api/public/otel``
+with basic auth built from the project's public/secret key pair, so the
+spans of :mod:`app.services.tracing.otel` show up next to the prompts.
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+from typing import Any
+
+OTLP_PATH = "/api/public/otel/v1/traces"
+
+
+def langfuse_span_exporter() -> Any | None:
+    """Return an OTLP exporter for Langfuse, or ``None`` if it is not configured."""
+
+    host = os.getenv("LANGFUSE_HOST")
+    public_key = os.getenv("LANGFUSE_PUBLIC_KEY")
+    secret_key = os.getenv("LANGFUSE_SECRET_KEY")
+    if not (host and public_key and secret_key):
+        return None
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    token = base64.b64encode(f"{public_key}:{secret_key}".encode()).decode()
+    return OTLPSpanExporter(endpoint=host.rstrip("/") + OTLP_PATH, headers={"Authorization": f"Basic {token}"})
@@ -0,0 +1,181 @@
+"""Structured, non-blocking logging.
+
+:func:`configure_logging` routes the root logger through a
+:class:`logging.handlers.QueueHandler`; a :class:`~logging.handlers.QueueListener`
+thread formats records as one JSON object per line and writes them to
+stderr, so the event loop only pays for an enqueue:
+
+* **lazy formatting** – records are queued with their ``%`` args unformatted;
+  the message, extra fields and tracebacks are rendered in the writer thread;
+* **bounded** – the queue holds ``LOG_QUEUE_SIZE`` records; when the writer
+  falls behind, new records are dropped (``logs_dropped_total``) instead of
+  blocking the caller;
+* **redaction** – ``extra`` fields named in ``LOG_HASH_FIELDS`` (user text)
+  are replaced by a short SHA-256 and their length, other strings are cut
+  to ``LOG_MAX_FIELD_CHARS``;
+* **sampling** – ``LOG_SAMPLING="app.main=0.1,app.assistants=0.5"`` keeps
+  that fraction of a logger's (prefix match) records below WARNING.
+
+Pass context as ``extra`` rather than formatting it into the message::
+
+    logger.info("Frame received", extra={"session_id": sid, "frame_type": kind})
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from typing import Any
+
+from app.services.metrics.registry import REGISTRY
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_MAX_FIELD_CHARS = 256
+DEFAULT_HASH_FIELDS = "user_message,content,text,payload"
+
+_DROPPED = REGISTRY.counter("logs_dropped_total", "Log records not written", labels=("reason",))
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else f"{text[:limit]}…(+{len(text) - limit} chars)"
+
+
+def _redact(key: str, value: Any, hash_fields: frozenset[str], max_chars: int) -> Any:
+    if isinstance(value, int | float | bool) or value is None:
+        return value
+    text = value if isinstance(value, str) else str(value)
+    if key in hash_fields:
+        return {"sha256": hashlib.sha256(text.encode()).hexdigest()[:12], "chars": len(text)}
+    return _truncate(text, max_chars)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and ``extra`` fields."""
+
+    def __init__(
+        self,
+        *,
+        max_field_chars: int = DEFAULT_MAX_FIELD_CHARS,
+        hash_fields: frozenset[str] = frozenset(DEFAULT_HASH_FIELDS.split(",")),
+    ) -> None:
+        super().__init__()
+        self.max_field_chars = max_field_chars
+        self.hash_fields = hash_fields
+
+    def format(self, record: logging.LogRecord) -> str:
+        # The message is developer-written; allow it more room than fields.
+        message = _truncate(record.getMessage(), 4 * self.max_field_chars)
+        entry: dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": message,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = _redact(key, value, self.hash_fields, self.max_field_chars)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a configured fraction of each logger's records below WARNING."""
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        # Longest prefix first so "app.main" wins over "app"
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                if random.random() < rate:
+                    return True
+                _DROPPED.labels("sampled").inc()
+                return False
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without formatting them and drop them when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats here, i.e. on the caller's thread; the
+        # listener's formatter does it instead.  Copy so other handlers and
+        # later mutations of the record do not race the writer.
+        return copy.copy(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DROPPED.labels("queue_full").inc()
+
+
+def parse_sampling(spec: str | None) -> dict[str, float]:
+    """Parse ``"logger=rate,logger=rate"`` (rates 0–1)."""
+
+    rates: dict[str, float] = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, rate = item.split("=", 1)
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(level: str | None = None, *, force: bool = False) -> logging.handlers.QueueListener | None:
+    """Install queue-based JSON logging on the root logger.
+
+    Like :func:`logging.basicConfig`, does nothing if the root logger already
+    has handlers (e.g. under pytest) unless *force* is set.
+    """
+
+    global _listener
+    root = logging.getLogger()
+    if root.handlers and not force:
+        return None
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    writer = logging.StreamHandler(sys.stderr)
+    writer.setFormatter(
+        JsonFormatter(
+            max_field_chars=int(os.getenv("LOG_MAX_FIELD_CHARS", DEFAULT_MAX_FIELD_CHARS)),
+            hash_fields=frozenset(filter(None, os.getenv("LOG_HASH_FIELDS", DEFAULT_HASH_FIELDS).split(","))),
+        )
+    )
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(int(os.getenv("LOG_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)))
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(parse_sampling(os.getenv("LOG_SAMPLING"))))
+    root.addHandler(handler)
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+
+    _listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Stop the writer thread after it has written every queued record."""
+
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,250 @@
+"""OpenTelemetry tracing for turns, phases, tools and upstream calls.
+
+Span layout::
+
+    ws.turn                      (app.main, one per WebSocket user message)
+    └── orchestrator.phase       (one per decide_next_action step)
+        └── tool.<name>          (execute_tool_with_stubs)
+            └── openai.<op> / gcs.<op> / translate.<op> / langfuse.<op>
+
+:func:`configure_tracing` installs the process-wide ``TracerProvider``.
+Spans are exported with a ``BatchSpanProcessor``:
+
+* over OTLP/HTTP when ``OTEL_EXPORTER_OTLP_ENDPOINT`` (or
+  ``…_TRACES_ENDPOINT``) is set – standard OTel env vars apply;
+* to Langfuse's OTLP endpoint when the Langfuse keys are configured (see
+  :mod:`.langfuse_cli`);
+* to an in-memory exporter with ``TRACING_EXPORTER=memory`` or
+  :func:`memory_exporter` (offline tests).
+
+The OTLP/Langfuse exporters sit behind a
+:class:`~app.services.tracing.sampling.TailSamplingProcessor` that keeps slow,
+errored and crisis turns plus ``TRACE_SAMPLE_RATE`` of the rest (set it to
+1 to export everything); the in-memory exporter sees every span.
+
+The same helpers feed the per-session flight recorder
+(:mod:`.flight`) through ``_on_stage`` when it is installed.
+
+Until a provider is installed (no exporter configured, or before
+:func:`configure_tracing` runs) the helpers yield a no-op span and
+OpenTelemetry is not imported, so tracing costs nothing when off and the
+tool modules stay cheap to import.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+import os
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from opentelemetry.trace import Span, Tracer
+
+    from app.services.metrics.registry import Histogram
+
+SERVICE_NAME = "reframe-edge"
+# Tail sampling defaults (see .sampling); kept here so that module, and with
+# it the OTel SDK, is only imported once tracing is switched on.
+DEFAULT_SAMPLE_RATE = 0.05
+DEFAULT_SLOW_MS = 1500.0
+DEFAULT_MAX_SPANS = 20_000
+
+_provider: TracerProvider | None = None
+_tracer: Tracer | None = None
+_memory: InMemorySpanExporter | None = None
+# Called with (system, name, start, end) – perf_counter times, system "" for
+# span() – as every span helper block exits, traced or not; installed by
+# app.services.tracing.flight.  Both strings are passed as-is (no formatting).
+_on_stage: Callable[[str, str, float, float], None] | None = None
+
+
+class _NoopSpan:
+    """Stand-in yielded while tracing is not configured (OTel is not even imported)."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def _install(exporters: list[Any]) -> TracerProvider:
+    global _provider, _tracer
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", SERVICE_NAME)})
+    )
+    processors = [BatchSpanProcessor(exporter) for exporter in exporters]
+    sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", DEFAULT_SAMPLE_RATE))
+    if processors and sample_rate < 1.0:
+        from app.services.tracing.sampling import TailSamplingProcessor
+
+        processors = [
+            TailSamplingProcessor(
+                processors,
+                sample_rate=sample_rate,
+                slow_ms=float(os.getenv("TRACE_SLOW_MS", DEFAULT_SLOW_MS)),
+                max_spans=int(os.getenv("TRACE_BUFFER_MAX_SPANS", DEFAULT_MAX_SPANS)),
+            )
+        ]
+    for processor in processors:
+        provider.add_span_processor(processor)
+    trace.set_tracer_provider(provider)
+    _provider = provider
+    _tracer = provider.get_tracer("app")
+    return provider
+
+
+def _exporters() -> list[Any]:
+    exporters = []
+    if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"):
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        exporters.append(OTLPSpanExporter())
+    from app.services.tracing.langfuse_cli import langfuse_span_exporter
+
+    if (exporter := langfuse_span_exporter()) is not None:
+        exporters.append(exporter)
+    return exporters
+
+
+def configure_tracing(*, in_memory: bool | None = None) -> TracerProvider | None:
+    """Install (once) the tracer provider and its exporters.
+
+    Returns ``None`` – tracing stays off – when no exporter is configured.
+    """
+
+    if in_memory is None:
+        in_memory = os.getenv("TRACING_EXPORTER") == "memory"
+    if in_memory:
+        memory_exporter()
+    elif _provider is None and (exporters := _exporters()):
+        _install(exporters)
+    return _provider
+
+
+def memory_exporter() -> InMemorySpanExporter:
+    """Return the in-memory exporter, installing it (and the provider) on first use."""
+
+    global _memory
+    if _memory is None:
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        provider = _provider or _install(_exporters())
+        _memory = InMemorySpanExporter()
+        provider.add_span_processor(SimpleSpanProcessor(_memory))
+    return _memory
+
+
+async def shutdown_tracing() -> None:
+    """Flush pending spans (call on application shutdown)."""
+
+    if _provider is not None:
+        _provider.force_flush()
+
+
+# ---------------------------------------------------------------------------
+# Span helpers
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+    """Start a child span of the current one; exceptions mark it as failed."""
+
+    start = time.perf_counter()
+    try:
+        if _tracer is None:
+            yield _NOOP
+            return
+        with _tracer.start_as_current_span(name, attributes=_clean(attributes)) as current:
+            yield current
+    finally:
+        if _on_stage is not None:
+            _on_stage("", name, start, time.perf_counter())
+
+
+@contextmanager
+def upstream_span(system: str, operation: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+    """Span for one call to an external service, with its latency in ms.
+
+    *system* is e.g. ``"openai"``, ``"gcs"``, ``"translate"``, ``"langfuse"``.
+    The latency is also observed in ``upstream_request_seconds{system,operation}``
+    whether or not tracing is on.
+    """
+
+    start = time.perf_counter()
+    try:
+        if _tracer is None:
+            yield _NOOP
+            return
+        from opentelemetry.trace import SpanKind
+
+        with _tracer.start_as_current_span(
+            f"{system}.{operation}",
+            kind=SpanKind.CLIENT,
+            attributes=_clean({"upstream.system": system, "upstream.operation": operation, **attributes}),
+        ) as current:
+            try:
+                yield current
+            finally:
+                current.set_attribute("upstream.latency_ms", round((time.perf_counter() - start) * 1000, 3))
+    finally:
+        end = time.perf_counter()
+        _upstream_seconds().labels(system, operation).observe(end - start)
+        if _on_stage is not None:
+            _on_stage(system, operation, start, end)
+
+
+@lru_cache(maxsize=1)
+def _upstream_seconds() -> Histogram:
+    # Resolved on first call so importing this module stays dependency-free.
+    from app.services.metrics.registry import REGISTRY
+
+    return REGISTRY.histogram(
+        "upstream_request_seconds", "Latency of calls to external services", labels=("system", "operation")
+    )
+
+
+def set_token_attributes(prompt_tokens: int, completion_tokens: int | None, max_output_tokens: int | None) -> None:
+    """Record token counts on the current span (OpenInference attribute names)."""
+
+    if _tracer is None:
+        return
+    from opentelemetry import trace
+
+    current = trace.get_current_span()
+    if not current.is_recording():
+        return
+    current.set_attributes(
+        _clean(
+            {
+                "llm.token_count.prompt": prompt_tokens,
+                "llm.token_count.completion": completion_tokens,
+                "llm.token_count.total": prompt_tokens + (completion_tokens or 0),
+                "llm.max_output_tokens": max_output_tokens,
+            }
+        )
+    )
+
+
+def _clean(attributes: dict[str, Any]) -> dict[str, Any]:
+    """Drop ``None`` values, which OTel attributes do not accept."""
+
+    return {k: v for k, v in attributes.items() if v is not None}
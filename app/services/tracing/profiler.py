@@ -0,0 +1,123 @@
+"""On-demand statistical profiling of a live worker.
+
+* :func:`sample_stacks` samples the Python stacks of every thread with
+  ``sys._current_frames()`` at a fixed interval for a few seconds and
+  returns them as collapsed stacks (``frame;frame;frame count`` lines),
+  the input format of ``flamegraph.pl``, speedscope and inferno.
+* :func:`allocation_snapshot` returns the top ``tracemalloc`` allocation
+  sites, tracing only for the requested window unless tracemalloc was
+  already started (``PYTHONTRACEMALLOC``).
+
+Nothing runs until a request asks for it, and only one profile runs per
+worker at a time (:class:`ProfilerBusyError` otherwise), so the module is
+safe to ship; ``/debug/profile/*`` additionally requires
+``PROFILING_ENABLED=1``.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from types import FrameType
+from typing import Any
+
+MAX_SECONDS = 60.0
+DEFAULT_INTERVAL = 0.01  # 100 Hz
+MAX_DEPTH = 128
+
+_busy = threading.Lock()
+
+
+class ProfilerBusyError(RuntimeError):
+    """Another profile is already running in this worker."""
+
+
+def enabled() -> bool:
+    return os.getenv("PROFILING_ENABLED") == "1"
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame: FrameType | None) -> list[str]:
+    stack: list[str] = []
+    while frame is not None and len(stack) < MAX_DEPTH:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def sample_stacks(seconds: float, interval: float = DEFAULT_INTERVAL) -> tuple[str, int]:
+    """Sample all threads (but this one) for *seconds*; return (collapsed stacks, samples).
+
+    Blocking – run it in a thread so the event loop keeps serving (and is
+    itself sampled).
+    """
+
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusyError("a profile is already running")
+    try:
+        me = threading.get_ident()
+        counts: Counter[str] = Counter()
+        samples = 0
+        deadline = time.perf_counter() + min(seconds, MAX_SECONDS)
+        while time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = [f"thread:{names.get(ident, ident)}", *_collapse(frame)]
+                counts[";".join(stack)] += 1
+            samples += 1
+            time.sleep(interval)
+    finally:
+        _busy.release()
+    lines = [f"{stack} {count}" for stack, count in counts.most_common()]
+    return "\n".join(lines) + ("\n" if lines else ""), samples
+
+
+def allocation_snapshot(seconds: float = 5.0, top: int = 25) -> dict[str, Any]:
+    """Return the *top* allocation sites by size.
+
+    If tracemalloc is off it is started for *seconds* and stopped again, so
+    the result covers allocations still alive from that window.  Blocking.
+    """
+
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusyError("a profile is already running")
+    try:
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+            time.sleep(min(seconds, MAX_SECONDS))
+        try:
+            snapshot = tracemalloc.take_snapshot()
+            traced, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+    finally:
+        _busy.release()
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+    stats = snapshot.statistics("lineno")
+    return {
+        "window_seconds": min(seconds, MAX_SECONDS) if started_here else None,
+        "traced_bytes": traced,
+        "peak_bytes": peak,
+        "top": [
+            {
+                "file": stat.traceback[0].filename,
+                "line": stat.traceback[0].lineno,
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in stats[:top]
+        ],
+    }
@@ -0,0 +1,173 @@
+"""Tail-based sampling of chat-turn traces.
+
+Head sampling decides before a turn runs, so it drops exactly the traces we
+need.  :class:`TailSamplingProcessor` instead buffers the finished spans of
+each trace (one trace per ``ws.turn``) and decides when the local root span
+ends:
+
+* **slow** – the root took longer than ``slow_ms`` (the 1.5 s p95 budget);
+* **error** – any span of the trace has an ``ERROR`` status;
+* **crisis** – the turn went through ``safe_complete`` or ended in
+  ``Phase.S7_DONE`` via the crisis path (``session.crisis`` attribute);
+* otherwise the trace is kept with probability ``sample_rate``, decided
+  from the trace id so every span of a trace gets the same answer.
+
+Kept traces are handed to the downstream processors (normally a
+``BatchSpanProcessor`` per exporter).  The buffer is bounded by
+``max_spans`` overall and ``max_spans_per_trace``; its size and every
+dropped span are exported as metrics.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Sequence
+import threading
+from typing import Any
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.trace import StatusCode
+
+from app.services.metrics.registry import REGISTRY
+from app.services.tracing.otel import DEFAULT_MAX_SPANS, DEFAULT_SAMPLE_RATE, DEFAULT_SLOW_MS
+
+DEFAULT_MAX_SPANS_PER_TRACE = 1_000
+
+CRISIS_TOOL_SPAN = "tool.safe_complete"
+CRISIS_ATTRIBUTE = "session.crisis"
+
+_BUFFER_SPANS = REGISTRY.gauge("trace_buffer_spans", "Spans held by the tail sampler")
+_BUFFER_BYTES = REGISTRY.gauge("trace_buffer_bytes", "Approximate memory of the spans held by the tail sampler")
+_DECISIONS = REGISTRY.counter("trace_sampling_decisions_total", "Tail sampling decisions", labels=("decision",))
+_DROPPED = REGISTRY.counter("trace_spans_dropped_total", "Spans discarded by the tail sampler", labels=("reason",))
+
+
+def _span_bytes(span: ReadableSpan) -> int:
+    """Rough size of a finished span: fixed overhead plus attribute/event payloads."""
+
+    size = 200 + len(span.name)
+    for key, value in (span.attributes or {}).items():
+        size += len(key) + len(str(value)) + 16
+    for event in span.events:
+        size += 64 + len(event.name) + sum(len(k) + len(str(v)) for k, v in (event.attributes or {}).items())
+    return size
+
+
+class _Trace:
+    __slots__ = ("bytes", "spans")
+
+    def __init__(self) -> None:
+        self.spans: list[ReadableSpan] = []
+        self.bytes = 0
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """Buffer spans per trace and forward whole traces that are worth keeping."""
+
+    def __init__(
+        self,
+        downstream: Sequence[SpanProcessor],
+        *,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        slow_ms: float = DEFAULT_SLOW_MS,
+        max_spans: int = DEFAULT_MAX_SPANS,
+        max_spans_per_trace: int = DEFAULT_MAX_SPANS_PER_TRACE,
+    ) -> None:
+        self.downstream = list(downstream)
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_spans = max_spans
+        self.max_spans_per_trace = max_spans_per_trace
+        self._traces: OrderedDict[int, _Trace] = OrderedDict()  # oldest first
+        self._spans = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def buffered_spans(self) -> int:
+        return self._spans
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._bytes
+
+    # ------------------------------------------------------------------
+    # SpanProcessor
+    # ------------------------------------------------------------------
+    def on_start(self, span: Span, parent_context: Context | None = None) -> None:
+        for processor in self.downstream:
+            processor.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        is_root = span.parent is None or span.parent.is_remote
+        with self._lock:
+            trace = self._traces.get(trace_id)
+            if trace is None:
+                trace = self._traces[trace_id] = _Trace()
+            if len(trace.spans) >= self.max_spans_per_trace and not is_root:
+                _DROPPED.labels("trace_limit").inc()
+            else:
+                size = _span_bytes(span)
+                trace.spans.append(span)
+                trace.bytes += size
+                self._spans += 1
+                self._bytes += size
+                self._evict()
+            finished = self._traces.pop(trace_id, None) if is_root else None
+            if finished is not None:
+                self._spans -= len(finished.spans)
+                self._bytes -= finished.bytes
+            self._update_gauges()
+        if finished is None:
+            return
+        decision = self.decide(span, finished.spans)
+        _DECISIONS.labels(decision).inc()
+        if decision == "dropped":
+            _DROPPED.labels("sampled_out").inc(len(finished.spans))
+            return
+        for buffered in finished.spans:
+            for processor in self.downstream:
+                processor.on_end(buffered)
+
+    def _evict(self) -> None:
+        """Drop the oldest incomplete traces while the buffer is over ``max_spans``."""
+
+        while self._spans > self.max_spans and len(self._traces) > 1:
+            _, oldest = self._traces.popitem(last=False)
+            self._spans -= len(oldest.spans)
+            self._bytes -= oldest.bytes
+            _DROPPED.labels("buffer_full").inc(len(oldest.spans))
+
+    def _update_gauges(self) -> None:
+        _BUFFER_SPANS.set(self._spans)
+        _BUFFER_BYTES.set(self._bytes)
+
+    def decide(self, root: ReadableSpan, spans: Sequence[ReadableSpan]) -> str:
+        """Return ``slow``/``error``/``crisis``/``sampled`` (exported) or ``dropped``."""
+
+        if (
+            root.end_time is not None
+            and root.start_time is not None
+            and (root.end_time - root.start_time) / 1e6 > self.slow_ms
+        ):
+            return "slow"
+        if any(s.status.status_code is StatusCode.ERROR for s in spans):
+            return "error"
+        if any(s.name == CRISIS_TOOL_SPAN or (s.attributes or {}).get(CRISIS_ATTRIBUTE) for s in spans):
+            return "crisis"
+        # Low 32 bits of the (random) trace id: the same answer on every replica.
+        if (root.context.trace_id & 0xFFFFFFFF) < self.sample_rate * 2**32:
+            return "sampled"
+        return "dropped"
+
+    def shutdown(self) -> None:
+        for processor in self.downstream:
+            processor.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return all(processor.force_flush(timeout_millis) for processor in self.downstream)
+
+    def stats(self) -> dict[str, Any]:
+        return {"traces": len(self._traces), "spans": self._spans, "bytes": self._bytes}
@@ -0,0 +1,190 @@
+"""Cold-start warm-up steps and readiness tracking.
+
+On a fresh Cloud Run instance the first session would otherwise pay for the
+ReportLab import and font loading, OpenAI TLS setup, GCS client creation and
+prompt downloads.  :class:`WarmupRunner` executes those steps concurrently at
+startup and records how long each took so ``/ready`` can keep traffic away
+from cold instances.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+import logging
+import os
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+WarmupStep = Callable[[], Awaitable[str | None]]
+
+
+@dataclass
+class WarmupResult:
+    """Outcome of a single warm-up step."""
+
+    name: str
+    status: str = "pending"  # pending | running | ok | skipped | failed
+    duration_ms: float | None = None
+    detail: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("ok", "skipped", "failed")
+
+
+class WarmupRunner:
+    """Run named warm-up steps concurrently and report their progress.
+
+    A step is an async callable; returning a string marks it as ``skipped``
+    with that string as the reason, raising marks it as ``failed``.  Failed
+    steps do not block readiness: the instance still serves traffic, it just
+    pays the cost lazily on first use.
+    """
+
+    def __init__(self, steps: dict[str, WarmupStep]) -> None:
+        self._steps = steps
+        self.results = {name: WarmupResult(name) for name in steps}
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return all(r.finished for r in self.results.values())
+
+    async def run(self) -> None:
+        self.started_at = time.time()
+        await asyncio.gather(*(self._run_step(name, step) for name, step in self._steps.items()))
+        self.finished_at = time.time()
+        logger.info(
+            "Warm-up finished in %.0f ms: %s",
+            (self.finished_at - self.started_at) * 1000,
+            ", ".join(f"{r.name}={r.status}" for r in self.results.values()),
+        )
+
+    async def _run_step(self, name: str, step: WarmupStep) -> None:
+        result = self.results[name]
+        result.status = "running"
+        start = time.perf_counter()
+        try:
+            skipped = await step()
+        except Exception as e:
+            result.status = "failed"
+            result.detail = f"{type(e).__name__}: {e}"
+            logger.warning("Warm-up step %s failed: %s", name, e)
+        else:
+            result.status = "skipped" if skipped else "ok"
+            result.detail = skipped
+        finally:
+            result.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    def report(self) -> dict[str, Any]:
+        total_ms = None
+        if self.started_at is not None and self.finished_at is not None:
+            total_ms = round((self.finished_at - self.started_at) * 1000, 2)
+        return {
+            "ready": self.ready,
+            "total_ms": total_ms,
+            "steps": {name: asdict(r) for name, r in self.results.items()},
+        }
+
+
+# ---------------------------------------------------------------------------
+# Default steps
+# ---------------------------------------------------------------------------
+
+
+def _offline() -> bool:
+    return os.getenv("OFFLINE", "1") == "1"
+
+
+async def warm_openai() -> str | None:
+    """Create the shared OpenAI client and open a pooled TLS connection."""
+
+    from app.assistants.client import get_openai_client
+
+    if not os.getenv("OPENAI_API_KEY"):
+        return "OPENAI_API_KEY not set"
+    client = get_openai_client()
+    if _offline():
+        return "offline mode"
+    await client.models.list()
+    return None
+
+
+async def warm_gcs() -> str | None:
+    """Create the shared Cloud Storage client used for PDF uploads."""
+
+    if _offline():
+        return "offline mode"
+    from app.assistants.functions.gcs_upload import get_storage_client
+
+    await asyncio.to_thread(get_storage_client)
+    return None
+
+
+async def warm_pdf() -> str | None:
+    """Render a throwaway PDF so ReportLab modules and fonts are loaded."""
+
+    from app.tools.pdf_generator import build_pdf_bytes
+
+    sample = {
+        "trigger_situation": "Warm-up",
+        "automatic_thought": "Warm-up",
+        "emotion_data": {"emotion": "calm", "intensity": 1},
+    }
+    await asyncio.to_thread(build_pdf_bytes, sample, "")
+    return None
+
+
+async def warm_regex() -> str | None:
+    """Import the parsing modules and run one intake so every pattern is compiled."""
+
+    from app.assistants.functions.collect import collect_context
+    from app.core.safety import screen
+
+    screen("warm-up 123-45-6789")
+    await collect_context(
+        messages=[
+            {"role": "user", "content": "My name is Warm, 30 years old, because I felt sad 5/10."},
+            {"role": "user", "content": 'When it happened I thought "this is a warm-up".'},
+        ]
+    )
+    return None
+
+
+async def warm_tokenizer() -> str | None:
+    """Load the tiktoken encoding so the first budgeted call does not read the BPE file."""
+
+    from app.assistants.tokens import get_encoding
+
+    if await asyncio.to_thread(get_encoding) is None:
+        return "tiktoken encoding unavailable, estimating tokens"
+    return None
+
+
+async def warm_prompts() -> str | None:
+    """Load the prompt manager (bundle first, Langfuse only for missing prompts)."""
+
+    if not os.getenv("LANGFUSE_HOST"):
+        return "Langfuse not configured"
+
+    def _load() -> None:
+        from app.services.prompts.langfuse_cli import prompt_manager  # noqa: F401
+
+    await asyncio.to_thread(_load)
+    return None
+
+
+def default_steps() -> dict[str, WarmupStep]:
+    return {
+        "openai": warm_openai,
+        "gcs": warm_gcs,
+        "pdf": warm_pdf,
+        "regex": warm_regex,
+        "tokenizer": warm_tokenizer,
+        "prompts": warm_prompts,
+    }
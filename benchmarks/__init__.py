@@ -0,0 +1,6 @@
+"""Performance benchmarks and regression gates.
+
+Each module is runnable on its own (``python -m benchmarks.<name>``) and
+prints a short report; modules with a ``--check`` flag exit non-zero when a
+stored budget or baseline is exceeded.
+"""
@@ -0,0 +1,42 @@
+"""Machine-speed unit shared by the timing gates.
+
+Wall-clock budgets recorded on one machine do not hold on a slower (or busy)
+one.  :func:`calibrate` times a fixed pure-Python workload; gates store its
+value next to their budgets and compare later runs in those units instead of
+raw seconds.
+"""
+
+from __future__ import annotations
+
+import time
+
+DEFAULT_MIN_TIME = 0.05  # seconds per repeat
+
+
+def _workload() -> int:
+    table = {str(i): i for i in range(200)}
+    return sum(table[str(i % 200)] * 3 // 2 for i in range(1000))
+
+
+def _run(calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        _workload()
+    return time.perf_counter() - start
+
+
+def calibrate(repeat: int = 5, min_time: float = DEFAULT_MIN_TIME) -> float:
+    """µs per call of a fixed pure-Python workload; the machine-speed unit.
+
+    The call count is doubled until one repeat takes *min_time*; the best of
+    *repeat* runs is kept.
+    """
+
+    _workload()
+    calls = 1
+    while (elapsed := _run(calls)) < min_time:
+        calls = max(calls * 2, int(calls * min_time / max(elapsed, 1e-9)))
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _run(calls))
+    return best / calls * 1e6
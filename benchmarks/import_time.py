@@ -0,0 +1,184 @@
+"""Cold-import regression benchmark based on ``python -X importtime``.
+
+For every target module we start a fresh interpreter, import the module with
+``-X importtime`` and parse the per-module report from stderr.  Modules that a
+bare interpreter already loads (``site``, encodings, …) are subtracted so the
+numbers reflect what *our* import pulls in.
+
+Usage::
+
+    python -m benchmarks.import_time            # print the report
+    python -m benchmarks.import_time --check    # exit 1 when a budget is exceeded
+    python -m benchmarks.import_time --update   # rewrite budgets from this machine
+
+Budgets live in ``benchmarks/import_budgets.json``; ``--update`` stores the
+measured values multiplied by ``--headroom`` so normal jitter does not trip
+the gate.  The budgets also record the speed of the fixed
+:mod:`benchmarks.calibration` loop on the machine that wrote them; when the
+current machine is slower (or busy), time budgets are scaled up by the same
+factor, so CPU contention alone does not fail the gate.  They are never scaled down: cold
+imports are partly I/O-bound and do not speed up with the CPU.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import json
+import os
+import subprocess
+import sys
+from typing import Any
+
+from benchmarks.calibration import calibrate
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "import_budgets.json")
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules on the OpenAI request path that must stay cheap to import.
+DEFAULT_TARGETS = (
+    "app.assistants.functions",
+    "app.assistants.orchestrator_assistant",
+    "app.main",
+)
+
+
+@dataclass
+class ImportProfile:
+    """Cold-import cost of one module."""
+
+    module: str
+    total_ms: float
+    module_count: int
+    slowest: list[tuple[str, float]]
+    modules: list[str]
+
+
+def _run_importtime(code: str) -> dict[str, int]:
+    """Return ``{module: self_us}`` for a fresh interpreter running *code*."""
+
+    env = {**os.environ, "PYTHONPATH": _REPO_ROOT, "PYTHONWARNINGS": "ignore"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=_REPO_ROOT,
+        check=True,
+    )
+    modules: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        modules[fields[2].strip()] = int(fields[0])
+    return modules
+
+
+def profile_import(module: str, repeat: int = 3) -> ImportProfile:
+    """Measure *module*'s cold import, keeping the fastest of *repeat* runs."""
+
+    baseline = set(_run_importtime("pass"))
+    best: dict[str, int] | None = None
+    for _ in range(repeat):
+        loaded = {m: us for m, us in _run_importtime(f"import {module}").items() if m not in baseline}
+        if best is None or sum(loaded.values()) < sum(best.values()):
+            best = loaded
+    assert best is not None
+    slowest = sorted(best.items(), key=lambda kv: kv[1], reverse=True)[:10]
+    return ImportProfile(
+        module=module,
+        total_ms=round(sum(best.values()) / 1000, 1),
+        module_count=len(best),
+        slowest=[(name, round(us / 1000, 1)) for name, us in slowest],
+        modules=sorted(best),
+    )
+
+
+def load_budgets(path: str = BUDGETS_PATH) -> dict[str, Any]:
+    """Return ``{"calibration_us": float, "modules": {module: budget}}``."""
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)  # type: ignore[no-any-return]
+
+
+def machine_scale(budgets: dict[str, Any], calibration_us: float) -> float:
+    """Factor to stretch time budgets by on a machine slower than the one that wrote them."""
+
+    return max(1.0, calibration_us / budgets["calibration_us"])
+
+
+def check_budget(profile: ImportProfile, budget: dict[str, float], scale: float = 1.0) -> list[str]:
+    """Return human-readable violations of *budget* (empty when within budget).
+
+    *scale* (see :func:`machine_scale`) stretches the time budget only.
+    """
+
+    errors: list[str] = []
+    max_ms = round(budget["max_ms"] * scale, 1)
+    if profile.total_ms > max_ms:
+        scaled = f" (x{scale:.2f} for machine speed)" if scale != 1.0 else ""
+        errors.append(
+            f"{profile.module}: cold import {profile.total_ms} ms > budget {max_ms} ms{scaled}"
+        )
+    if profile.module_count > budget["max_modules"]:
+        errors.append(
+            f"{profile.module}: {profile.module_count} modules loaded > budget "
+            f"{int(budget['max_modules'])}"
+        )
+    return errors
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Cold-import time / module count benchmark")
+    p.add_argument("modules", nargs="*", default=list(DEFAULT_TARGETS))
+    p.add_argument("--check", action="store_true", help="Fail when a budget is exceeded")
+    p.add_argument("--update", action="store_true", help="Rewrite budgets from this run")
+    p.add_argument("--headroom", type=float, default=1.5, help="Multiplier used by --update")
+    p.add_argument("--repeat", type=int, default=3)
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    profiles = [profile_import(m, args.repeat) for m in args.modules]
+
+    for prof in profiles:
+        print(f"{prof.module}: {prof.total_ms} ms, {prof.module_count} modules")
+        for name, ms in prof.slowest[:5]:
+            print(f"    {ms:>8.1f} ms  {name}")
+
+    if args.update:
+        modules = {
+            prof.module: {
+                # Absolute floor so tiny imports are not at the mercy of jitter.
+                "max_ms": round(max(prof.total_ms * args.headroom, prof.total_ms + 25), 1),
+                "max_modules": int(prof.module_count * 1.1) + 5,
+            }
+            for prof in profiles
+        }
+        budgets = {"calibration_us": round(calibrate(), 3), "modules": modules}
+        with open(BUDGETS_PATH, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"Budgets written to {BUDGETS_PATH}")
+
+    if args.check:
+        budgets = load_budgets()
+        scale = machine_scale(budgets, calibrate())
+        errors = [
+            error
+            for prof in profiles
+            if prof.module in budgets["modules"]
+            for error in check_budget(prof, budgets["modules"][prof.module], scale)
+        ]
+        for error in errors:
+            print(f"FAIL {error}", file=sys.stderr)
+        return 1 if errors else 0
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
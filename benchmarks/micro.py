@@ -0,0 +1,331 @@
+"""Microbenchmarks of the per-turn hot paths, gated against stored baselines.
+
+Each benchmark times one call of a function that runs on every turn (or on
+every PDF request) with a fixed, deterministic input:
+
+* ``collect_context`` on a short (3 messages) and a long (200 messages,
+  ~1 KB each) transcript, through its ``messages=`` entry point;
+* the crisis/PII regexes (:func:`app.core.safety.screen`) on a ~2 KB safe
+  message – the worst case, every pattern scans the whole text;
+* ``LangCallback._detect_lang`` on its character-heuristic fallback
+  (``GOOGLE_API_KEY`` unset);
+* ``SafetyGuard`` on a ~20 KB message;
+* ``build_pdf_bytes`` for a typical intake and analysis;
+* ``decide_next_action`` through a full stubbed session (greeting, intake,
+  reframe, PDF accept) on a fresh orchestrator;
+* ``OrchestratorAssistant.get_tools()``.
+
+Timings are the best of ``--repeat`` runs, in microseconds per call.  Since
+absolute numbers depend on the machine, every run also times the fixed
+pure-Python loop of :mod:`benchmarks.calibration` and compares benchmarks
+as multiples of it; ``--check`` fails when a benchmark is more than
+``--tolerance`` slower than its baseline after that scaling.
+
+Usage::
+
+    python -m benchmarks.micro                     # print the report
+    python -m benchmarks.micro --check             # exit 1 on a regression
+    python -m benchmarks.micro --update            # rewrite baselines from this machine
+    python -m benchmarks.micro pdf_build get_tools # run a subset
+
+Baselines live in ``benchmarks/micro_baselines.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from benchmarks.calibration import DEFAULT_MIN_TIME, calibrate
+
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), "micro_baselines.json")
+DEFAULT_TOLERANCE = 0.5  # fail when > 50 % slower than the baseline
+
+_INTAKE = 'Me llamo Ana, tengo 32 años y tengo ansiedad social. En la reunión pensé "soy incompetente"'
+_SAFE_TEXT = (
+    "Últimamente me cuesta dormir y en el trabajo siento que todos me juzgan; "
+    "ayer en la reunión me quedé en blanco y pensé que iban a despedirme. "
+)
+_ANALYSIS = (
+    "```json\n"
+    + json.dumps(
+        {
+            "distortions": ["MW", "LB"],
+            "reframe_suggestion": "Quedarte en blanco una vez no define tu competencia.",
+            "certainty_before": 80,
+            "certainty_after": 40,
+        }
+    )
+    + "\n```"
+)
+
+# A benchmark factory prepares its inputs and returns the (sync or async)
+# zero-argument callable to time; setup cost is not measured.
+Factory = Callable[[], Callable[[], Any]]
+BENCHMARKS: dict[str, Factory] = {}
+
+
+def benchmark(name: str) -> Callable[[Factory], Factory]:
+    def register(factory: Factory) -> Factory:
+        BENCHMARKS[name] = factory
+        return factory
+
+    return register
+
+
+def _transcript(turns: int, chars: int) -> list[dict[str, Any]]:
+    filler = (_SAFE_TEXT * (chars // len(_SAFE_TEXT) + 1))[:chars]
+    messages = [{"role": "user", "content": _INTAKE}]
+    for i in range(turns - 1):
+        role = "assistant" if i % 2 == 0 else "user"
+        messages.append({"role": role, "content": filler})
+    return messages
+
+
+@benchmark("collect_context_short")
+def _collect_context_short() -> Callable[[], Any]:
+    from app.assistants.functions.collect import collect_context
+
+    messages = _transcript(3, 120)
+    return lambda: collect_context(messages=messages)
+
+
+@benchmark("collect_context_long")
+def _collect_context_long() -> Callable[[], Any]:
+    from app.assistants.functions.collect import collect_context
+
+    messages = _transcript(200, 1000)
+    return lambda: collect_context(messages=messages)
+
+
+@benchmark("crisis_regex")
+def _crisis_regex() -> Callable[[], Any]:
+    from app.core.safety import screen
+
+    text = _SAFE_TEXT * 14  # ~2 KB, no match
+    return lambda: screen(text)
+
+
+@benchmark("detect_lang_fallback")
+def _detect_lang_fallback() -> Callable[[], Any]:
+    from app.callbacks.lang_detect import LangCallback
+    from app.core import lang
+
+    if lang.get_translate_client() is not None:
+        raise RuntimeError("detect_lang_fallback needs GOOGLE_API_KEY unset")
+    text = "I keep thinking everyone at work judges me. " * 10
+    return lambda: LangCallback._detect_lang(text)
+
+
+@benchmark("safety_guard_long")
+def _safety_guard_long() -> Callable[[], Any]:
+    from google.genai import types
+
+    from app.callbacks.safety_filters import SafetyGuard
+
+    guard = SafetyGuard()
+    content = types.Content(role="user", parts=[types.Part(text=_SAFE_TEXT * 140)])  # ~20 KB
+    context = SimpleNamespace(user_content=content, state={}, actions=None)
+    return lambda: guard(callback_context=context, llm_request=None)
+
+
+@benchmark("pdf_build")
+def _pdf_build() -> Callable[[], Any]:
+    from app.tools.pdf_generator import build_pdf_bytes
+
+    intake = {"name": "Ana", "age": 32, "reason": "ansiedad social", "trigger_situation": "reunión"}
+    return lambda: build_pdf_bytes(intake, _ANALYSIS)
+
+
+@benchmark("stubbed_session")
+def _stubbed_session() -> Callable[[], Any]:
+    from app.assistants.orchestrator_assistant import OrchestratorAssistant
+
+    script = ("Hola, necesito ayuda", _INTAKE, "Sí, por favor")
+
+    async def session() -> None:
+        orchestrator = OrchestratorAssistant(use_stubs=True)
+        for text in script:
+            await orchestrator.respond(text)
+
+    return session
+
+
+@benchmark("get_tools")
+def _get_tools() -> Callable[[], Any]:
+    from app.assistants.orchestrator_assistant import OrchestratorAssistant
+
+    return OrchestratorAssistant(use_stubs=True).get_tools
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Result:
+    name: str
+    us_per_call: float
+    calls: int
+
+
+@contextmanager
+def hermetic_env() -> Iterator[None]:
+    """Offline stubs, no Translation client, a dummy OpenAI key."""
+
+    saved = dict(os.environ)
+    os.environ.update(OFFLINE="1", SESSION_STORE="memory")
+    if not os.environ.get("OPENAI_API_KEY"):
+        os.environ["OPENAI_API_KEY"] = "sk-bench"
+    os.environ.pop("GOOGLE_API_KEY", None)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def _timer(fn: Callable[[], Any], loop: asyncio.AbstractEventLoop) -> Callable[[int], float]:
+    """Call *fn* once (warm-up) and return ``time(n)``: seconds for *n* calls.
+
+    Callables returning a coroutine are awaited, *n* calls per loop run.
+    """
+
+    first = fn()
+    if asyncio.iscoroutine(first):
+        loop.run_until_complete(first)
+
+        async def many(n: int) -> None:
+            for _ in range(n):
+                await fn()
+
+        def time_async(n: int) -> float:
+            start = time.perf_counter()
+            loop.run_until_complete(many(n))
+            return time.perf_counter() - start
+
+        return time_async
+
+    def time_sync(n: int) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return time.perf_counter() - start
+
+    return time_sync
+
+
+def measure(fn: Callable[[], Any], *, repeat: int = 5, min_time: float = DEFAULT_MIN_TIME) -> tuple[float, int]:
+    """Return (best µs per call, calls per repeat) for *fn*, sync or async."""
+
+    loop = asyncio.new_event_loop()
+    try:
+        run = _timer(fn, loop)
+        calls = 1
+        while (elapsed := run(calls)) < min_time:
+            calls = max(calls * 2, int(calls * min_time / max(elapsed, 1e-9)))
+        best = elapsed
+        for _ in range(repeat - 1):
+            best = min(best, run(calls))
+    finally:
+        loop.close()
+    return best / calls * 1e6, calls
+
+
+def run_suite(
+    names: list[str] | None = None, *, repeat: int = 5, min_time: float = DEFAULT_MIN_TIME
+) -> list[Result]:
+    results = []
+    with hermetic_env():
+        for name in names or list(BENCHMARKS):
+            if name not in BENCHMARKS:
+                raise ValueError(f"Unknown benchmark {name!r}; choose from {sorted(BENCHMARKS)}")
+            us, calls = measure(BENCHMARKS[name](), repeat=repeat, min_time=min_time)
+            results.append(Result(name, round(us, 3), calls))
+    return results
+
+
+def load_baselines(path: str = BASELINES_PATH) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)  # type: ignore[no-any-return]
+
+
+def check_regressions(
+    results: list[Result],
+    calibration_us: float,
+    baselines: dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """Return human-readable regressions (empty when every result is within tolerance).
+
+    Results and baselines are compared in calibration units, so a uniformly
+    slower machine does not count as a regression.
+    """
+
+    errors: list[str] = []
+    for result in results:
+        baseline_us = baselines["benchmarks"].get(result.name)
+        if baseline_us is None:
+            continue
+        ratio = (result.us_per_call / calibration_us) / (baseline_us / baselines["calibration_us"])
+        if ratio > 1 + tolerance:
+            errors.append(
+                f"{result.name}: {result.us_per_call} µs/call is {ratio:.2f}x the baseline "
+                f"({baseline_us} µs at calibration {baselines['calibration_us']} µs, now {calibration_us:.3f} µs)"
+            )
+    return errors
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Hot-path microbenchmarks with baseline regression gates")
+    p.add_argument("benchmarks", nargs="*", help=f"Subset to run (default: all of {', '.join(BENCHMARKS)})")
+    p.add_argument("--check", action="store_true", help="Fail when a benchmark regressed")
+    p.add_argument("--update", action="store_true", help="Rewrite baselines from this run")
+    p.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown (0.5 = 50 %%)")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="Seconds per repeat")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:  # pragma: no cover - CLI
+    args = _parse_args(argv)
+    calibration_us = calibrate(args.repeat, args.min_time)
+    results = run_suite(args.benchmarks, repeat=args.repeat, min_time=args.min_time)
+    baselines = load_baselines() if os.path.exists(BASELINES_PATH) else {"calibration_us": 1.0, "benchmarks": {}}
+
+    print(f"calibration: {calibration_us:.3f} µs/call")
+    scale = calibration_us / baselines["calibration_us"]
+    for result in results:
+        baseline_us = baselines["benchmarks"].get(result.name)
+        delta = f"{result.us_per_call / (baseline_us * scale) - 1:+.0%}" if baseline_us else "new"
+        print(f"{result.name:<24} {result.us_per_call:>12.3f} µs/call  {delta:>6}  ({result.calls} calls)")
+
+    if args.update:
+        # Keep entries of benchmarks not run this time, rescaled to this machine.
+        kept = {name: round(us * scale, 3) for name, us in baselines["benchmarks"].items()}
+        kept.update({result.name: result.us_per_call for result in results})
+        with open(BASELINES_PATH, "w", encoding="utf-8") as f:
+            json.dump({"calibration_us": round(calibration_us, 3), "benchmarks": kept}, f, indent=2)
+            f.write("\n")
+        print(f"Baselines written to {BASELINES_PATH}")
+
+    if args.check:
+        errors = check_regressions(results, calibration_us, baselines, args.tolerance)
+        for error in errors:
+            print(f"FAIL {error}", file=sys.stderr)
+        return 1 if errors else 0
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,432 @@
+"""Deterministic local stand-in for the OpenAI Assistants and Chat Completions APIs.
+
+Point the real client at it to benchmark the real code paths offline
+(``AsyncOpenAI`` connection pooling, retries, run polling and stream
+parsing), unlike ``OrchestratorStubs`` which bypasses the client::
+
+    python -m benchmarks.openai_standin --port 8100 --rtt lognormal:0.08:0.3 --model 0.6
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=sk-local OFFLINE=0 uvicorn app.main:app
+
+Served endpoints (``/v1`` prefix): ``assistants`` (create), ``threads``
+(create/delete), ``threads/{id}/messages`` (create/list with ``after``
+paging), ``threads/{id}/runs`` (create/retrieve/``submit_tool_outputs``,
+including ``requires_action``) and ``chat/completions`` (plain and
+streamed, with ``stream_options.include_usage``).
+
+Replies follow a *script*: the first rule whose ``match`` regex matches the
+latest user message answers with a tool call (``tool`` / ``arguments``; ``{name}``
+placeholders are filled from named groups) or a ``reply``.  Anything else,
+and every turn after tool outputs, gets the default reply.  The default
+script turns ``[tool:collect_context]`` into a ``collect_context`` call.
+
+Latencies are distributions (see :func:`parse_latency`) drawn from a seeded
+RNG: ``--rtt`` is added to every request, ``--model`` is the generation
+time (run time until it leaves ``in_progress``, or time to first streamed
+token), ``--token`` the gap between streamed chunks.  ``--error-rate``
+fails that fraction of requests with ``--error-status``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+import itertools
+import json
+import math
+import random
+import re
+import time
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_REPLY = "Entiendo. ¿Qué pasó después?"
+DEFAULT_RULES: tuple[dict[str, Any], ...] = ({"match": r"\[tool:(?P<tool>\w+)\]", "tool": "{tool}"},)
+CHARS_PER_TOKEN = 4
+
+Latency = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str | float) -> Latency:
+    """Parse a latency distribution in seconds.
+
+    ``"0.1"`` (fixed), ``"uniform:LOW:HIGH"``, ``"normal:MEAN:SD"`` (clipped at
+    0) or ``"lognormal:MEDIAN:SIGMA"`` (long tail, like real API latency).
+    """
+
+    kind, *params = str(spec).split(":")
+    if not params:
+        value = float(kind)
+        return lambda rng: value
+    a, b = (float(p) for p in params)
+    if kind == "uniform":
+        return lambda rng: rng.uniform(a, b)
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(a, b))
+    if kind == "lognormal":
+        mu = math.log(a)
+        return lambda rng: rng.lognormvariate(mu, b)
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+@dataclass
+class StandinConfig:
+    rtt: Latency = field(default_factory=lambda: parse_latency(0.0))
+    model: Latency = field(default_factory=lambda: parse_latency(0.0))
+    token: Latency = field(default_factory=lambda: parse_latency(0.0))
+    error_rate: float = 0.0
+    error_status: int = 500
+    poll_after_ms: int = 50
+    seed: int = 0
+    rules: tuple[dict[str, Any], ...] = DEFAULT_RULES
+    reply: str = DEFAULT_REPLY
+
+
+@dataclass
+class _Run:
+    id: str
+    thread_id: str
+    assistant_id: str
+    ready_at: float
+    # Outcome once ready: a tool call (name, arguments) or a reply text
+    tool: tuple[str, dict[str, Any]] | None
+    reply: str | None
+    call_id: str | None = None
+    status: str = "queued"
+    usage: dict[str, int] | None = None
+
+
+def _tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _usage(prompt: str, completion: str) -> dict[str, int]:
+    p, c = _tokens(prompt), _tokens(completion)
+    return {"prompt_tokens": p, "completion_tokens": c, "total_tokens": p + c}
+
+
+class Standin:
+    """State and scripted behaviour behind the HTTP app."""
+
+    def __init__(self, config: StandinConfig) -> None:
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.ids = itertools.count(1)
+        self.threads: dict[str, list[dict[str, Any]]] = {}
+        self.runs: dict[str, _Run] = {}
+        self.requests = 0
+        self.errors = 0
+
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self.ids):08d}"
+
+    def decide(self, text: str) -> tuple[tuple[str, dict[str, Any]] | None, str]:
+        """Return (tool call or None, reply text) for the latest user *text*."""
+
+        for rule in self.config.rules:
+            match = re.search(rule["match"], text)
+            if match is None:
+                continue
+            if rule.get("tool"):
+                groups = match.groupdict()
+                return (rule["tool"].format(**groups), dict(rule.get("arguments") or {})), ""
+            return None, rule.get("reply", self.config.reply)
+        return None, self.config.reply
+
+    def message(self, thread_id: str, role: str, text: str, run_id: str | None = None) -> dict[str, Any]:
+        message = {
+            "id": self.new_id("msg"),
+            "object": "thread.message",
+            "created_at": int(time.time()),
+            "thread_id": thread_id,
+            "role": role,
+            "status": "completed",
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+            "assistant_id": None,
+            "run_id": run_id,
+            "attachments": [],
+            "metadata": {},
+        }
+        self.threads[thread_id].append(message)
+        return message
+
+    def run_object(self, run: _Run) -> dict[str, Any]:
+        if run.status in ("queued", "in_progress") and time.monotonic() >= run.ready_at:
+            self._finish(run)
+        elif run.status == "queued":
+            run.status = "in_progress"
+        body: dict[str, Any] = {
+            "id": run.id,
+            "object": "thread.run",
+            "created_at": int(time.time()),
+            "thread_id": run.thread_id,
+            "assistant_id": run.assistant_id,
+            "status": run.status,
+            "model": "standin",
+            "instructions": "",
+            "tools": [],
+            "parallel_tool_calls": True,
+            "required_action": None,
+            "usage": run.usage,
+            "metadata": {},
+        }
+        if run.status == "requires_action" and run.tool is not None:
+            name, arguments = run.tool
+            body["required_action"] = {
+                "type": "submit_tool_outputs",
+                "submit_tool_outputs": {
+                    "tool_calls": [
+                        {
+                            "id": run.call_id,
+                            "type": "function",
+                            "function": {"name": name, "arguments": json.dumps(arguments)},
+                        }
+                    ]
+                },
+            }
+        return body
+
+    def _finish(self, run: _Run) -> None:
+        thread = self.threads[run.thread_id]
+        prompt = " ".join(m["content"][0]["text"]["value"] for m in thread)
+        if run.tool is not None:
+            run.status = "requires_action"
+            run.call_id = self.new_id("call")
+            run.usage = _usage(prompt, json.dumps(run.tool[1]))
+        else:
+            run.status = "completed"
+            reply = run.reply or self.config.reply
+            self.message(run.thread_id, "assistant", reply, run.id)
+            run.usage = _usage(prompt, reply)
+
+
+def create_app(config: StandinConfig | None = None) -> FastAPI:
+    """Return the stand-in ASGI app (state lives in ``app.state.standin``)."""
+
+    standin = Standin(config or StandinConfig())
+    cfg = standin.config
+    app = FastAPI(title="OpenAI stand-in")
+    app.state.standin = standin
+
+    @app.middleware("http")
+    async def latency_and_errors(request: Request, call_next):
+        standin.requests += 1
+        await asyncio.sleep(cfg.rtt(standin.rng))
+        if cfg.error_rate and standin.rng.random() < cfg.error_rate:
+            standin.errors += 1
+            return JSONResponse(
+                status_code=cfg.error_status,
+                content={"error": {"message": "injected failure", "type": "server_error", "code": None}},
+            )
+        return await call_next(request)
+
+    @app.post("/v1/assistants")
+    async def create_assistant(request: Request):
+        body = await request.json()
+        return {
+            "id": standin.new_id("asst"),
+            "object": "assistant",
+            "created_at": int(time.time()),
+            "model": body.get("model", "standin"),
+            "name": body.get("name"),
+            "instructions": body.get("instructions"),
+            "tools": body.get("tools", []),
+            "metadata": {},
+        }
+
+    @app.post("/v1/threads")
+    async def create_thread():
+        thread_id = standin.new_id("thread")
+        standin.threads[thread_id] = []
+        return {"id": thread_id, "object": "thread", "created_at": int(time.time()), "metadata": {}}
+
+    @app.delete("/v1/threads/{thread_id}")
+    async def delete_thread(thread_id: str):
+        standin.threads.pop(thread_id, None)
+        return {"id": thread_id, "object": "thread.deleted", "deleted": True}
+
+    @app.post("/v1/threads/{thread_id}/messages")
+    async def create_message(thread_id: str, request: Request):
+        body = await request.json()
+        content = body.get("content")
+        text = content if isinstance(content, str) else json.dumps(content)
+        return standin.message(thread_id, body.get("role", "user"), text)
+
+    @app.get("/v1/threads/{thread_id}/messages")
+    async def list_messages(thread_id: str, order: str = "desc", limit: int = 20, after: str | None = None):
+        messages = list(standin.threads.get(thread_id, ()))
+        if order == "desc":
+            messages.reverse()
+        if after is not None:
+            ids = [m["id"] for m in messages]
+            messages = messages[ids.index(after) + 1 :] if after in ids else []
+        page = messages[:limit]
+        return {
+            "object": "list",
+            "data": page,
+            "first_id": page[0]["id"] if page else None,
+            "last_id": page[-1]["id"] if page else None,
+            "has_more": len(messages) > limit,
+        }
+
+    def _run_response(run: _Run) -> JSONResponse:
+        return JSONResponse(standin.run_object(run), headers={"openai-poll-after-ms": str(cfg.poll_after_ms)})
+
+    @app.post("/v1/threads/{thread_id}/runs")
+    async def create_run(thread_id: str, request: Request):
+        body = await request.json()
+        users = [m for m in standin.threads.get(thread_id, ()) if m["role"] == "user"]
+        tool, reply = standin.decide(users[-1]["content"][0]["text"]["value"] if users else "")
+        run = _Run(
+            id=standin.new_id("run"),
+            thread_id=thread_id,
+            assistant_id=body.get("assistant_id", ""),
+            ready_at=time.monotonic() + cfg.model(standin.rng),
+            tool=tool,
+            reply=reply,
+        )
+        standin.runs[run.id] = run
+        return _run_response(run)
+
+    @app.get("/v1/threads/{thread_id}/runs/{run_id}")
+    async def retrieve_run(thread_id: str, run_id: str):
+        return _run_response(standin.runs[run_id])
+
+    @app.post("/v1/threads/{thread_id}/runs/{run_id}/submit_tool_outputs")
+    async def submit_tool_outputs(thread_id: str, run_id: str):
+        run = standin.runs[run_id]
+        run.status, run.tool, run.reply = "queued", None, cfg.reply
+        run.ready_at = time.monotonic() + cfg.model(standin.rng)
+        return _run_response(run)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        last = messages[-1] if messages else {}
+        tool, reply = standin.decide(str(last.get("content") or "")) if last.get("role") == "user" else (None, cfg.reply)
+        prompt = " ".join(str(m.get("content") or "") for m in messages)
+        completion_id = standin.new_id("chatcmpl")
+        model = body.get("model", "standin")
+        tool_calls = None
+        if tool is not None:
+            name, arguments = tool
+            tool_calls = [
+                {
+                    "id": standin.new_id("call"),
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(arguments)},
+                }
+            ]
+        usage = _usage(prompt, reply or json.dumps(tool[1] if tool else {}))
+        finish = "tool_calls" if tool_calls else "stop"
+
+        if not body.get("stream"):
+            await asyncio.sleep(cfg.model(standin.rng))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": reply or None, "tool_calls": tool_calls},
+                        "finish_reason": finish,
+                        "logprobs": None,
+                    }
+                ],
+                "usage": usage,
+            }
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: dict[str, Any], finish_reason: str | None = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events() -> AsyncIterator[str]:
+            await asyncio.sleep(cfg.model(standin.rng))
+            if tool_calls:
+                calls = [{"index": 0, **tool_calls[0]}]
+                yield chunk({"role": "assistant", "tool_calls": calls})
+            else:
+                words = reply.split(" ")
+                for i, word in enumerate(words):
+                    delta: dict[str, Any] = {"content": word if i == 0 else " " + word}
+                    if i == 0:
+                        delta["role"] = "assistant"
+                    yield chunk(delta)
+                    await asyncio.sleep(cfg.token(standin.rng))
+            yield chunk({}, finish)
+            if include_usage:
+                data = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [],
+                    "usage": usage,
+                }
+                yield f"data: {json.dumps(data)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/_standin/stats")
+    async def stats():
+        return {"requests": standin.requests, "errors": standin.errors, "threads": len(standin.threads)}
+
+    return app
+
+
+def config_from_args(args: argparse.Namespace) -> StandinConfig:
+    rules = DEFAULT_RULES
+    reply = DEFAULT_REPLY
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = json.load(f)
+        rules = tuple(script.get("rules", rules))
+        reply = script.get("reply", reply)
+    return StandinConfig(
+        rtt=parse_latency(args.rtt),
+        model=parse_latency(args.model),
+        token=parse_latency(args.token),
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        poll_after_ms=args.poll_after_ms,
+        seed=args.seed,
+        rules=rules,
+        reply=reply,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    import uvicorn
+
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8100)
+    p.add_argument("--rtt", default="0.05", help="Per-request latency distribution (s)")
+    p.add_argument("--model", default="0.5", help="Generation time distribution (s)")
+    p.add_argument("--token", default="0.02", help="Gap between streamed chunks (s)")
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--error-status", type=int, default=500)
+    p.add_argument("--poll-after-ms", type=int, default=50, help="openai-poll-after-ms sent with runs")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--script", help='JSON file: {"rules": [{"match", "tool", "arguments", "reply"}], "reply"}')
+    args = p.parse_args(argv)
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,200 @@
+"""Per-turn latency of the Assistants vs. Chat Completions orchestrator backends.
+
+Drives ``OrchestratorAssistant.run_assistant`` / ``submit_tool_outputs``
+for ``--turns`` turns per backend; every ``--tool-every``-th turn makes one
+tool call before the final reply.
+
+By default the OpenAI client is simulated: each request costs ``--rtt``
+seconds, generating a reply costs ``--model`` seconds, and Assistants runs
+are polled every ``--poll`` seconds (the SDK default is 1 s unless the
+server sends ``openai-poll-after-ms``).  The simulation counts round trips
+rather than modelling OpenAI's queueing, so use ``--live`` (needs
+``OPENAI_API_KEY``) for real numbers, or ``--live`` against the local
+stand-in (``benchmarks.openai_standin``) to include the real client's HTTP,
+pooling and polling costs offline.
+
+Usage::
+
+    python -m benchmarks.orchestrator_backends --turns 20 --rtt 0.08 --model 0.6 --poll 0.5
+    python -m benchmarks.orchestrator_backends --live --turns 5
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=sk-local \
+        python -m benchmarks.orchestrator_backends --live --turns 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+
+# Also what benchmarks.openai_standin's default script turns into a tool call
+_TOOL_MARK = "[tool:collect_context]"
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class SimulatedOpenAI:
+    """Just enough of ``AsyncOpenAI`` for both backends, with simulated latency."""
+
+    def __init__(self, rtt: float, model: float, poll: float) -> None:
+        self.rtt, self.model, self.poll = rtt, model, poll
+        self.requests = 0
+        self._ids = itertools.count()
+        self._last_user = ""
+        self._pending: dict[str, SimpleNamespace] = {}
+        messages = SimpleNamespace(create=self._message_create, list=self._message_list)
+        runs = SimpleNamespace(create=self._run, submit_tool_outputs=self._submit, poll=self._poll)
+        self.beta = SimpleNamespace(
+            assistants=SimpleNamespace(create=self._create),
+            threads=SimpleNamespace(create=self._create, messages=messages, runs=runs),
+        )
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+
+    async def _request(self, seconds: float = 0.0) -> None:
+        self.requests += 1
+        await asyncio.sleep(self.rtt + seconds)
+
+    async def _create(self, **_: Any) -> SimpleNamespace:
+        await self._request()
+        return SimpleNamespace(id=f"obj_{next(self._ids)}")
+
+    async def _message_create(self, *, content: str, **_: Any) -> None:
+        self._last_user = content
+        await self._request()
+
+    async def _message_list(self, **_: Any) -> SimpleNamespace:
+        await self._request()
+        text = SimpleNamespace(value="Entiendo. ¿Qué pasó después?")
+        return SimpleNamespace(data=[SimpleNamespace(content=[SimpleNamespace(text=text)])])
+
+    async def _poll(self, run_id: str, **_: Any) -> SimpleNamespace:
+        waited = 0.0
+        while waited < self.model:  # each poll is one more request
+            await self._request(self.poll)
+            waited += self.poll
+        return self._pending.pop(run_id)
+
+    def _tool_run(self) -> SimpleNamespace:
+        call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="collect_context", arguments="{}"))
+        action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=[call]))
+        return SimpleNamespace(id="run_1", status="requires_action", required_action=action, usage=None)
+
+    async def _queued(self, final: SimpleNamespace) -> SimpleNamespace:
+        await self._request()  # create / submit
+        self._pending[final.id] = final
+        return SimpleNamespace(id=final.id, status="queued", usage=None)
+
+    async def _run(self, **_: Any) -> SimpleNamespace:
+        if _TOOL_MARK in self._last_user:
+            return await self._queued(self._tool_run())
+        return await self._queued(SimpleNamespace(id="run_1", status="completed", usage=None))
+
+    async def _submit(self, run_id: str, **_: Any) -> SimpleNamespace:
+        return await self._queued(SimpleNamespace(id=run_id, status="completed", usage=None))
+
+    async def _chat(self, *, messages: list[dict[str, Any]], **_: Any):
+        await self._request()
+        wants_tool = messages[-1]["role"] == "user" and _TOOL_MARK in messages[-1]["content"]
+        return self._stream(wants_tool)
+
+    async def _stream(self, wants_tool: bool):
+        def chunk(content=None, tool_calls=None, finish=None) -> SimpleNamespace:
+            delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish)], usage=None)
+
+        if wants_tool:
+            await asyncio.sleep(self.model)
+            fn = SimpleNamespace(name="collect_context", arguments="{}")
+            yield chunk(tool_calls=[SimpleNamespace(index=0, id="call_1", function=fn)], finish="tool_calls")
+            return
+        words = ["Entiendo.", "¿Qué", "pasó", "después?"]
+        for word in words:
+            await asyncio.sleep(self.model / len(words))
+            yield chunk(content=word + " ")
+        yield chunk(finish="stop")
+
+
+async def _turn(orchestrator: OrchestratorAssistant, message: str) -> tuple[float, float | None]:
+    """Return (turn latency, time to first streamed token)."""
+
+    start = time.perf_counter()
+    first: list[float] = []
+
+    async def on_delta(_: str) -> None:
+        if not first:
+            first.append(time.perf_counter() - start)
+
+    result = await orchestrator.run_assistant(message, on_delta=on_delta)
+    while result["status"] == "requires_action":
+        outputs = [{"tool_call_id": tc["id"], "output": '{"goal_reached": false}'} for tc in result["tool_calls"]]
+        result = await orchestrator.submit_tool_outputs(result["run_id"], outputs, on_delta=on_delta)
+    return time.perf_counter() - start, (first[0] if first else None)
+
+
+async def _bench(backend: str, args: argparse.Namespace) -> None:
+    if args.live:
+        from app.assistants.client import get_openai_client
+
+        client: Any = get_openai_client()
+    else:
+        client = SimulatedOpenAI(args.rtt, args.model, args.poll)
+    orchestrator = OrchestratorAssistant(openai_client=client, backend=backend)
+    if backend == "assistants":
+        # Setup is once per session/deployment; keep it out of the turn timings.
+        await orchestrator.create_assistant()
+        await orchestrator.create_thread()
+    requests_before = getattr(client, "requests", 0)
+
+    latencies: list[float] = []
+    ttfts: list[float] = []
+    for n in range(args.turns):
+        mark = f" {_TOOL_MARK}" if args.tool_every and n % args.tool_every == 0 else ""
+        latency, ttft = await _turn(orchestrator, f"Turno {n}: me cuesta hablar en público.{mark}")
+        latencies.append(latency)
+        if ttft is not None:
+            ttfts.append(ttft)
+
+    line = (
+        f"  {backend:<10} turn p50 {_percentile(latencies, 0.5) * 1e3:8.1f} ms"
+        f"  p95 {_percentile(latencies, 0.95) * 1e3:8.1f} ms"
+    )
+    if ttfts:
+        line += f"  first token p50 {_percentile(ttfts, 0.5) * 1e3:8.1f} ms"
+    if not args.live:
+        line += f"  requests/turn {(client.requests - requests_before) / args.turns:5.2f}"
+    print(line)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    if args.live:
+        print(f"live OpenAI, {args.turns} turns, tool call every {args.tool_every}")
+    else:
+        print(
+            f"simulated: rtt {args.rtt * 1e3:.0f} ms, model {args.model * 1e3:.0f} ms, "
+            f"poll {args.poll * 1e3:.0f} ms, {args.turns} turns, tool call every {args.tool_every}"
+        )
+    for backend in ("assistants", "chat"):
+        await _bench(backend, args)
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--turns", type=int, default=20)
+    p.add_argument("--tool-every", type=int, default=2, help="Every N-th turn makes a tool call (0: never)")
+    p.add_argument("--rtt", type=float, default=0.08, help="Simulated seconds per HTTP round trip")
+    p.add_argument("--model", type=float, default=0.6, help="Simulated seconds to generate a reply")
+    p.add_argument("--poll", type=float, default=0.5, help="Simulated Assistants run poll interval")
+    p.add_argument("--live", action="store_true", help="Use the real OpenAI client")
+    asyncio.run(main_async(p.parse_args(argv)))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
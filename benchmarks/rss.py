@@ -0,0 +1,68 @@
+"""Peak RSS of an OpenAI-only worker, measured in a fresh interpreter.
+
+The probe imports ``app.main`` and drives one intake through the real
+``collect_context`` and ``safe_complete`` tools — everything a stub-mode
+OpenAI worker touches on its hot path — then reports ``ru_maxrss`` and the
+number of loaded modules.
+
+Usage::
+
+    python -m benchmarks.rss
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import asyncio, json, resource, sys
+import app.main
+from app.assistants.functions import analyse_and_reframe, collect_context, safe_complete
+
+messages = [
+    {"role": "user", "content": "Me llamo Ana, tengo 32 años y vengo porque tengo ansiedad social."},
+    {"role": "user", "content": 'En la reunión pensé "todos creen que soy incompetente". Vergüenza 8/10'},
+]
+result = asyncio.run(collect_context(messages=messages))
+asyncio.run(safe_complete("me quiero suicidar"))
+print(json.dumps({
+    "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "modules": len(sys.modules),
+    "adk_loaded": "google.adk" in sys.modules,
+}))
+"""
+
+
+def measure() -> dict[str, float]:
+    """Run the probe in a subprocess and return its JSON report."""
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": _REPO_ROOT,
+        "PYTHONWARNINGS": "ignore",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "sk-offline"),
+    }
+    # Keep the probe offline: no Translate calls.
+    env.pop("GOOGLE_API_KEY", None)
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=_REPO_ROOT,
+        check=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])  # type: ignore[no-any-return]
+
+
+def main() -> None:  # pragma: no cover
+    print(json.dumps(measure(), indent=2))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
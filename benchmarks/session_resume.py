@@ -0,0 +1,118 @@
+"""Snapshot size, event bytes and resume time of persisted orchestrator sessions.
+
+Drives ``--sessions`` offline (stub) sessions through the full happy path
+followed by ``--extra-turns`` chat turns, recording each step with a
+:class:`~app.services.persistence.event_log.SessionJournal` into a temporary
+SQLite log.  Reports the bytes written per session (events vs. writing a full
+snapshot every step), the final snapshot size and the time to resume a
+session (one snapshot read + event replay + restore).
+
+Usage::
+
+    python -m benchmarks.session_resume --sessions 200 --extra-turns 20 --snapshot-every 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.services.persistence.codec import encode
+from app.services.persistence.event_log import (
+    DEFAULT_SNAPSHOT_EVERY,
+    SessionJournal,
+    SQLiteEventLog,
+    resume,
+)
+
+_HAPPY_PATH = (
+    None,
+    "Hola",
+    "Me llamo Ana, tengo 28 años y vengo porque me da miedo hablar en reuniones",
+    "Sí, por favor",
+)
+_USER = "Turno {i}: sigo pensando que todos notan lo nerviosa que estoy cuando hablo."
+_ASSISTANT = "Gracias por contarlo ({i}). ¿Qué evidencia tienes de que lo notan?"
+
+
+async def _drive(orchestrator: OrchestratorAssistant, message: str | None) -> None:
+    action = await orchestrator.decide_next_action(message)
+    while action["action"] == "tool_call":
+        await orchestrator.execute_tool_with_stubs(action["tool"], action["arguments"])
+        action = await orchestrator.decide_next_action()
+
+
+async def _session(log: SQLiteEventLog, session_id: str, extra_turns: int, snapshot_every: int) -> tuple[int, int]:
+    """Run one session; return (journal bytes, full-snapshot-per-step bytes)."""
+
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    journal = SessionJournal(log, session_id, snapshot_every=snapshot_every)
+    written = naive = 0
+
+    async def step(message: str | None) -> None:
+        nonlocal written, naive
+        await _drive(orchestrator, message)
+        written += journal.record(orchestrator)
+        naive += len(encode(orchestrator.snapshot()))
+
+    for message in _HAPPY_PATH:
+        await step(message)
+    for i in range(extra_turns):
+        orchestrator.session_state.add_user_message(_USER.format(i=i))
+        orchestrator.session_state.add_assistant_message(_ASSISTANT.format(i=i))
+        await step(None)
+    return written, naive
+
+
+async def run(sessions: int, extra_turns: int, snapshot_every: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        log = SQLiteEventLog(os.path.join(tmp, "sessions.sqlite3"))
+        written: list[int] = []
+        naive: list[int] = []
+        for n in range(sessions):
+            w, b = await _session(log, f"s{n}", extra_turns, snapshot_every)
+            written.append(w)
+            naive.append(b)
+
+        snapshot_sizes: list[int] = []
+        replayed: list[int] = []
+        timings: list[float] = []
+        for n in range(sessions):
+            stored = log.load(f"s{n}")
+            assert stored is not None and stored.snapshot is not None
+            snapshot_sizes.append(len(stored.snapshot))
+            replayed.append(len(stored.events))
+            start = time.perf_counter()
+            resumed = resume(log, f"s{n}", use_stubs=True)
+            timings.append(time.perf_counter() - start)
+            assert resumed is not None
+        log.close()
+
+    steps = len(_HAPPY_PATH) + extra_turns
+    timings.sort()
+    print(f"{sessions} sessions × {steps} steps, snapshot every {snapshot_every} events")
+    print(f"  written per session      {statistics.mean(written):>10.0f} B  (event log)")
+    print(f"  full snapshot per step   {statistics.mean(naive):>10.0f} B  "
+          f"({statistics.mean(written) / statistics.mean(naive):.1%} written by the log)")
+    print(f"  final snapshot           {statistics.mean(snapshot_sizes):>10.0f} B")
+    print(f"  events replayed          {statistics.mean(replayed):>10.1f}")
+    print(f"  resume p50 / p95         {timings[len(timings) // 2] * 1e3:>7.3f} / "
+          f"{timings[int(len(timings) * 0.95)] * 1e3:.3f} ms")
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sessions", type=int, default=200)
+    p.add_argument("--extra-turns", type=int, default=20)
+    p.add_argument("--snapshot-every", type=int, default=DEFAULT_SNAPSHOT_EVERY)
+    args = p.parse_args(argv)
+    asyncio.run(run(args.sessions, args.extra_turns, args.snapshot_every))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,172 @@
+"""Write-through vs. write-behind session persistence.
+
+``--sessions`` concurrent sessions each perform ``--updates`` orchestrator
+steps ``--interval`` seconds apart and record every step with a
+:class:`~app.services.persistence.event_log.SessionJournal`.  Two strategies:
+
+* ``write-through`` – every record is awaited as its own backend transaction
+  before the step returns (what a synchronous session service does);
+* ``write-behind`` – records go to :class:`WriteBehindEventLog`, which
+  coalesces and flushes in batches off the request path.
+
+Reports the latency added to each step, the backend transactions and rows
+written, and the total wall time.  Runs against a temporary SQLite file by
+default, or a Postgres server via ``--dsn``.
+
+Usage::
+
+    python -m benchmarks.session_store --sessions 200 --updates 20 --interval 0.005
+    python -m benchmarks.session_store --dsn postgresql://localhost/bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import os
+import tempfile
+import time
+
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.services.persistence.event_log import (
+    EventSink,
+    SessionJournal,
+    SessionWrite,
+    SQLiteEventLog,
+)
+from app.services.persistence.write_behind import (
+    AsyncEventLog,
+    ThreadedEventLog,
+    WriteBehindEventLog,
+)
+
+_USER = "Turno {n}: sigo pensando que todos notan lo nerviosa que estoy."
+
+
+class CountingBackend(AsyncEventLog):
+    """Wraps a backend and counts transactions / rows."""
+
+    def __init__(self, inner: AsyncEventLog) -> None:
+        self.inner = inner
+        self.transactions = 0
+        self.rows = 0
+
+    async def open(self) -> None:
+        await self.inner.open()
+
+    async def write_batch(self, writes: list[SessionWrite]) -> None:
+        self.transactions += 1
+        self.rows += sum((w.snapshot is not None) + len(w.events) for w in writes)
+        await self.inner.write_batch(writes)
+
+    async def load(self, session_id):
+        return await self.inner.load(session_id)
+
+    async def delete(self, session_id: str) -> None:
+        await self.inner.delete(session_id)
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+
+class _Collect(EventSink):
+    """Captures the journal's write so write-through can await it."""
+
+    def __init__(self) -> None:
+        self.write: SessionWrite | None = None
+
+    def append(self, session_id: str, seq: int, payload: bytes) -> None:
+        self.write = SessionWrite(session_id, events=[(seq, payload)])
+
+    def put_snapshot(self, session_id: str, seq: int, payload: bytes) -> None:
+        self.write = SessionWrite(session_id, (seq, payload))
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def _write_through(backend: AsyncEventLog, session_id: str, updates: int, interval: float, lat: list[float]) -> None:
+    sink = _Collect()
+    journal = SessionJournal(sink, session_id)
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    for n in range(updates):
+        orchestrator.session_state.add_user_message(_USER.format(n=n))
+        start = time.perf_counter()
+        journal.record(orchestrator)
+        if sink.write is not None:
+            await backend.write_batch([sink.write])
+            sink.write = None
+        lat.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def _write_behind(log: WriteBehindEventLog, session_id: str, updates: int, interval: float, lat: list[float]) -> None:
+    journal = SessionJournal(log, session_id)
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    for n in range(updates):
+        orchestrator.session_state.add_user_message(_USER.format(n=n))
+        start = time.perf_counter()
+        journal.record(orchestrator)
+        lat.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def _run(name: str, make_backend: Callable[[], AsyncEventLog], args: argparse.Namespace) -> None:
+    backend = CountingBackend(make_backend())
+    lat: list[float] = []
+    start = time.perf_counter()
+    if name == "write-through":
+        await backend.open()
+        await asyncio.gather(
+            *(_write_through(backend, f"s{i}", args.updates, args.interval, lat) for i in range(args.sessions))
+        )
+        await backend.close()
+    else:
+        log = WriteBehindEventLog(backend, max_delay=args.max_delay)
+        await log.start()
+        await asyncio.gather(
+            *(_write_behind(log, f"s{i}", args.updates, args.interval, lat) for i in range(args.sessions))
+        )
+        await log.close()
+    wall = time.perf_counter() - start
+    print(
+        f"  {name:<14} step p50 {_percentile(lat, 0.5) * 1e3:7.3f} ms  p99 {_percentile(lat, 0.99) * 1e3:7.3f} ms"
+        f"  tx {backend.transactions:>6}  rows {backend.rows:>6}  wall {wall:6.2f} s"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(
+        f"{args.sessions} sessions × {args.updates} updates, {args.interval * 1e3:.1f} ms apart, "
+        f"max_delay {args.max_delay * 1e3:.0f} ms"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for n, name in enumerate(("write-through", "write-behind")):
+            if args.dsn:
+                from app.services.persistence.postgres import PostgresEventLog
+
+                def make_backend() -> AsyncEventLog:
+                    return PostgresEventLog(args.dsn, max_size=args.pool_size)
+            else:
+                def make_backend(path: str = os.path.join(tmp, f"{n}.sqlite3")) -> AsyncEventLog:
+                    return ThreadedEventLog(SQLiteEventLog(path))
+
+            await _run(name, make_backend, args)
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sessions", type=int, default=200)
+    p.add_argument("--updates", type=int, default=20)
+    p.add_argument("--interval", type=float, default=0.005, help="Seconds between a session's updates")
+    p.add_argument("--max-delay", type=float, default=0.2, help="Write-behind staleness bound")
+    p.add_argument("--dsn", help="Postgres DSN; defaults to a temporary SQLite file")
+    p.add_argument("--pool-size", type=int, default=4)
+    asyncio.run(main_async(p.parse_args(argv)))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
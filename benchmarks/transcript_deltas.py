@@ -0,0 +1,102 @@
+"""Bytes written to ``state_delta`` per turn by the transcript accumulator.
+
+Replays a session of ``--turns`` user/assistant turns through
+:class:`~app.callbacks.transcript_acc.TranscriptAccumulator` against a state
+mapping that records the JSON size of every assignment — what ADK puts into
+each event's ``state_delta`` and ``DatabaseSessionService`` persists.  The
+legacy strategy (rewrite the whole ``conv_raw`` list every turn) is replayed
+alongside for comparison.
+
+Usage::
+
+    python -m benchmarks.transcript_deltas --turns 200 --compact-every 16
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import json
+from typing import Any
+from unittest.mock import MagicMock
+
+from google.genai.types import Content, Part
+
+from app.callbacks.transcript_acc import (
+    DEFAULT_COMPACT_EVERY,
+    TranscriptAccumulator,
+    read_transcript,
+)
+
+_USER = "Me siento {i} veces más nervioso cuando tengo que hablar en una reunión de equipo."
+_ASSISTANT = "Entiendo, gracias por compartirlo ({i}). ¿Qué pensamiento te vino a la mente?"
+
+
+class RecordingState(dict):
+    """Dict that counts the serialised bytes of every write."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.written = 0
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.written += len(json.dumps({key: value}, ensure_ascii=False).encode())
+        super().__setitem__(key, value)
+
+
+def _legacy_turn(state: RecordingState, i: int) -> None:
+    transcript = list(state.get("conv_raw", []))
+    transcript.append({"role": "user", "text": _USER.format(i=i)})
+    transcript.append({"role": "assistant", "text": _ASSISTANT.format(i=i)})
+    state["conv_raw"] = transcript
+
+
+def _delta_turn(compact_every: int) -> Callable[[RecordingState, int], None]:
+    from google.adk.models.llm_response import LlmResponse
+
+    acc = TranscriptAccumulator(compact_every)
+
+    def turn(state: RecordingState, i: int) -> None:
+        ctx = MagicMock()
+        ctx.state = state
+        ctx.user_content = Content(parts=[Part(text=_USER.format(i=i))])
+        reply = LlmResponse(content=Content(parts=[Part(text=_ASSISTANT.format(i=i))]))
+        acc(callback_context=ctx, llm_response=reply)
+
+    return turn
+
+
+def bytes_per_turn(turn: Callable[[RecordingState, int], None], turns: int) -> tuple[list[int], RecordingState]:
+    """Replay *turns* turns and return the bytes written by each one."""
+
+    state = RecordingState()
+    per_turn: list[int] = []
+    for i in range(turns):
+        before = state.written
+        turn(state, i)
+        per_turn.append(state.written - before)
+    return per_turn, state
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--turns", type=int, default=200)
+    p.add_argument("--compact-every", type=int, default=DEFAULT_COMPACT_EVERY)
+    args = p.parse_args(argv)
+
+    legacy, legacy_state = bytes_per_turn(_legacy_turn, args.turns)
+    delta, delta_state = bytes_per_turn(_delta_turn(args.compact_every), args.turns)
+    assert read_transcript(delta_state, args.compact_every) == legacy_state["conv_raw"]
+
+    print(f"{args.turns} turns, compaction every {args.compact_every}")
+    print(f"  {'turn':>6}  {'legacy B':>10}  {'delta B':>10}  {'delta avg B':>12}")
+    marks = sorted({1, 10, 50, 100, 200, 500, 1000, args.turns} & set(range(1, args.turns + 1)))
+    for n in marks:
+        avg = sum(delta[:n]) / n
+        print(f"  {n:>6}  {legacy[n - 1]:>10}  {delta[n - 1]:>10}  {avg:>12.0f}")
+    total_legacy, total_delta = sum(legacy), sum(delta)
+    print(f"  total  {total_legacy:>10}  {total_delta:>10}  ({total_delta / total_legacy:.1%} of legacy)")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
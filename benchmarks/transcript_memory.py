@@ -0,0 +1,75 @@
+"""Bytes per session of the transcript representation, measured with tracemalloc.
+
+Builds ``--sessions`` transcripts of ``--messages`` alternating user/assistant
+turns twice — once as the legacy list of ``{"role", "content"}`` dicts, once
+as :class:`~app.core.transcript.CompactTranscript` — and reports the traced
+allocation delta divided by the session count.  Message texts are created
+fresh for every message, like payloads arriving over a WebSocket.
+
+Usage::
+
+    python -m benchmarks.transcript_memory --sessions 2000 --messages 20
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+import gc
+import tracemalloc
+from typing import Any
+
+from app.core.transcript import CompactTranscript
+
+_USER = "Me siento {i} veces más nervioso cuando tengo que hablar en una reunión de equipo."
+_ASSISTANT = "Entiendo, gracias por compartirlo ({i}). ¿Qué pensamiento te vino a la mente?"
+
+
+def _legacy(messages: int) -> list[dict[str, str]]:
+    transcript: list[dict[str, str]] = []
+    for i in range(messages):
+        if i % 2:
+            transcript.append({"role": "assistant", "content": _ASSISTANT.format(i=i)})
+        else:
+            transcript.append({"role": "user", "content": _USER.format(i=i)})
+    return transcript
+
+
+def _compact(messages: int) -> CompactTranscript:
+    transcript = CompactTranscript()
+    for i in range(messages):
+        if i % 2:
+            transcript.append("assistant", _ASSISTANT.format(i=i))
+        else:
+            transcript.append("user", _USER.format(i=i))
+    return transcript
+
+
+def bytes_per_session(build: Callable[[int], Any], sessions: int, messages: int) -> float:
+    """Return traced bytes retained per session built by *build*."""
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(messages) for _ in range(sessions)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / sessions
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sessions", type=int, default=2000)
+    p.add_argument("--messages", type=int, default=20)
+    args = p.parse_args(argv)
+
+    legacy = bytes_per_session(_legacy, args.sessions, args.messages)
+    compact = bytes_per_session(_compact, args.sessions, args.messages)
+    print(f"{args.sessions} sessions × {args.messages} messages")
+    print(f"  list[dict]         {legacy:>10.0f} B/session")
+    print(f"  CompactTranscript  {compact:>10.0f} B/session  ({compact / legacy:.0%} of legacy)")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,358 @@
+"""WebSocket load generator for ``/chat/{session_id}`` with an SLO verdict.
+
+Opens ``--sessions`` concurrent sessions, each playing ``--conversations``
+scripted conversations from the ``--mix`` (happy path, PDF decline, crisis,
+PDF accept), and reports throughput, p50/p95/p99 turn latency (user frame
+sent → ``complete`` received), error rate and worker RSS.  The exit code is
+1 when p95 exceeds ``--slo-p95`` (``specs.md``: < 1.5 s), the error rate
+exceeds ``--max-error-rate``, or a conversation ends in the wrong phase.
+
+By default the app runs in-process (``app.main`` driven through ASGI, no
+socket, stub tools unless ``OFFLINE=0``); pass ``--url`` to load a running
+server over real WebSockets, and ``--pid`` to report that worker's RSS::
+
+    python -m benchmarks.ws_load --sessions 50 --conversations 4
+    python -m benchmarks.ws_load --url ws://127.0.0.1:8000 --pid 1234 --sessions 200
+
+Combine with ``benchmarks.openai_standin`` (``OFFLINE=0 OPENAI_BASE_URL=…``)
+to include the OpenAI client paths without live API access.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import argparse
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+import itertools
+import json
+import math
+import os
+import random
+import resource
+import sys
+import time
+from typing import Any
+
+_HELLO = "Hola, necesito ayuda"
+_INTAKE = 'Me llamo Ana, tengo 32 años y tengo ansiedad social. En la reunión pensé "soy incompetente"'
+
+SCRIPTS: dict[str, tuple[str, ...]] = {
+    # Intake through the reframe, ending at the PDF offer
+    "happy": (_HELLO, _INTAKE),
+    "decline": (_HELLO, _INTAKE, "No, gracias"),
+    "crisis": (_HELLO, "Me llamo Pedro, tengo 30 años y a veces quiero morir"),
+    "pdf_accept": (_HELLO, _INTAKE, "Sí, por favor"),
+}
+# Phase (name) each script must end in; other endings count as wrong_path
+EXPECTED_PHASE = {"happy": "S5_PDF_OFFER", "decline": "S7_DONE", "crisis": "S7_DONE", "pdf_accept": "S7_DONE"}
+DEFAULT_MIX = "happy=4,decline=2,crisis=1,pdf_accept=1"
+SLO_P95_SECONDS = 1.5
+
+
+def parse_mix(spec: str) -> list[tuple[str, int]]:
+    """Parse ``"script=weight,…"``; unknown scripts raise ``ValueError``."""
+
+    mix = []
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in SCRIPTS:
+            raise ValueError(f"Unknown script {name!r}; choose from {sorted(SCRIPTS)}")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (0 < q ≤ 1) of *values*; 0 when empty."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))]
+
+
+# ---------------------------------------------------------------------------
+# Transports
+# ---------------------------------------------------------------------------
+
+
+class Connection(ABC):
+    """Minimal JSON WebSocket connection."""
+
+    @abstractmethod
+    async def send(self, frame: dict[str, Any]) -> None:
+        """Send *frame* as a JSON text message."""
+
+    @abstractmethod
+    async def receive(self) -> dict[str, Any]:
+        """Return the next JSON message from the server."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Close the connection."""
+
+
+class ASGIConnection(Connection):
+    """Drive an ASGI app's WebSocket route directly, without a socket."""
+
+    def __init__(self, app: Any, path: str) -> None:
+        self._inbound: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._outbound: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "headers": [],
+            "server": ("loadgen", 80),
+            "client": ("127.0.0.1", 0),
+            "subprotocols": [],
+        }
+        self._task = asyncio.create_task(app(scope, self._inbound.get, self._outbound.put))
+
+    async def open(self) -> ASGIConnection:
+        await self._inbound.put({"type": "websocket.connect"})
+        message = await self._outbound.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"WebSocket rejected: {message}")
+        return self
+
+    async def send(self, frame: dict[str, Any]) -> None:
+        await self._inbound.put({"type": "websocket.receive", "text": json.dumps(frame)})
+
+    async def receive(self) -> dict[str, Any]:
+        message = await self._outbound.get()
+        if message["type"] != "websocket.send":
+            raise ConnectionError(f"WebSocket closed: {message}")
+        return json.loads(message.get("text") or message["bytes"])  # type: ignore[no-any-return]
+
+    async def close(self) -> None:
+        await self._inbound.put({"type": "websocket.disconnect", "code": 1000})
+        await self._task
+
+
+class SocketConnection(Connection):
+    def __init__(self, ws: Any) -> None:
+        self._ws = ws
+
+    async def send(self, frame: dict[str, Any]) -> None:
+        await self._ws.send(json.dumps(frame))
+
+    async def receive(self) -> dict[str, Any]:
+        return json.loads(await self._ws.recv())  # type: ignore[no-any-return]
+
+    async def close(self) -> None:
+        await self._ws.close()
+
+
+class _Lifespan:
+    """Run an ASGI app's startup/shutdown events in-process."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        self._inbound: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._outbound: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._task: asyncio.Task[None] | None = None
+
+    async def _event(self, event: str) -> None:
+        await self._inbound.put({"type": f"lifespan.{event}"})
+        message = await self._outbound.get()
+        if message["type"] != f"lifespan.{event}.complete":
+            raise RuntimeError(f"lifespan {event} failed: {message}")
+
+    async def __aenter__(self) -> _Lifespan:
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}}
+        self._task = asyncio.create_task(self.app(scope, self._inbound.get, self._outbound.put))
+        await self._event("startup")
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self._event("shutdown")
+        assert self._task is not None
+        await self._task
+
+
+# ---------------------------------------------------------------------------
+# Load
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class LoadResult:
+    turn_seconds: list[float] = field(default_factory=list)
+    turns: int = 0
+    errors: int = 0
+    wrong_path: int = 0
+    conversations: dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    rss_mib: float | None = None
+
+    def report(self, slo_p95: float = SLO_P95_SECONDS, max_error_rate: float = 0.0) -> dict[str, Any]:
+        p95 = percentile(self.turn_seconds, 0.95)
+        error_rate = self.errors / self.turns if self.turns else 1.0
+        return {
+            "turns": self.turns,
+            "conversations": self.conversations,
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_turns_per_s": round(self.turns / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(self.turn_seconds, 0.50) * 1000, 1),
+            "p95_ms": round(p95 * 1000, 1),
+            "p99_ms": round(percentile(self.turn_seconds, 0.99) * 1000, 1),
+            "error_rate": round(error_rate, 4),
+            "wrong_path": self.wrong_path,
+            "rss_mib": self.rss_mib,
+            "slo_p95_ms": slo_p95 * 1000,
+            "passed": p95 < slo_p95 and error_rate <= max_error_rate and not self.wrong_path,
+        }
+
+
+async def _play(
+    connect: Callable[[str], Awaitable[Connection]],
+    session_id: str,
+    name: str,
+    result: LoadResult,
+    *,
+    think: float,
+    timeout: float,
+) -> None:
+    conn = await connect(session_id)
+    phase = None
+    try:
+        for text in SCRIPTS[name]:
+            start = time.perf_counter()
+            result.turns += 1
+            try:
+                await conn.send({"type": "user_msg", "data": {"message": text}})
+                while True:
+                    frame = await asyncio.wait_for(conn.receive(), timeout)
+                    if frame["type"] == "error":
+                        result.errors += 1
+                        break
+                    if frame["type"] == "complete":
+                        result.turn_seconds.append(time.perf_counter() - start)
+                        phase = frame["data"].get("phase")
+                        break
+            except (TimeoutError, ConnectionError, OSError):
+                result.errors += 1
+                return
+            if think:
+                await asyncio.sleep(think)
+        if phase != EXPECTED_PHASE[name]:
+            result.wrong_path += 1
+    finally:
+        await conn.close()
+
+
+async def run_load(
+    *,
+    sessions: int,
+    conversations: int,
+    mix: list[tuple[str, int]],
+    url: str | None = None,
+    think: float = 0.0,
+    timeout: float = 30.0,
+    seed: int = 0,
+) -> LoadResult:
+    """Run the load and return raw results (RSS only for in-process runs)."""
+
+    rng = random.Random(seed)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    result = LoadResult()
+    run_id = f"{os.getpid()}-{int(time.time())}"
+    counter = itertools.count()
+
+    async def session(worker: int, connect: Callable[[str], Awaitable[Connection]]) -> None:
+        for _ in range(conversations):
+            name = rng.choices(names, weights)[0]
+            result.conversations[name] = result.conversations.get(name, 0) + 1
+            session_id = f"load-{run_id}-{worker}-{next(counter)}"
+            await _play(connect, session_id, name, result, think=think, timeout=timeout)
+
+    async def drive(connect: Callable[[str], Awaitable[Connection]]) -> None:
+        start = time.perf_counter()
+        await asyncio.gather(*(session(i, connect) for i in range(sessions)))
+        result.elapsed = time.perf_counter() - start
+
+    if url is None:
+        from app.main import app
+
+        async def connect_asgi(session_id: str) -> Connection:
+            return await ASGIConnection(app, f"/chat/{session_id}").open()
+
+        async with _Lifespan(app):
+            await drive(connect_asgi)
+        result.rss_mib = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    else:
+        import websockets
+
+        async def connect_socket(session_id: str) -> Connection:
+            return SocketConnection(await websockets.connect(f"{url.rstrip('/')}/chat/{session_id}"))
+
+        await drive(connect_socket)
+    return result
+
+
+def _rss_of(pid: int) -> float | None:
+    """Current RSS (MiB) of *pid* from ``/proc``; ``None`` where unavailable."""
+
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def main(argv: list[str] | None = None) -> int:  # pragma: no cover
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sessions", type=int, default=20, help="Concurrent sessions")
+    p.add_argument("--conversations", type=int, default=2, help="Conversations per session, run back to back")
+    p.add_argument("--mix", default=DEFAULT_MIX, help=f"Script weights ({', '.join(SCRIPTS)})")
+    p.add_argument("--url", help="ws://host:port of a running server (default: in-process)")
+    p.add_argument("--pid", type=int, help="Worker PID whose RSS to report with --url")
+    p.add_argument("--think", type=float, default=0.0, help="Seconds between turns")
+    p.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for a reply")
+    p.add_argument("--slo-p95", type=float, default=SLO_P95_SECONDS, help="p95 turn latency target (s)")
+    p.add_argument("--max-error-rate", type=float, default=0.0)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = p.parse_args(argv)
+
+    result = asyncio.run(
+        run_load(
+            sessions=args.sessions,
+            conversations=args.conversations,
+            mix=parse_mix(args.mix),
+            url=args.url,
+            think=args.think,
+            timeout=args.timeout,
+            seed=args.seed,
+        )
+    )
+    if args.pid:
+        result.rss_mib = _rss_of(args.pid)
+    report = result.report(args.slo_p95, args.max_error_rate)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{args.sessions} sessions × {args.conversations} conversations {report['conversations']}")
+        print(
+            f"  {report['turns']} turns in {report['elapsed_s']} s "
+            f"({report['throughput_turns_per_s']} turns/s), error rate {report['error_rate']:.2%}, "
+            f"wrong path {report['wrong_path']}"
+        )
+        print(f"  turn latency p50 {report['p50_ms']} ms  p95 {report['p95_ms']} ms  p99 {report['p99_ms']} ms")
+        print(f"  worker RSS {report['rss_mib']} MiB")
+        verdict = "PASS" if report["passed"] else "FAIL"
+        print(f"  {verdict}: p95 target < {report['slo_p95_ms']:.0f} ms, max error rate {args.max_error_rate:.2%}")
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
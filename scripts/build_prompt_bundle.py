@@ -0,0 +1,105 @@
+"""Snapshot the runtime prompts from Langfuse into a checksummed bundle file.
+
+Run at image build time so containers start with every prompt in
+``REQUIRED_PROMPTS`` already on disk and never wait on Langfuse during cold
+start.
+
+Example
+-------
+$ export LANGFUSE_HOST=https://cloud.langfuse.com
+$ export LANGFUSE_PUBLIC_KEY=pk_live_…
+$ export LANGFUSE_SECRET_KEY=sk_live_…
+$ python -m scripts.build_prompt_bundle --bundle-version "$(git rev-parse --short HEAD)"
+$ python -m scripts.build_prompt_bundle --verify
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import UTC, datetime
+import os
+import sys
+import time
+
+from langfuse import Langfuse
+
+from app.services.prompts.bundle import (
+    DEFAULT_BUNDLE_PATH,
+    REQUIRED_PROMPTS,
+    PromptBundle,
+    write_bundle,
+)
+from app.services.prompts.cache import PromptEntry, content_etag
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _get_langfuse() -> Langfuse:
+    try:
+        return Langfuse(
+            host=os.environ["LANGFUSE_HOST"],
+            public_key=os.environ["LANGFUSE_PUBLIC_KEY"],
+            secret_key=os.environ["LANGFUSE_SECRET_KEY"],
+        )
+    except KeyError as e:  # pragma: no cover
+        missing = e.args[0]
+        raise SystemExit(f"Missing required env var: {missing}") from e
+
+
+def _snapshot(lf: Langfuse, names: tuple[str, ...]) -> list[PromptEntry]:
+    entries: list[PromptEntry] = []
+    for name in names:
+        prompt_obj = lf.get_prompt(name, cache_ttl_seconds=0)
+        text = str(prompt_obj.compile())
+        version = getattr(prompt_obj, "version", None)
+        entries.append(PromptEntry(name, text, version, content_etag(text), time.time()))
+        print(f"  {name:<36} v{version}  ({len(text)} chars)")
+    return entries
+
+
+def _verify(path: str) -> None:
+    bundle = PromptBundle(path)
+    try:
+        print(f"Bundle {path}: version {bundle.bundle_version}, {len(bundle)} prompts")
+        missing = [name for name in REQUIRED_PROMPTS if bundle.get(name) is None]
+        if missing:
+            raise SystemExit(f"Bundle is missing prompts: {', '.join(missing)}")
+    finally:
+        bundle.close()
+    print("Checksum OK ✔︎")
+
+
+# ---------------------------------------------------------------------------
+# Entrypoint
+# ---------------------------------------------------------------------------
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Build the runtime prompt bundle")
+    p.add_argument("--output", default=DEFAULT_BUNDLE_PATH, help="Bundle file to write")
+    p.add_argument(
+        "--bundle-version",
+        default=datetime.now(UTC).strftime("%Y%m%d%H%M%S"),
+        help="Version label stored in the bundle header (default: UTC timestamp)",
+    )
+    p.add_argument("--verify", action="store_true", help="Only validate an existing bundle")
+    return p.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:  # pragma: no cover
+    args = _parse_args(argv)
+    if args.verify:
+        _verify(args.output)
+        return
+
+    print(f"Snapshotting {len(REQUIRED_PROMPTS)} prompts from Langfuse…")
+    entries = _snapshot(_get_langfuse(), REQUIRED_PROMPTS)
+    write_bundle(args.output, entries, args.bundle_version)
+    print(f"Wrote {args.output} (version {args.bundle_version})")
+    _verify(args.output)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main(sys.argv[1:])
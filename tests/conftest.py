@@ -1,11 +1,16 @@
 from collections import deque
 from collections.abc import AsyncGenerator
+import os
 
 from google.adk.artifacts import InMemoryArtifactService
 from google.adk.models import BaseLlm, LlmRequest, LlmResponse
 from google.genai.types import Content, Part
 import pytest
 
+# TestClient runs the app's startup hook; keep sessions in memory rather than
+# creating a SQLite file in the working directory.
+os.environ.setdefault("SESSION_STORE", "memory")
+
 
 ##############################################################################
 # Simple stub that replaces any LlmAgent's model with deterministic replies. #
@@ -0,0 +1,29 @@
+"""Import-time regression gate for the OpenAI request path."""
+
+import pytest
+
+from benchmarks.calibration import calibrate
+from benchmarks.import_time import check_budget, load_budgets, machine_scale, profile_import
+
+BUDGETS = load_budgets()
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS["modules"]))
+def test_cold_import_within_budget(module: str) -> None:
+    profile = profile_import(module, repeat=2)
+    scale = machine_scale(BUDGETS, calibrate())
+
+    assert check_budget(profile, BUDGETS["modules"][module], scale) == []
+
+
+def test_budgets_stretch_on_slower_machines_only() -> None:
+    assert machine_scale(BUDGETS, BUDGETS["calibration_us"] * 2) == 2.0
+    assert machine_scale(BUDGETS, BUDGETS["calibration_us"] / 2) == 1.0
+
+
+def test_tool_package_does_not_load_heavy_dependencies() -> None:
+    profile = profile_import("app.assistants.functions", repeat=1)
+    heavy = ("reportlab", "google.adk", "google.cloud.storage", "google.cloud.translate")
+
+    assert not [name for name in profile.modules if name.startswith(heavy)]
+    assert profile.module_count < 50
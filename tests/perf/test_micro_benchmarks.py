@@ -0,0 +1,40 @@
+"""Hot-path microbenchmarks gated against ``benchmarks/micro_baselines.json``.
+
+The timing gates are marked ``perf`` and only run with ``poe test-perf``.
+"""
+
+import pytest
+
+from benchmarks.micro import (
+    BENCHMARKS,
+    Result,
+    calibrate,
+    check_regressions,
+    load_baselines,
+    run_suite,
+)
+
+BASELINES = load_baselines()
+
+
+def test_every_benchmark_has_a_baseline() -> None:
+    assert sorted(BASELINES["benchmarks"]) == sorted(BENCHMARKS)
+
+
+def test_regressions_are_judged_in_calibration_units() -> None:
+    baselines = {"calibration_us": 100.0, "benchmarks": {"fast": 10.0}}
+
+    # Twice as slow on a machine twice as slow: not a regression
+    assert check_regressions([Result("fast", 20.0, 1)], 200.0, baselines) == []
+    # Twice as slow on the same machine: one
+    assert len(check_regressions([Result("fast", 20.0, 1)], 100.0, baselines)) == 1
+    assert check_regressions([Result("fast", 20.0, 1)], 100.0, baselines, tolerance=1.5) == []
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_benchmark_within_baseline(name: str) -> None:
+    calibration_us = calibrate()
+    results = run_suite([name])
+
+    assert check_regressions(results, calibration_us, BASELINES) == []
@@ -0,0 +1,31 @@
+"""Smoke run of the WebSocket load harness against the in-process app."""
+
+import pytest
+
+from benchmarks.ws_load import DEFAULT_MIX, parse_mix, percentile, run_load
+
+
+def test_percentile_nearest_rank() -> None:
+    values = [float(i) for i in range(1, 101)]
+
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.95) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_in_process_load_follows_every_script(monkeypatch) -> None:
+    monkeypatch.setenv("SESSION_STORE", "memory")
+    mix = parse_mix(DEFAULT_MIX)
+
+    result = await run_load(sessions=4, conversations=3, mix=mix, seed=1)
+    report = result.report()
+
+    assert report["turns"] == len(result.turn_seconds) > 0
+    assert report["error_rate"] == 0.0
+    assert report["wrong_path"] == 0
+    assert report["passed"] is True
+    assert report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"]
+    assert report["rss_mib"] > 0
+    assert sum(report["conversations"].values()) == 12
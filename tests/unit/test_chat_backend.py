@@ -0,0 +1,140 @@
+"""Chat Completions orchestrator backend."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.assistants import tokens
+from app.assistants.chat_backend import build_messages
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.assistants.tokens import PhaseBudget
+
+
+def _chunk(content=None, tool_calls=None, finish=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish)], usage=None)
+
+
+def _tool_delta(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class _FakeChat:
+    """Streams scripted chunk lists, one per ``create`` call, and records the requests."""
+
+    def __init__(self, *scripts) -> None:
+        self.scripts = list(scripts)
+        self.requests: list[dict] = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        chunks = self.scripts.pop(0)
+
+        async def stream():
+            for chunk in chunks:
+                yield chunk
+
+        return stream()
+
+
+def _orchestrator(chat: _FakeChat) -> OrchestratorAssistant:
+    client = SimpleNamespace(chat=SimpleNamespace(completions=chat))
+    return OrchestratorAssistant(use_stubs=True, openai_client=client, backend="chat")
+
+
+@pytest.mark.asyncio
+async def test_tool_round_uses_one_streaming_request_per_step() -> None:
+    chat = _FakeChat(
+        [
+            _chunk(tool_calls=[_tool_delta(0, id="call_1", name="collect_context", arguments='{"name": ')]),
+            _chunk(tool_calls=[_tool_delta(0, arguments='"Ana"}')], finish="tool_calls"),
+        ],
+        [_chunk(content="Hola "), _chunk(content="Ana."), _chunk(finish="stop")],
+    )
+    orchestrator = _orchestrator(chat)
+    streamed: list[str] = []
+
+    async def on_delta(text: str) -> None:
+        streamed.append(text)
+
+    result = await orchestrator.run_assistant("Me llamo Ana")
+    assert result["status"] == "requires_action"
+    assert result["tool_calls"] == [{"id": "call_1", "name": "collect_context", "arguments": {"name": "Ana"}}]
+
+    result = await orchestrator.submit_tool_outputs(
+        result["run_id"], [{"tool_call_id": "call_1", "output": '{"goal_reached": true}'}], on_delta=on_delta
+    )
+
+    assert result == {"status": "completed", "message": "Hola Ana."}
+    assert streamed == ["Hola ", "Ana."]
+    assert len(chat.requests) == 2
+    assert all(r["stream"] and r["tools"] == orchestrator.get_tools() for r in chat.requests)
+    sent = chat.requests[1]["messages"]
+    assert [m["role"] for m in sent] == ["system", "user", "assistant", "tool"]
+    assert sent[2]["tool_calls"][0]["function"] == {"name": "collect_context", "arguments": '{"name": "Ana"}'}
+    assert sent[3]["tool_call_id"] == "call_1"
+
+    # The local transcript survives a snapshot round trip.
+    restored = OrchestratorAssistant.restore(orchestrator.snapshot(), use_stubs=True, openai_client=object())
+    assert list(restored.session_state.transcript) == list(orchestrator.session_state.transcript)
+
+
+
+@pytest.mark.asyncio
+async def test_tool_call_cut_off_by_the_budget_is_retried_with_room() -> None:
+    chat = _FakeChat(
+        [_chunk(tool_calls=[_tool_delta(0, id="call_1", name="collect_context", arguments='{"name": "A')], finish="length")],
+        [_chunk(tool_calls=[_tool_delta(0, id="call_2", name="collect_context", arguments='{"name": "Ana"}')], finish="tool_calls")],
+    )
+    orchestrator = _orchestrator(chat)
+
+    result = await orchestrator.run_assistant("Me llamo Ana")
+
+    assert result["tool_calls"] == [{"id": "call_2", "name": "collect_context", "arguments": {"name": "Ana"}}]
+    assert chat.requests[1]["max_tokens"] == 4 * chat.requests[0]["max_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_malformed_tool_arguments_return_an_error_action() -> None:
+    truncated = [_chunk(tool_calls=[_tool_delta(0, id="call_1", name="collect_context", arguments='{"na')], finish="length")]
+    orchestrator = _orchestrator(_FakeChat(truncated, truncated))
+
+    result = await orchestrator.run_assistant("Me llamo Ana")
+
+    assert result["status"] == "incomplete"
+    assert "error" in result
+    # The broken call is not kept in the transcript sent on the next request.
+    assert [m["role"] for m in orchestrator.session_state.transcript] == ["user"]
+
+
+@pytest.mark.asyncio
+async def test_reply_cut_off_by_the_budget_is_kept() -> None:
+    orchestrator = _orchestrator(_FakeChat([_chunk(content="Entiendo, Ana. Lo que"), _chunk(finish="length")]))
+
+    result = await orchestrator.run_assistant("Me llamo Ana")
+
+    assert result == {"status": "completed", "message": "Entiendo, Ana. Lo que", "incomplete_reason": "length"}
+
+
+def test_trimmed_messages_never_start_with_orphan_tool_results(monkeypatch) -> None:
+    monkeypatch.setattr(tokens, "get_encoding", lambda model=tokens.DEFAULT_MODEL: None)
+    transcript = [
+        {"role": "user", "content": "x" * 400},
+        {"role": "assistant", "content": "z" * 200, "tool_calls": [{"id": "c1"}]},
+        {"role": "tool", "content": "y" * 200, "tool_call_id": "c1"},
+        {"role": "assistant", "content": "ok"},
+        {"role": "user", "content": "hola"},
+    ]
+
+    messages = build_messages("Be kind.", transcript, PhaseBudget(150, 50, 10))
+
+    assert messages[0]["role"] == "system"
+    assert [m["role"] for m in messages[1:]] == ["system", "assistant", "user"]  # summary, then newest turns
+    assert messages[-1] == {"role": "user", "content": "hola"}
+
+
+def test_unknown_backend_is_rejected(monkeypatch) -> None:
+    with pytest.raises(ValueError):
+        OrchestratorAssistant(use_stubs=True, openai_client=object(), backend="nope")
+    monkeypatch.setenv("ORCHESTRATOR_BACKEND", "chat")
+    assert OrchestratorAssistant(use_stubs=True, openai_client=object()).backend == "chat"
@@ -0,0 +1,52 @@
+"""Unit tests for the compact transcript representation."""
+
+import sys
+
+from app.assistants.state import SessionState
+from app.core.transcript import CompactTranscript
+from benchmarks.transcript_memory import _compact, _legacy, bytes_per_session
+
+
+def test_dict_view_matches_legacy_format():
+    transcript = CompactTranscript()
+    transcript.append("user", "Hola, me llamo Ana ¿qué tal?")
+    transcript.append("assistant", "¡Hola Ana!")
+
+    assert len(transcript) == 2
+    assert transcript[0] == {"role": "user", "content": "Hola, me llamo Ana ¿qué tal?"}
+    assert transcript[-1]["content"] == "¡Hola Ana!"
+    assert transcript == [
+        {"role": "user", "content": "Hola, me llamo Ana ¿qué tal?"},
+        {"role": "assistant", "content": "¡Hola Ana!"},
+    ]
+    assert list(transcript.texts(role="user")) == ["Hola, me llamo Ana ¿qué tal?"]
+
+
+def test_roles_are_interned_and_meta_round_trips():
+    transcript = CompactTranscript(
+        [
+            {"role": "".join(["us", "er"]), "content": "a"},
+            {"role": "tool", "content": "{}", "tool_call_id": "call_1"},
+        ]
+    )
+
+    assert transcript.role(0) is sys.intern("user")
+    assert transcript[1] == {"role": "tool", "content": "{}", "tool_call_id": "call_1"}
+
+
+def test_session_state_uses_compact_transcript():
+    state = SessionState()
+    assert state.transcript == []
+
+    state.add_user_message("hola")
+    state.add_assistant_message("¿en qué puedo ayudarte?")
+
+    assert isinstance(state.transcript, CompactTranscript)
+    assert state.transcript.as_openai_messages()[1]["role"] == "assistant"
+
+
+def test_compact_transcript_uses_less_memory_than_dicts():
+    legacy = bytes_per_session(_legacy, sessions=200, messages=20)
+    compact = bytes_per_session(_compact, sessions=200, messages=20)
+
+    assert compact < legacy * 0.8
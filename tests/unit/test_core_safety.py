@@ -0,0 +1,56 @@
+"""Unit tests for the ADK-free language / crisis / PII core."""
+
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from app.core.lang import detect_lang
+from app.core.safety import detect_crisis, detect_pii, screen
+from app.core.transcript import turn_entries
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("I want to kill myself", "crisis"),
+        ("Me quiero suicidar", "crisis"),
+        ("My SSN is 123-45-6789", "pii"),
+        ("I feel anxious before meetings", None),
+    ],
+)
+def test_screen(text: str, expected: str | None) -> None:
+    assert screen(text) == expected
+
+
+def test_crisis_takes_precedence_over_pii() -> None:
+    text = "ssn 123456789 and I want to end my life"
+    assert detect_crisis(text) and detect_pii(text)
+    assert screen(text) == "crisis"
+
+
+def test_detect_lang_fallback(monkeypatch) -> None:
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    assert detect_lang("¿Cómo estás?") == "es"
+    assert detect_lang("How are you?") == "en"
+
+
+def test_turn_entries_skips_empty_sides() -> None:
+    assert turn_entries("hi", "") == [{"role": "user", "text": "hi"}]
+    assert turn_entries(None, "hello", text_key="content") == [
+        {"role": "assistant", "content": "hello"}
+    ]
+
+
+def test_openai_path_does_not_import_adk() -> None:
+    code = (
+        "import sys, asyncio\n"
+        "from app.assistants.functions.collect import collect_context\n"
+        "asyncio.run(collect_context(messages=[{'role': 'user', 'content': 'hola'}]))\n"
+        "assert 'google.adk' not in sys.modules, 'ADK imported'\n"
+    )
+    root = Path(__file__).resolve().parents[2]
+    subprocess.run(
+        [sys.executable, "-c", code], check=True, cwd=root, env={"PYTHONPATH": str(root)}
+    )
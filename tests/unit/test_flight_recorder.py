@@ -0,0 +1,70 @@
+"""Per-session flight recorder and its debug endpoint."""
+
+import os
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.services.tracing import flight
+from app.services.tracing.otel import span, upstream_span
+
+
+@pytest.fixture(autouse=True)
+def _recorders():
+    flight.install()
+    flight.clear_recorders()
+    yield
+    flight.clear_recorders()
+
+
+def test_ring_buffer_keeps_latest_stages_per_turn() -> None:
+    recorder = flight.FlightRecorder(capacity=4)
+    for turn in range(3):
+        recorder.turn = turn
+        recorder.record("", "ws.turn", 10.0 * turn, 10.0 * turn + 1.0)
+        recorder.record("openai", "runs.poll", 10.0 * turn + 0.25, 10.0 * turn + 0.75)
+
+    timeline = recorder.timeline()
+
+    assert [t["turn"] for t in timeline] == [1, 2]  # turn 0 was overwritten
+    assert timeline[-1]["duration_ms"] == 1000.0
+    assert timeline[-1]["stages"] == [
+        {"stage": "ws.turn", "offset_ms": 0.0, "duration_ms": 1000.0},
+        {"stage": "openai.runs.poll", "offset_ms": 250.0, "duration_ms": 500.0},
+    ]
+
+
+def test_stages_are_recorded_only_inside_a_turn() -> None:
+    with upstream_span("gcs", "upload"):
+        pass
+    with flight.recording("s1"), span("ws.turn"), span("tool.collect_context"):
+        pass
+
+    (turn,) = flight.get_recorder("s1").timeline()
+    assert [s["stage"] for s in turn["stages"]] == ["ws.turn", "tool.collect_context"]
+
+
+def test_timeline_endpoint_requires_debug_token(monkeypatch) -> None:
+    import app.main as main
+
+    monkeypatch.setenv("SESSION_STORE", "memory")
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/chat/slow") as ws:
+            ws.send_json({"type": "user_msg", "data": {"message": "Hola"}})
+            ws.receive_json()
+            ws.receive_json()
+
+        assert client.get("/debug/sessions/slow/timeline").status_code == 404
+        monkeypatch.setenv("DEBUG_TOKEN", "s3cret")
+        assert client.get("/debug/sessions/slow/timeline").status_code == 401
+        headers = {"Authorization": "Bearer s3cret"}
+        response = client.get("/debug/sessions/slow/timeline", headers=headers)
+        missing = client.get("/debug/sessions/other/timeline", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["worker"] == os.getpid()
+    (turn,) = response.json()["turns"]
+    stages = [s["stage"] for s in turn["stages"]]
+    assert stages[0] == "ws.turn"
+    assert "orchestrator.phase" in stages
+    assert missing.status_code == 404
@@ -0,0 +1,49 @@
+"""Prometheus exposition and the /metrics endpoint."""
+
+from fastapi.testclient import TestClient
+
+from app.services.metrics.exposition import render
+from app.services.metrics.registry import Registry
+
+
+def test_render_prometheus_text_format() -> None:
+    registry = Registry()
+    registry.counter("frames_total", "Frames", labels=("direction",)).labels("in").inc(2)
+    registry.gauge("open", 'Open "now"').set(3)
+    latency = registry.histogram("turn_seconds", "Turns", labels=("phase",), buckets=(0.5, 1.5))
+    for value in (0.1, 1.0, 9.0):
+        latency.labels("intake").observe(value)
+
+    lines = render(registry).splitlines()
+
+    assert '# HELP open Open \\"now\\"' in lines
+    assert "# TYPE frames_total counter" in lines
+    assert 'frames_total{direction="in"} 2' in lines
+    assert "open 3" in lines
+    assert lines[-5:] == [
+        'turn_seconds_bucket{phase="intake",le="0.5"} 1',
+        'turn_seconds_bucket{phase="intake",le="1.5"} 2',
+        'turn_seconds_bucket{phase="intake",le="+Inf"} 3',
+        'turn_seconds_sum{phase="intake"} 10.1',
+        'turn_seconds_count{phase="intake"} 3',
+    ]
+
+
+def test_metrics_endpoint_reports_turns_frames_and_tools(monkeypatch) -> None:
+    import app.main as main
+
+    monkeypatch.setenv("SESSION_STORE", "memory")
+    with TestClient(main.app) as client, client.websocket_connect("/chat/metrics") as ws:
+        ws.send_json({"type": "user_msg", "data": {"message": "Hola"}})
+        ws.receive_json()
+        ws.receive_json()
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "ws_connections 1" in body
+    assert 'ws_frames_total{direction="in",type="user_msg"}' in body
+    assert 'ws_frames_total{direction="out",type="complete"}' in body
+    assert 'ws_turn_seconds_count{phase="start"}' in body
+    assert 'orchestrator_phase_seconds_bucket{phase="start",le="+Inf"}' in body
@@ -0,0 +1,54 @@
+"""The local OpenAI stand-in speaks enough of the API for the real client."""
+
+import httpx
+from openai import AsyncOpenAI, InternalServerError
+import pytest
+
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from benchmarks.openai_standin import StandinConfig, create_app, parse_latency
+
+
+def _client(config: StandinConfig, **kwargs) -> AsyncOpenAI:
+    transport = httpx.ASGITransport(app=create_app(config))
+    return AsyncOpenAI(
+        api_key="sk-local",
+        base_url="http://standin/v1",
+        http_client=httpx.AsyncClient(transport=transport),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["assistants", "chat"])
+async def test_orchestrator_round_trip_with_tool_call(backend: str) -> None:
+    client = _client(StandinConfig(poll_after_ms=1))
+    orchestrator = OrchestratorAssistant(use_stubs=True, openai_client=client, backend=backend)
+
+    first = await orchestrator.run_assistant("Hola [tool:collect_context]")
+    assert first["status"] == "requires_action"
+    (call,) = first["tool_calls"]
+    assert call["name"] == "collect_context"
+
+    outputs = [{"tool_call_id": call["id"], "output": "{}"}]
+    second = await orchestrator.submit_tool_outputs(first.get("run_id", ""), outputs)
+
+    assert second == {"status": "completed", "message": "Entiendo. ¿Qué pasó después?"}
+    assert orchestrator.usage.total.calls == 2
+    assert orchestrator.usage.total.prompt_tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_surface_as_api_errors() -> None:
+    client = _client(StandinConfig(error_rate=1.0), max_retries=0)
+
+    with pytest.raises(InternalServerError):
+        await client.beta.threads.create()
+
+
+def test_latency_distributions_are_seeded() -> None:
+    import random
+
+    lognormal = parse_latency("lognormal:0.1:0.5")
+    assert lognormal(random.Random(1)) == lognormal(random.Random(1)) > 0
+    assert parse_latency("0.25")(random.Random()) == 0.25
+    assert 0.1 <= parse_latency("uniform:0.1:0.2")(random.Random(3)) <= 0.2
@@ -0,0 +1,53 @@
+"""On-demand stack sampling and allocation snapshots."""
+
+import threading
+
+from fastapi.testclient import TestClient
+
+from app.services.tracing import profiler
+
+
+def _spin(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_stacks_returns_collapsed_stacks_of_other_threads() -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        stacks, samples = profiler.sample_stacks(0.1, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert samples > 0
+    spinner = [line for line in stacks.splitlines() if line.startswith("thread:spinner;")]
+    assert spinner
+    stack, count = spinner[0].rsplit(" ", 1)
+    assert "_spin (test_profiler.py:" in stack
+    assert int(count) > 0
+    assert "sample_stacks" not in stacks  # the sampler skips its own thread
+
+
+def test_profiling_endpoints_are_disabled_by_default(monkeypatch) -> None:
+    import app.main as main
+
+    monkeypatch.setenv("SESSION_STORE", "memory")
+    monkeypatch.setenv("DEBUG_TOKEN", "s3cret")
+    headers = {"Authorization": "Bearer s3cret"}
+    with TestClient(main.app) as client:
+        assert client.get("/debug/profile/cpu?seconds=0.05", headers=headers).status_code == 404
+
+        monkeypatch.setenv("PROFILING_ENABLED", "1")
+        assert client.get("/debug/profile/cpu?seconds=0.05").status_code == 401
+        cpu = client.get("/debug/profile/cpu?seconds=0.05", headers=headers)
+        allocations = client.get("/debug/profile/allocations?seconds=0.05&top=5", headers=headers)
+
+    assert cpu.status_code == 200
+    assert int(cpu.headers["X-Profile-Samples"]) > 0
+    assert cpu.text.startswith("thread:")
+    body = allocations.json()
+    assert body["window_seconds"] == 0.05
+    assert len(body["top"]) <= 5
@@ -0,0 +1,76 @@
+"""Unit tests for the build-time prompt bundle."""
+
+import time
+
+from app.services.prompts.bundle import PromptBundle, load_bundle, write_bundle
+from app.services.prompts.cache import PromptCache, PromptEntry, content_etag
+
+
+def _entry(name: str, text: str, version: int = 3) -> PromptEntry:
+    return PromptEntry(name, text, version, content_etag(text), time.time())
+
+
+def test_bundle_roundtrip(tmp_path):
+    path = str(tmp_path / "prompts.bundle")
+    write_bundle(path, [_entry("intake", "Hola ¿qué tal?"), _entry("reframe", "Reframe")], "abc123")
+
+    bundle = PromptBundle(path)
+    try:
+        assert bundle.bundle_version == "abc123"
+        assert bundle.names() == ["intake", "reframe"]
+        intake = bundle.get("intake")
+        assert intake.text == "Hola ¿qué tal?"
+        assert intake.version == 3
+        assert bundle.get("missing") is None
+    finally:
+        bundle.close()
+
+
+def test_corrupted_bundle_is_ignored(tmp_path):
+    path = tmp_path / "prompts.bundle"
+    write_bundle(str(path), [_entry("intake", "some prompt text")], "v1")
+    raw = bytearray(path.read_bytes())
+    raw[-1] ^= 0xFF
+    path.write_bytes(bytes(raw))
+
+    assert load_bundle(str(path)) is None
+    assert load_bundle(str(tmp_path / "absent.bundle")) is None
+
+
+def test_bundle_seeds_cache_without_fetching(tmp_path):
+    path = str(tmp_path / "prompts.bundle")
+    write_bundle(path, [_entry("intake", "bundled")], "v1")
+
+    def _fetcher(name: str) -> PromptEntry:
+        return _entry(name, "fetched")
+
+    cache = PromptCache(_fetcher)
+    bundle = load_bundle(path)
+    for entry in bundle.entries():
+        cache.put(entry, persist=False)
+
+    assert cache.get("intake").text == "bundled"
+    assert cache.get("reframe").text == "fetched"
+    assert cache.stats()["misses"] == 1
+    bundle.close()
+
+
+def test_bundled_entries_are_fresh_when_loaded(tmp_path):
+    path = str(tmp_path / "prompts.bundle")
+    built = PromptEntry("intake", "bundled", 3, content_etag("bundled"), time.time() - 86_400)
+    write_bundle(path, [built], "v1")
+    fetched: list[str] = []
+
+    def _fetcher(name: str) -> PromptEntry:
+        fetched.append(name)
+        return _entry(name, "fetched")
+
+    cache = PromptCache(_fetcher, ttl_seconds=300)
+    bundle = load_bundle(path)
+    for entry in bundle.entries(loaded_at=time.time()):
+        cache.put(entry, persist=False)
+
+    assert cache.get("intake").text == "bundled"
+    assert cache.stats()["stale"] == 0
+    assert fetched == []
+    bundle.close()
@@ -0,0 +1,88 @@
+"""Unit tests for the versioned prompt cache."""
+
+import time
+
+from app.services.prompts.cache import PromptCache, PromptEntry, content_etag
+
+
+class _FakeLangfuse:
+    """Fetcher that serves versioned prompts and counts calls."""
+
+    def __init__(self) -> None:
+        self.texts = {"intake": "v1 text", "reframe": "reframe text"}
+        self.version = 1
+        self.calls: list[str] = []
+
+    def __call__(self, name: str) -> PromptEntry:
+        self.calls.append(name)
+        text = self.texts[name]
+        return PromptEntry(name, text, self.version, content_etag(text), time.time())
+
+
+def test_miss_then_hit_records_metadata(tmp_path):
+    fetcher = _FakeLangfuse()
+    cache = PromptCache(fetcher, cache_dir=str(tmp_path))
+
+    entry = cache.get("intake")
+    again = cache.get("intake")
+
+    assert entry is again
+    assert entry.version == 1
+    assert entry.etag == content_etag("v1 text")
+    assert fetcher.calls == ["intake"]
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+    assert (tmp_path / "intake.json").exists()
+
+
+def test_stale_entry_served_while_revalidating(tmp_path):
+    fetcher = _FakeLangfuse()
+    cache = PromptCache(fetcher, ttl_seconds=0.0, cache_dir=str(tmp_path))
+    cache.get("intake")
+
+    fetcher.texts["intake"] = "v2 text"
+    fetcher.version = 2
+    stale = cache.get("intake")
+    cache.wait_for_refreshes(timeout=2)
+
+    assert stale.text == "v1 text"
+    assert cache.peek("intake").text == "v2 text"
+    assert cache.peek("intake").version == 2
+    assert cache.stats()["stale"] == 1
+
+
+def test_failed_refresh_keeps_stale_entry():
+    fetcher = _FakeLangfuse()
+    cache = PromptCache(fetcher, ttl_seconds=0.0)
+    cache.get("intake")
+
+    del fetcher.texts["intake"]
+    assert cache.get("intake").text == "v1 text"
+    cache.wait_for_refreshes(timeout=2)
+
+    assert cache.peek("intake").text == "v1 text"
+    assert cache.stats()["refresh_errors"] == 1
+
+
+def test_cache_is_bounded_and_clearable(tmp_path):
+    fetcher = _FakeLangfuse()
+    cache = PromptCache(fetcher, max_entries=1, cache_dir=str(tmp_path))
+    cache.get("intake")
+    cache.get("reframe")
+
+    assert cache.peek("intake") is None
+    assert cache.stats()["entries"] == 1
+
+    cache.clear()
+    assert cache.peek("reframe") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    fetcher = _FakeLangfuse()
+    PromptCache(fetcher, cache_dir=str(tmp_path)).get("intake")
+
+    restarted = PromptCache(fetcher, cache_dir=str(tmp_path))
+    assert restarted.get("intake").text == "v1 text"
+    assert fetcher.calls == ["intake"]
+    assert restarted.stats()["disk"] == 1
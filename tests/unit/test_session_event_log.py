@@ -0,0 +1,111 @@
+"""Snapshot + event-log persistence of orchestrator sessions."""
+
+import pytest
+
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.assistants.state import Phase
+from app.services.persistence.codec import FLAG_ZLIB, decode, encode
+from app.services.persistence.event_log import SessionJournal, SQLiteEventLog, resume
+
+
+async def _turn(orchestrator: OrchestratorAssistant, message: str | None) -> None:
+    action = await orchestrator.decide_next_action(message)
+    while action["action"] == "tool_call":
+        await orchestrator.execute_tool_with_stubs(action["tool"], action["arguments"])
+        action = await orchestrator.decide_next_action()
+
+
+@pytest.fixture
+def log(tmp_path):
+    store = SQLiteEventLog(str(tmp_path / "sessions.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_codec_roundtrip_and_compression() -> None:
+    small = {"phase": "intake"}
+    large = {"transcript": [["user", "Me siento nervioso en reuniones."]] * 100}
+
+    assert decode(encode(small)) == small
+    assert decode(encode(large)) == large
+    assert encode(large)[3] & FLAG_ZLIB
+    with pytest.raises(ValueError):
+        decode(b"XX\x01\x00{}")
+
+
+def test_snapshot_restore_roundtrip() -> None:
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    orchestrator.current_phase = Phase.S4_REFRAME
+    orchestrator.session_state.add_user_message("Hola")
+    orchestrator.tool_results["collect_context"] = {"name": "Ana", "age": 28}
+    orchestrator.thread_id = "thread_123"
+
+    restored = OrchestratorAssistant.restore(orchestrator.snapshot(), use_stubs=True)
+
+    assert restored.snapshot() == orchestrator.snapshot()
+    assert restored.current_phase == Phase.S4_REFRAME
+    assert restored.session_state.transcript == [{"role": "user", "content": "Hola"}]
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_events_after_snapshot(log) -> None:
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    journal = SessionJournal(log, "s1", snapshot_every=100)
+    for message in (
+        None,
+        "Hola",
+        "Me llamo Ana, tengo 28 años y vengo porque me da miedo hablar en reuniones",
+        "Sí, por favor",
+    ):
+        await _turn(orchestrator, message)
+        journal.record(orchestrator)
+
+    stored = log.load("s1")
+    assert stored.snapshot_seq == 1
+    assert len(stored.events) == journal.seq - 1
+
+    resumed, resumed_journal = resume(log, "s1", use_stubs=True)
+    assert resumed.snapshot() == orchestrator.snapshot()
+    assert resumed_journal.seq == journal.seq
+    # Nothing changed since the last record, so nothing is written.
+    assert resumed_journal.record(resumed) == 0
+
+
+@pytest.mark.asyncio
+async def test_events_contain_only_changes_and_compact(log) -> None:
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    journal = SessionJournal(log, "s2", snapshot_every=3)
+    journal.record(orchestrator)
+
+    for i in range(7):
+        orchestrator.session_state.add_user_message(f"mensaje {i}")
+        journal.record(orchestrator)
+
+    stored = log.load("s2")
+    # Snapshots at seq 1 and 5 (after three events); events 6-8 remain.
+    assert stored.snapshot_seq == 5
+    assert [seq for seq, _ in stored.events] == [6, 7, 8]
+    assert decode(stored.events[-1][1]) == {"messages": [6, [["user", "mensaje 6"]]]}
+
+    resumed, _ = resume(log, "s2", use_stubs=True)
+    assert list(resumed.session_state.transcript.texts()) == [f"mensaje {i}" for i in range(7)]
+
+
+def test_reset_is_recorded(log) -> None:
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    journal = SessionJournal(log, "s3")
+    orchestrator.session_state.add_user_message("antes")
+    orchestrator.tool_results["collect_context"] = {"name": "Ana"}
+    journal.record(orchestrator)
+
+    orchestrator.reset()
+    orchestrator.session_state.add_user_message("después")
+    journal.record(orchestrator)
+
+    resumed, _ = resume(log, "s3", use_stubs=True)
+    assert resumed.tool_results == {}
+    assert list(resumed.session_state.transcript.texts()) == ["después"]
+
+
+def test_resume_unknown_session(log) -> None:
+    assert resume(log, "missing") is None
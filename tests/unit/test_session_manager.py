@@ -0,0 +1,131 @@
+"""Resident session tier: journaling, idle hibernation and rehydration."""
+
+import time
+
+import pytest
+
+from app.assistants.state import Phase
+from app.services.persistence.event_log import MemoryEventLog, SQLiteEventLog
+from app.services.persistence.session_manager import SessionManager
+from app.services.persistence.session_store import MemorySessionStore, SQLiteSessionStore
+from app.services.persistence.write_behind import ThreadedEventLog, WriteBehindEventLog
+
+_INTAKE = "Me llamo Ana, tengo 28 años y me cuesta hablar en público"
+
+
+def _memory_manager(**kwargs) -> tuple[SessionManager, MemoryEventLog]:
+    backend = MemoryEventLog()
+    log = WriteBehindEventLog(ThreadedEventLog(backend), max_delay=60)
+    return SessionManager(MemorySessionStore(), log, use_stubs=True, **kwargs), backend
+
+
+@pytest.mark.asyncio
+async def test_idle_session_is_hibernated_and_rehydrated() -> None:
+    manager, backend = _memory_manager(idle_seconds=60)
+
+    await manager.turn("s1", "Hola")
+    await manager.turn("s2", "Hola")
+    assert manager.resident == 2
+    # Journaled, but still queued in the write-behind log.
+    assert manager.log.pending == 2
+    assert backend.load("s1") is None
+
+    assert await manager.hibernate_idle(now=time.monotonic() + 61) == 2
+    assert manager.resident == 0
+    assert backend.load("s1") is not None
+
+    action = await manager.turn("s1", _INTAKE)
+    assert manager.is_resident("s1")
+    assert manager.rehydrations == 1
+    assert "PDF" in action["message"]
+    async with manager.session("s1") as orchestrator:
+        assert orchestrator.current_phase == Phase.S5_PDF_OFFER
+    await manager.log.close()
+
+
+@pytest.mark.asyncio
+async def test_frames_are_journaled_as_events_after_one_snapshot() -> None:
+    manager, backend = _memory_manager()
+
+    await manager.turn("s1", "Hola")
+    await manager.turn("s1", _INTAKE)
+    await manager.turn("s1", "No, gracias")
+    await manager.log.flush()
+
+    stored = backend.load("s1")
+    assert stored.snapshot_seq == 1
+    # Events 2 and 3 were coalesced by the write-behind queue.
+    assert [seq for seq, _ in stored.events] == [3]
+    await manager.log.close()
+
+
+@pytest.mark.asyncio
+async def test_recent_sessions_stay_resident() -> None:
+    manager, _ = _memory_manager(idle_seconds=60)
+    await manager.turn("s1", "Hola")
+
+    assert await manager.hibernate_idle() == 0
+    assert manager.is_resident("s1")
+    await manager.log.close()
+
+
+@pytest.mark.asyncio
+async def test_closing_the_log_persists_resident_sessions() -> None:
+    manager, backend = _memory_manager()
+    await manager.turn("s1", "Hola")
+
+    await manager.close()
+    await manager.log.close()
+
+    assert manager.resident == 0
+    assert backend.load("s1") is not None
+
+
+@pytest.mark.asyncio
+async def test_session_moves_between_workers_through_the_log(tmp_path) -> None:
+    locks = str(tmp_path / "session_locks.sqlite3")
+    events = str(tmp_path / "sessions.sqlite3")
+    workers = []
+    for _ in range(2):
+        log = WriteBehindEventLog(ThreadedEventLog(SQLiteEventLog(events)), max_delay=0.01)
+        await log.start()
+        workers.append(SessionManager(SQLiteSessionStore(locks), log, use_stubs=True))
+    worker_a, worker_b = workers
+
+    # B resumes A's session once A's queued writes have landed.
+    await worker_a.turn("s1", "Hola")
+    await worker_b.turn("s1", _INTAKE)
+    assert worker_b.rehydrations == 1
+
+    # Worker A still holds a resident copy, but the head has moved on.
+    async with worker_a.session("s1") as orchestrator:
+        assert orchestrator.current_phase == Phase.S5_PDF_OFFER
+    assert worker_a.rehydrations == 1
+
+    # Unchanged since A's own write: the resident copy is reused.
+    async with worker_a.session("s1"):
+        pass
+    assert worker_a.rehydrations == 1
+
+    for worker in workers:
+        await worker.close()
+        await worker.log.close()
+        await worker.store.close()
+
+
+@pytest.mark.asyncio
+async def test_resume_continues_above_a_head_whose_writes_were_lost() -> None:
+    backend = MemoryEventLog()
+    log = WriteBehindEventLog(ThreadedEventLog(backend), max_delay=60)
+    store = SQLiteSessionStore(":memory:")
+    manager = SessionManager(store, log, handoff_seconds=0.05, use_stubs=True)
+    # A previous owner recorded seq 5 but died before flushing it.
+    await store.set_head("s1", 5)
+
+    await manager.turn("s1", "Hola")
+    await log.flush()
+
+    assert backend.load("s1").snapshot_seq == 6
+    assert await store.get_head("s1") == 6
+    await log.close()
+    await store.close()
@@ -0,0 +1,92 @@
+"""Shared session store backends and the per-frame WebSocket flow."""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+import pytest
+import pytest_asyncio
+
+from app.services.persistence.session_store import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionLockTimeoutError,
+    SQLiteSessionStore,
+)
+
+
+@pytest_asyncio.fixture(params=["memory", "sqlite", "redis"])
+async def store(request, tmp_path):
+    if request.param == "memory":
+        backend = MemorySessionStore()
+    elif request.param == "sqlite":
+        backend = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        backend = RedisSessionStore(client=fakeredis.FakeAsyncRedis())
+    yield backend
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_head_set_get_delete(store) -> None:
+    assert await store.get_head("s1") is None
+    await store.set_head("s1", 7)
+    await store.set_head("s1", 9)
+    assert await store.get_head("s1") == 9
+    await store.delete("s1")
+    assert await store.get_head("s1") is None
+
+
+@pytest.mark.asyncio
+async def test_lock_is_exclusive(store) -> None:
+    async with store.lock("s1"):
+        with pytest.raises(SessionLockTimeoutError):
+            async with store.lock("s1", timeout=0.05):
+                pass
+        # Other sessions are unaffected.
+        async with store.lock("s2", timeout=0.05):
+            pass
+    async with store.lock("s1", timeout=0.05):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_sqlite_lock_spans_workers_and_lease_expires(tmp_path) -> None:
+    path = str(tmp_path / "sessions.sqlite3")
+    worker_a = SQLiteSessionStore(path, lease_seconds=0.2)
+    worker_b = SQLiteSessionStore(path, lease_seconds=0.2)
+
+    async with worker_a.lock("s1"):
+        with pytest.raises(SessionLockTimeoutError):
+            async with worker_b.lock("s1", timeout=0.05):
+                pass
+        # Simulate worker A stalling past its lease: B may take over.
+        await asyncio.sleep(0.25)
+        async with worker_b.lock("s1", timeout=0.05):
+            await worker_b.set_head("s1", 2)
+
+    assert await worker_a.get_head("s1") == 2
+    await worker_a.close()
+    await worker_b.close()
+
+
+def test_websocket_turns_are_persisted_between_connections(monkeypatch) -> None:
+    import app.main as main
+
+    monkeypatch.setenv("SESSION_STORE", "memory")
+    with TestClient(main.app) as client:
+        with client.websocket_connect("/chat/abc") as ws:
+            ws.send_json({"type": "user_msg", "data": {"message": "Hola"}})
+            reply = ws.receive_json()
+            assert reply["type"] == "assistant_stream"
+            assert reply["data"]["phase"] == "S1_INTAKE"
+            assert ws.receive_json()["type"] == "complete"
+
+        # A new connection (possibly another worker) continues the same session.
+        with client.websocket_connect("/chat/abc") as ws:
+            ws.send_json(
+                {"type": "user_msg", "data": {"message": "Me llamo Ana, tengo 28 años y me cuesta hablar en público"}}
+            )
+            reply = ws.receive_json()
+            assert reply["data"]["phase"] == "S5_PDF_OFFER"
+            assert "PDF" in reply["data"]["content"]
@@ -0,0 +1,48 @@
+"""Queue-based JSON logging: lazy formatting, redaction, sampling, no blocking."""
+
+import json
+import logging
+import queue
+
+from app.services.tracing import logs
+
+
+def _record(name: str = "app.main", level: int = logging.INFO, msg: str = "Frame %s", args=("in",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_hashes_user_text_and_truncates_fields() -> None:
+    formatter = logs.JsonFormatter(max_field_chars=8, hash_fields=frozenset({"user_message"}))
+
+    entry = json.loads(formatter.format(_record(user_message="me siento fatal", session_id="s" * 20, chars=15)))
+
+    assert entry["msg"] == "Frame in"
+    assert entry["level"] == "INFO" and entry["logger"] == "app.main"
+    assert entry["user_message"] == {"sha256": entry["user_message"]["sha256"], "chars": 15}
+    assert "fatal" not in json.dumps(entry)
+    assert entry["session_id"] == "ssssssss…(+12 chars)"
+    assert entry["chars"] == 15
+
+
+def test_queue_handler_defers_formatting_and_drops_when_full() -> None:
+    handler = logs.NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    dropped = logs._DROPPED.labels("queue_full")
+    before = dropped.value
+
+    handler.handle(_record())
+    handler.handle(_record())
+
+    queued = handler.queue.get_nowait()
+    assert (queued.msg, queued.args) == ("Frame %s", ("in",))  # not formatted yet
+    assert dropped.value == before + 1
+
+
+def test_sampling_filter_uses_longest_prefix_and_keeps_warnings() -> None:
+    sampler = logs.SamplingFilter(logs.parse_sampling("app=1, app.main=0"))
+
+    assert not sampler.filter(_record("app.main"))
+    assert sampler.filter(_record("app.main", level=logging.WARNING))
+    assert sampler.filter(_record("app.assistants.tokens"))
+    assert sampler.filter(_record("uvicorn"))
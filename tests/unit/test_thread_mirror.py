@@ -0,0 +1,81 @@
+"""Incremental thread message mirror used by collect_context."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.assistants import thread_mirror
+from app.assistants.functions import collect
+from app.assistants.thread_mirror import ThreadMirror, get_thread_mirror
+
+
+class _FakeMessages:
+    """``beta.threads.messages.list`` over an in-memory thread, honouring ``after``/``limit``."""
+
+    def __init__(self) -> None:
+        self.thread: list[SimpleNamespace] = []
+        self.calls: list[dict] = []
+
+    def add(self, role: str, text: str) -> None:
+        block = SimpleNamespace(type="text", text=SimpleNamespace(value=text))
+        self.thread.append(SimpleNamespace(id=f"msg_{len(self.thread)}", role=role, content=[block]))
+
+    async def list(self, thread_id: str, *, order: str, limit: int, after: str | None = None):
+        self.calls.append({"after": after, "limit": limit})
+        start = 0 if after is None else next(i for i, m in enumerate(self.thread) if m.id == after) + 1
+        data = self.thread[start : start + limit]
+        return SimpleNamespace(data=data, has_more=start + limit < len(self.thread))
+
+
+def _client(messages: _FakeMessages) -> SimpleNamespace:
+    return SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(messages=messages)))
+
+
+@pytest.mark.asyncio
+async def test_sync_paginates_then_fetches_only_new(monkeypatch) -> None:
+    monkeypatch.setattr(thread_mirror, "PAGE_SIZE", 2)
+    api = _FakeMessages()
+    for i in range(5):
+        api.add("user", f"message {i}")
+    mirror = ThreadMirror("thread_1")
+
+    assert await mirror.sync(_client(api)) == 5
+    assert [c["after"] for c in api.calls] == [None, "msg_1", "msg_3"]
+    assert [m["content"] for m in mirror.messages] == [f"message {i}" for i in range(5)]
+
+    api.calls.clear()
+    api.add("assistant", "reply")
+    records = await mirror.fetch(_client(api))
+
+    assert api.calls == [{"after": "msg_4", "limit": 2}]
+    assert records[-1] == {"id": "msg_5", "role": "assistant", "content": "reply"}
+
+
+@pytest.mark.asyncio
+async def test_collect_context_uses_thread_mirror(monkeypatch) -> None:
+    thread_mirror.clear_thread_mirrors()
+    api = _FakeMessages()
+    api.add("user", "My name is Alice, 29 years old")
+    api.add("assistant", "Thanks Alice, what happened?")
+    api.add("user", 'When I spoke at work I thought "everyone thinks I am stupid" and felt shame 8/10 because it hurts.')
+    monkeypatch.setattr(collect, "get_openai_client", lambda: _client(api))
+
+    first = await collect.collect_context(thread_id="thread_1")
+    second = await collect.collect_context(thread_id="thread_1")
+
+    assert first == second
+    assert first["goal_reached"] is True
+    assert first["intake_data"]["name"] == "Alice"
+    assert [c["after"] for c in api.calls] == [None, "msg_2"]
+    thread_mirror.clear_thread_mirrors()
+
+
+def test_mirrors_are_bounded_lru() -> None:
+    thread_mirror.clear_thread_mirrors()
+    a = get_thread_mirror("a", max_threads=2)
+    get_thread_mirror("b", max_threads=2)
+    assert get_thread_mirror("a", max_threads=2) is a
+    get_thread_mirror("c", max_threads=2)
+
+    assert set(thread_mirror._mirrors) == {"a", "c"}
+    thread_mirror.clear_thread_mirrors()
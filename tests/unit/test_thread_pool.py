@@ -0,0 +1,76 @@
+"""Warm pool of pre-created OpenAI threads."""
+
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from app.assistants import thread_pool
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.assistants.thread_pool import ThreadPool
+
+
+class _FakeThreads:
+    def __init__(self) -> None:
+        self._ids = itertools.count()
+        self.created: list[str] = []
+        self.deleted: list[str] = []
+
+    async def create(self):
+        thread_id = f"thread_{next(self._ids)}"
+        self.created.append(thread_id)
+        return SimpleNamespace(id=thread_id)
+
+    async def delete(self, thread_id: str) -> None:
+        self.deleted.append(thread_id)
+
+
+def _client(threads: _FakeThreads) -> SimpleNamespace:
+    return SimpleNamespace(beta=SimpleNamespace(threads=threads))
+
+
+@pytest.mark.asyncio
+async def test_take_hits_pool_and_background_refills() -> None:
+    threads = _FakeThreads()
+    pool = ThreadPool(_client(threads), size=2)
+    assert pool.take() is None  # cold pool: caller creates synchronously
+
+    pool.start()
+    await asyncio.sleep(0.01)
+    assert pool.available == 2
+
+    assert pool.take() == "thread_0"
+    await asyncio.sleep(0.01)
+    assert pool.available == 2
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 1
+
+    await pool.close()
+    assert sorted(threads.deleted) == ["thread_1", "thread_2"]
+
+
+@pytest.mark.asyncio
+async def test_expired_threads_are_skipped_and_deleted() -> None:
+    threads = _FakeThreads()
+    pool = ThreadPool(_client(threads), size=1, ttl_seconds=0.0)
+    await pool.fill()
+
+    assert pool.take() is None
+    await pool.fill()
+
+    assert threads.deleted == ["thread_0"]
+    assert pool.available == 1
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_takes_pooled_thread(monkeypatch) -> None:
+    threads = _FakeThreads()
+    pool = ThreadPool(_client(threads), size=1)
+    await pool.fill()
+    monkeypatch.setattr(thread_pool, "_pool", pool)
+
+    orchestrator = OrchestratorAssistant(use_stubs=True, openai_client=_client(threads))
+    assert await orchestrator.create_thread() == "thread_0"
+    # Pool drained (no refill task running): falls back to creating one.
+    assert await orchestrator.create_thread() == "thread_1"
+    assert threads.created == ["thread_0", "thread_1"]
@@ -0,0 +1,207 @@
+"""Token counting, per-phase budgets and input trimming."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.assistants import tokens
+from app.assistants.chat_backend import build_messages
+from app.assistants.functions.analyse import analyse_and_reframe
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.assistants.state import Phase
+
+
+@pytest.fixture(autouse=True)
+def _estimated_tokens(monkeypatch):
+    # Deterministic counts whether or not the tiktoken BPE file is cached.
+    monkeypatch.setattr(tokens, "get_encoding", lambda model=tokens.DEFAULT_MODEL: None)
+
+
+def test_budgets_come_from_settings_with_default_fallback(monkeypatch) -> None:
+    tokens._phase_budgets.cache_clear()
+    monkeypatch.setenv(
+        "TOKEN_BUDGETS", '{"intake": {"max_input_tokens": 50, "max_output_tokens": 20, "last_messages": 4}}'
+    )
+    try:
+        assert tokens.budget_for("intake") == tokens.PhaseBudget(50, 20, 4)
+        assert tokens.budget_for("unknown") == tokens.budget_for("default")
+        assert tokens.budget_for("intake").truncation_strategy() == {"type": "last_messages", "last_messages": 4}
+    finally:
+        tokens._phase_budgets.cache_clear()
+
+
+
+def test_partial_override_through_settings_keeps_other_budgets(monkeypatch) -> None:
+    from app.config.base import Settings
+
+    # Build real instances: the singleton __new__ hands back its private-attribute
+    # placeholder under pydantic 2, which would send us down the fallback branch.
+    monkeypatch.setattr(Settings, "__new__", lambda cls, *args, **kwargs: object.__new__(cls))
+    for name in ("GOOGLE_API_KEY", "LANGFUSE_HOST", "LANGFUSE_PUBLIC_KEY", "LANGFUSE_SECRET_KEY"):
+        monkeypatch.setenv(name, "set")
+    monkeypatch.setenv("TOKEN_BUDGETS", '{"intake": {"max_output_tokens": 120}, "reframe": {"last_messages": 6}}')
+    defaults = Settings.model_fields["token_budgets"].default
+    tokens._phase_budgets.cache_clear()
+    try:
+        # Settings builds, so this is the path a fully configured deployment takes.
+        assert Settings().token_budgets == {"intake": {"max_output_tokens": 120}, "reframe": {"last_messages": 6}}
+        assert tokens.budget_for("intake") == tokens.PhaseBudget(**{**defaults["intake"], "max_output_tokens": 120})
+        assert tokens.budget_for("reframe").last_messages == 6
+        assert tokens.budget_for("pdf_offer") == tokens.PhaseBudget(**defaults["pdf_offer"])
+        assert tokens.budget_for("unknown") == tokens.PhaseBudget(**defaults["default"])
+    finally:
+        tokens._phase_budgets.cache_clear()
+
+
+def test_fit_messages_keeps_system_and_newest_turns() -> None:
+    messages = [{"role": "system", "content": "Be kind."}]
+    for i in range(20):
+        messages.append({"role": "user", "content": f"Turn {i}. " + "detail " * 20})
+        messages.append({"role": "assistant", "content": "ok " * 20})
+
+    fitted = tokens.fit_messages(messages, 300)
+
+    assert tokens.count_message_tokens(fitted) <= 300
+    assert fitted[0] == messages[0]
+    assert fitted[-1] == messages[-1]
+    assert fitted[1]["role"] == "system" and "Turn 0" in fitted[1]["content"]
+    assert len(fitted) < len(messages)
+
+
+def test_fit_messages_is_identity_within_budget() -> None:
+    messages = [{"role": "user", "content": "hola"}, {"role": "assistant", "content": "hola"}]
+    assert tokens.fit_messages(messages, 1000) == messages
+
+
+
+def test_tool_rounds_and_tool_definitions_are_counted() -> None:
+    arguments = json.dumps({"reason": "me cuesta hablar en público " * 20})
+    function = {"name": "collect_context", "arguments": arguments}
+    call = {"role": "assistant", "content": None, "tool_calls": [{"id": "c1", "type": "function", "function": function}]}
+
+    assert tokens.count_message_tokens([call]) > tokens.count_message_tokens([{"role": "assistant", "content": None}])
+    assert tokens.count_message_tokens([call]) >= tokens.count_tokens(arguments)
+    tools = OrchestratorAssistant(use_stubs=True).get_tools()
+    assert tokens.count_tool_tokens(tools) > 0
+    assert tokens.count_tool_tokens([]) == 0
+
+    transcript = [{"role": "user", "content": "hola " * 40}, call, {"role": "user", "content": "y ahora?"}]
+    budget = tokens.PhaseBudget(tokens.count_tool_tokens(tools) + 200, 50, 10)
+    messages = build_messages("Be kind.", transcript, budget, tools)
+
+    assert tokens.count_message_tokens(messages) + tokens.count_tool_tokens(tools) <= budget.max_input_tokens
+
+
+def test_fit_json_shortens_longest_strings() -> None:
+    intake = {"name": "Ana", "reason": "x" * 4000, "emotion_data": {"emotion": "shame", "intensity": 8}}
+
+    text = tokens.fit_json(intake, 200)
+
+    assert tokens.count_tokens(text) <= 200
+    assert '"name": "Ana"' in text and '"intensity": 8' in text
+
+
+class _FakeCompletions:
+    def __init__(self) -> None:
+        self.kwargs: dict = {}
+
+    async def create(self, **kwargs):
+        self.kwargs = kwargs
+        message = SimpleNamespace(content='{"balanced_thought": "b", "micro_action": "m"}')
+        usage = SimpleNamespace(prompt_tokens=123, completion_tokens=7)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.mark.asyncio
+async def test_analyse_uses_phase_budget(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    completions = _FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    result = await analyse_and_reframe({"reason": "y" * 40000}, client=client)
+
+    budget = tokens.budget_for("analyst_qa")
+    assert result["balanced_thought"] == "b"
+    assert completions.kwargs["max_tokens"] == budget.max_output_tokens
+    assert tokens.count_message_tokens(completions.kwargs["messages"]) <= budget.max_input_tokens
+
+
+@pytest.mark.asyncio
+async def test_assistant_run_sets_truncation_strategy() -> None:
+    calls: dict = {}
+
+    async def create_run(**kwargs):
+        calls.update(kwargs)
+        return SimpleNamespace(status="failed", usage=None)
+
+    async def create_message(**kwargs):
+        return None
+
+    threads = SimpleNamespace(
+        runs=SimpleNamespace(create=create_run),
+        messages=SimpleNamespace(create=create_message),
+    )
+    client = SimpleNamespace(beta=SimpleNamespace(threads=threads))
+    orchestrator = OrchestratorAssistant(use_stubs=True, openai_client=client)
+    orchestrator.assistant_id, orchestrator.thread_id = "asst_1", "thread_1"
+    orchestrator.current_phase = Phase.S3_ANALYST_QA
+
+    await orchestrator.run_assistant("hola")
+
+    budget = tokens.budget_for("analyst_qa")
+    assert calls["max_prompt_tokens"] == budget.max_input_tokens
+    assert calls["max_completion_tokens"] == budget.max_output_tokens
+    assert calls["truncation_strategy"] == {"type": "last_messages", "last_messages": budget.last_messages}
+
+
+def _incomplete_client(reason: str, texts: list[str]) -> tuple[SimpleNamespace, dict]:
+    listed: dict = {}
+
+    async def create_run(**kwargs):
+        return SimpleNamespace(
+            id="run_1", status="incomplete", usage=None, incomplete_details=SimpleNamespace(reason=reason)
+        )
+
+    async def create_message(**kwargs):
+        return None
+
+    async def list_messages(**kwargs):
+        listed.update(kwargs)
+        content = [SimpleNamespace(text=SimpleNamespace(value=t)) for t in texts]
+        return SimpleNamespace(data=[SimpleNamespace(content=content)] if content else [])
+
+    threads = SimpleNamespace(
+        runs=SimpleNamespace(create=create_run),
+        messages=SimpleNamespace(create=create_message, list=list_messages),
+    )
+    return SimpleNamespace(beta=SimpleNamespace(threads=threads)), listed
+
+
+@pytest.mark.asyncio
+async def test_incomplete_run_returns_the_partial_reply() -> None:
+    client, listed = _incomplete_client("max_completion_tokens", ["Entiendo, Ana. Lo que ", "describes"])
+    orchestrator = OrchestratorAssistant(use_stubs=True, openai_client=client)
+    orchestrator.assistant_id, orchestrator.thread_id = "asst_1", "thread_1"
+
+    result = await orchestrator.run_assistant("hola")
+
+    assert result == {
+        "status": "completed",
+        "message": "Entiendo, Ana. Lo que describes",
+        "incomplete_reason": "max_completion_tokens",
+    }
+    assert listed["run_id"] == "run_1"
+
+
+@pytest.mark.asyncio
+async def test_incomplete_run_without_a_reply_is_an_error() -> None:
+    client, _ = _incomplete_client("max_prompt_tokens", [])
+    orchestrator = OrchestratorAssistant(use_stubs=True, openai_client=client)
+    orchestrator.assistant_id, orchestrator.thread_id = "asst_1", "thread_1"
+
+    result = await orchestrator.run_assistant("hola")
+
+    assert result["status"] == "incomplete"
+    assert result["incomplete_reason"] == "max_prompt_tokens"
+    assert "error" in result
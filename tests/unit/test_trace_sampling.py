@@ -0,0 +1,67 @@
+"""Tail sampling: slow, errored and crisis traces are kept whole."""
+
+import time
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import Status, StatusCode, set_span_in_context
+import pytest
+
+from app.services.tracing.sampling import TailSamplingProcessor
+
+
+@pytest.fixture
+def traced():
+    exporter = InMemorySpanExporter()
+    sampler = TailSamplingProcessor([SimpleSpanProcessor(exporter)], sample_rate=0.0, slow_ms=50, max_spans=8)
+    provider = TracerProvider()
+    provider.add_span_processor(sampler)
+    yield provider.get_tracer("test"), sampler, exporter
+    provider.shutdown()
+
+
+def _names(exporter) -> list[str]:
+    return sorted(s.name for s in exporter.get_finished_spans())
+
+
+def test_fast_turns_are_dropped_and_kept_reasons_export_whole_trace(traced) -> None:
+    tracer, sampler, exporter = traced
+
+    with tracer.start_as_current_span("ws.turn"), tracer.start_as_current_span("orchestrator.phase"):
+        pass
+    assert exporter.get_finished_spans() == ()
+
+    with tracer.start_as_current_span("ws.turn"), tracer.start_as_current_span("tool.safe_complete"):
+        pass
+    assert _names(exporter) == ["tool.safe_complete", "ws.turn"]
+    exporter.clear()
+
+    with tracer.start_as_current_span("ws.turn"), tracer.start_as_current_span("openai.runs.create") as call:
+        call.set_status(Status(StatusCode.ERROR))
+    assert _names(exporter) == ["openai.runs.create", "ws.turn"]
+    exporter.clear()
+
+    with tracer.start_as_current_span("ws.turn"):
+        time.sleep(0.06)
+    assert _names(exporter) == ["ws.turn"]
+    assert sampler.stats() == {"traces": 0, "spans": 0, "bytes": 0}
+
+
+def test_buffer_is_bounded_by_evicting_oldest_trace(traced) -> None:
+    tracer, sampler, exporter = traced
+    old = tracer.start_span("old.turn", context=Context())
+    new = tracer.start_span("new.turn", context=Context())
+
+    for root, count in ((old, 5), (new, 5)):
+        for _ in range(count):
+            tracer.start_span("child", context=set_span_in_context(root)).end()
+    assert sampler.buffered_spans == 5  # the old trace's children were evicted
+    assert sampler.stats()["traces"] == 1
+
+    new.set_status(Status(StatusCode.ERROR))
+    new.end()
+    old.end()
+    assert _names(exporter) == ["child"] * 5 + ["new.turn"]
+    assert sampler.buffered_bytes == 0
@@ -0,0 +1,62 @@
+"""OpenTelemetry spans for turns, phases, tools and upstream calls."""
+
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.assistants.functions.analyse import analyse_and_reframe
+from app.services.tracing.otel import memory_exporter, span
+
+
+@pytest.fixture
+def spans():
+    exporter = memory_exporter()
+    exporter.clear()
+    yield exporter
+    exporter.clear()
+
+
+def test_websocket_turn_has_phase_and_tool_children(spans, monkeypatch) -> None:
+    import app.main as main
+
+    monkeypatch.setenv("SESSION_STORE", "memory")
+    with TestClient(main.app) as client, client.websocket_connect("/chat/traced") as ws:
+        for text in ("Hola", "Me llamo Ana, tengo 28 años y me cuesta hablar en público"):
+            ws.send_json({"type": "user_msg", "data": {"message": text}})
+            ws.receive_json()
+            ws.receive_json()
+
+    finished = spans.get_finished_spans()
+    _, second = [s for s in finished if s.name == "ws.turn"]
+    assert second.attributes["session.id"] == "traced"
+    assert (second.attributes["phase.start"], second.attributes["phase.end"]) == ("intake", "pdf_offer")
+
+    children = [s for s in finished if s.parent is not None and s.parent.span_id == second.context.span_id]
+    phases = [s for s in children if s.name == "orchestrator.phase"]
+    assert next(s.attributes["phase"] for s in phases) == "intake"
+    assert phases[-1].attributes["phase.next"] == "pdf_offer"
+
+    tools = {s.attributes["tool.name"] for s in children if s.name.startswith("tool.")}
+    assert tools >= {"collect_context", "analyse_and_reframe"}
+
+
+@pytest.mark.asyncio
+async def test_openai_call_span_has_latency_and_tokens(spans, monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    async def create(**kwargs):
+        message = SimpleNamespace(content='{"balanced_thought": "b", "micro_action": "m"}')
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    with span("tool.analyse_and_reframe"):
+        await analyse_and_reframe({"reason": "I think everyone hates me"}, client=client)
+
+    (call,) = [s for s in spans.get_finished_spans() if s.name == "openai.chat.completions"]
+    assert call.attributes["upstream.system"] == "openai"
+    assert call.attributes["upstream.latency_ms"] >= 0
+    assert call.attributes["llm.token_count.prompt"] == 120
+    assert call.attributes["llm.token_count.completion"] == 30
+    assert call.attributes["llm.token_count.total"] == 150
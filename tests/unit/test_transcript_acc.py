@@ -4,7 +4,7 @@ from google.adk.agents.callback_context import CallbackContext  # type: ignore
 from google.adk.models.llm_response import LlmResponse  # type: ignore
 from google.genai.types import Content, Part  # type: ignore
 
-from app.callbacks.transcript_acc import TranscriptAccumulator
+from app.callbacks.transcript_acc import TranscriptAccumulator, read_transcript
 
 
 def test_transcript_accumulator_appends_user_and_assistant_messages() -> None:
@@ -64,3 +64,55 @@ def test_transcript_accumulator_no_llm_response() -> None:
     assert ctx.state["conv_raw"] == [
         {"role": "user", "text": "Hello"},
     ]
+
+
+def _run_turns(callback: TranscriptAccumulator, state: dict, turns: int) -> None:
+    for i in range(turns):
+        ctx = MagicMock(spec=CallbackContext)
+        ctx.state = state
+        ctx.user_content = Content(parts=[Part(text=f"user {i}")])
+        callback(
+            callback_context=ctx,
+            llm_response=LlmResponse(content=Content(parts=[Part(text=f"assistant {i}")])),
+        )
+
+
+def test_transcript_accumulator_writes_only_new_turn_after_first() -> None:
+    callback = TranscriptAccumulator(compact_every=4)
+    state: dict = {}
+    _run_turns(callback, state, 1)
+    snapshot = state["conv_raw"]
+
+    _run_turns(callback, state, 1)
+
+    assert state["conv_raw"] is snapshot
+    assert state["conv_delta_1"] == [
+        {"role": "user", "text": "user 0"},
+        {"role": "assistant", "text": "assistant 0"},
+    ]
+    assert state["conv_seq"] == 2
+
+
+def test_read_transcript_across_compactions() -> None:
+    callback = TranscriptAccumulator(compact_every=4)
+    state: dict = {}
+
+    _run_turns(callback, state, 11)
+
+    expected = []
+    for i in range(11):
+        expected += [
+            {"role": "user", "text": f"user {i}"},
+            {"role": "assistant", "text": f"assistant {i}"},
+        ]
+    assert read_transcript(state, compact_every=4) == expected
+    # Turn 0 writes the snapshot; turns 5 and 10 fold four pending deltas into it.
+    assert len(state["conv_raw"]) == 22
+    assert state["conv_base"] == 11
+    assert state["conv_seq"] == 11
+
+
+def test_read_transcript_legacy_state() -> None:
+    state = {"conv_raw": [{"role": "user", "text": "Initial message"}]}
+
+    assert read_transcript(state) == [{"role": "user", "text": "Initial message"}]
@@ -0,0 +1,51 @@
+"""Per-session token usage and cost ledger."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.assistants import tokens
+from app.assistants.functions.analyse import analyse_and_reframe
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.assistants.usage import UsageLedger, charge, estimate_cost
+
+
+@pytest.mark.asyncio
+async def test_usage_is_charged_per_phase_and_tool(monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+    async def create(**kwargs):
+        message = SimpleNamespace(content='{"balanced_thought": "b", "micro_action": "m"}')
+        usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    ledger = UsageLedger()
+    with charge(ledger, "analyse_and_reframe"):
+        await analyse_and_reframe({"reason": "I think everyone hates me"}, client=client)
+    with charge(ledger):
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=100)
+        tokens.log_call("assistant_run", phase="intake", prompt_tokens=1, usage=usage)
+    # Outside any ledger: metrics only
+    tokens.log_call("assistant_run", phase="intake", prompt_tokens=1, usage=usage)
+
+    totals = ledger.to_dict()
+    assert totals["total"]["prompt_tokens"] == 1120
+    assert totals["total"]["completion_tokens"] == 130
+    assert totals["total"]["calls"] == 2
+    assert totals["total"]["cost_usd"] == pytest.approx(estimate_cost("gpt-4o-mini", 1120, 130))
+    assert totals["by_phase"]["analyst_qa"]["prompt_tokens"] == 120
+    assert totals["by_phase"]["intake"]["prompt_tokens"] == 1000
+    assert set(totals["by_tool"]) == {"analyse_and_reframe", "orchestrator"}
+
+
+def test_usage_survives_snapshot_and_restore() -> None:
+    orchestrator = OrchestratorAssistant(use_stubs=True, openai_client=SimpleNamespace())
+    orchestrator.usage.record(
+        model="gpt-4o-mini", phase="intake", tool="orchestrator", prompt_tokens=500, completion_tokens=50
+    )
+
+    restored = OrchestratorAssistant.restore(orchestrator.snapshot(), use_stubs=True, openai_client=SimpleNamespace())
+
+    assert restored.usage.to_dict() == orchestrator.usage.to_dict()
+    assert estimate_cost("unknown-model", 10, 10) == 0.0
@@ -0,0 +1,58 @@
+"""Unit tests for the cold-start warm-up runner and /ready endpoint."""
+
+from fastapi.testclient import TestClient
+import pytest
+
+from app.warmup import WarmupRunner, warm_pdf
+
+
+async def _ok() -> None:
+    return None
+
+
+async def _skip() -> str:
+    return "offline mode"
+
+
+async def _boom() -> None:
+    raise RuntimeError("upstream unavailable")
+
+
+@pytest.mark.asyncio
+async def test_runner_records_status_and_duration():
+    runner = WarmupRunner({"ok": _ok, "skip": _skip, "boom": _boom})
+    assert runner.ready is False
+
+    await runner.run()
+    report = runner.report()
+
+    assert report["ready"] is True
+    assert report["steps"]["ok"]["status"] == "ok"
+    assert report["steps"]["skip"]["status"] == "skipped"
+    assert report["steps"]["skip"]["detail"] == "offline mode"
+    assert report["steps"]["boom"]["status"] == "failed"
+    assert "upstream unavailable" in report["steps"]["boom"]["detail"]
+    assert all(step["duration_ms"] is not None for step in report["steps"].values())
+
+
+@pytest.mark.asyncio
+async def test_pdf_warmup_renders():
+    assert await warm_pdf() is None
+
+
+def test_ready_endpoint_reflects_warmup(monkeypatch):
+    import app.main as main
+
+    runner = WarmupRunner({"ok": _ok})
+    monkeypatch.setattr(main, "warmup", runner)
+    client = TestClient(main.app)
+
+    assert client.get("/ready").status_code == 503
+    async def _wait_for_warmup() -> None:
+        await main._warmup_task
+
+    with client:  # runs startup → warm-up task
+        client.portal.call(_wait_for_warmup)
+        response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["steps"]["ok"]["status"] == "ok"
@@ -0,0 +1,184 @@
+"""Write-behind batching of session event-log writes."""
+
+import asyncio
+
+import pytest
+
+from app.assistants.orchestrator_assistant import OrchestratorAssistant
+from app.services.persistence.codec import decode
+from app.services.persistence.event_log import (
+    SessionJournal,
+    SessionWrite,
+    SQLiteEventLog,
+    apply_event,
+    merge_events,
+    resume,
+)
+from app.services.persistence.write_behind import ThreadedEventLog, WriteBehindEventLog, aresume
+
+
+class FlakyBackend(ThreadedEventLog):
+    """Fails the first ``failures`` batches, records every attempted batch."""
+
+    def __init__(self, log, failures: int = 0) -> None:
+        super().__init__(log)
+        self.failures = failures
+        self.batches: list[list] = []
+
+    async def write_batch(self, writes):
+        self.batches.append(writes)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        await super().write_batch(writes)
+
+
+@pytest.fixture
+def sqlite_log(tmp_path):
+    return SQLiteEventLog(str(tmp_path / "sessions.sqlite3"))
+
+
+def test_merge_events_matches_sequential_replay() -> None:
+    base = {
+        "phase": "start",
+        "transcript": [["user", "a"], ["assistant", "b"]],
+        "tool_results": {"x": 1},
+    }
+    first = {"phase": "intake", "messages": [2, [["user", "c"]]], "tool_results": {"y": 2}}
+    second = {"messages": [3, [["assistant", "d"]]], "tool_results_reset": True, "tool_results": {"z": 3}}
+
+    sequential = {**base, "transcript": list(base["transcript"]), "tool_results": dict(base["tool_results"])}
+    apply_event(sequential, first)
+    apply_event(sequential, second)
+    merged = {**base, "transcript": list(base["transcript"]), "tool_results": dict(base["tool_results"])}
+    apply_event(merged, merge_events(first, second))
+
+    assert merged == sequential
+    assert merged["transcript"][-2:] == [["user", "c"], ["assistant", "d"]]
+    assert merged["tool_results"] == {"z": 3}
+
+
+@pytest.mark.asyncio
+async def test_rapid_updates_coalesce_into_one_batch(sqlite_log) -> None:
+    backend = FlakyBackend(sqlite_log)
+    log = WriteBehindEventLog(backend, max_delay=60)
+    orchestrators = [OrchestratorAssistant(use_stubs=True) for _ in range(3)]
+    journals = [SessionJournal(log, f"s{i}") for i in range(3)]
+
+    for orchestrator, journal in zip(orchestrators, journals, strict=True):
+        journal.record(orchestrator)
+        for n in range(5):
+            orchestrator.session_state.add_user_message(f"mensaje {n}")
+            journal.record(orchestrator)
+    assert log.pending == 3
+
+    await log.close()
+
+    assert len(backend.batches) == 1
+    # One snapshot plus one merged event per session instead of six writes.
+    assert [len(w.events) for w in backend.batches[0]] == [1, 1, 1]
+    assert decode(backend.batches[0][0].events[0][1])["messages"][0] == 0
+    reopened = SQLiteEventLog(sqlite_log.path)
+    resumed, _ = resume(reopened, "s1", use_stubs=True)
+    assert len(resumed.session_state.transcript) == 5
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_flusher_bounds_staleness_and_resume_reads_through(sqlite_log) -> None:
+    log = WriteBehindEventLog(ThreadedEventLog(sqlite_log), max_delay=0.01)
+    await log.start()
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    journal = SessionJournal(log, "s1")
+    orchestrator.session_state.add_user_message("hola")
+    journal.record(orchestrator)
+
+    for _ in range(100):
+        if log.pending == 0 and log.flushes:
+            break
+        await asyncio.sleep(0.01)
+    assert log.flushes >= 1
+    assert sqlite_log.load("s1") is not None
+
+    orchestrator.session_state.add_user_message("sigo aquí")
+    journal.record(orchestrator)
+    resumed, _ = await aresume(log, "s1", use_stubs=True)
+    assert list(resumed.session_state.transcript.texts()) == ["hola", "sigo aquí"]
+    await log.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_requeued_under_newer_writes(sqlite_log) -> None:
+    backend = FlakyBackend(sqlite_log, failures=1)
+    log = WriteBehindEventLog(backend, max_delay=60)
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    journal = SessionJournal(log, "s1")
+    journal.record(orchestrator)
+    orchestrator.session_state.add_user_message("uno")
+    journal.record(orchestrator)
+
+    with pytest.raises(ConnectionError):
+        await log.flush()
+    assert log.pending == 1
+
+    orchestrator.session_state.add_user_message("dos")
+    journal.record(orchestrator)
+    await log.flush()
+
+    resumed, _ = await aresume(log, "s1", use_stubs=True)
+    assert list(resumed.session_state.transcript.texts()) == ["uno", "dos"]
+    await log.close()
+
+
+class SlowBackend(ThreadedEventLog):
+    """Holds every batch until ``release`` is set."""
+
+    def __init__(self, log) -> None:
+        super().__init__(log)
+        self.entered = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def write_batch(self, writes):
+        self.entered.set()
+        await self.release.wait()
+        await super().write_batch(writes)
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_the_flush_in_flight(sqlite_log) -> None:
+    backend = SlowBackend(sqlite_log)
+    log = WriteBehindEventLog(backend, max_delay=0.001)
+    await log.start()
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    orchestrator.session_state.add_user_message("hola")
+    SessionJournal(log, "s1").record(orchestrator)
+    await backend.entered.wait()
+
+    closing = asyncio.create_task(log.close())
+    await asyncio.sleep(0.01)
+    backend.release.set()
+    await closing
+
+    reopened = SQLiteEventLog(sqlite_log.path)
+    assert reopened.load("s1") is not None
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_retrying_a_committed_batch_is_harmless(sqlite_log) -> None:
+    log = WriteBehindEventLog(ThreadedEventLog(sqlite_log), max_delay=60)
+    orchestrator = OrchestratorAssistant(use_stubs=True)
+    journal = SessionJournal(log, "s1")
+    journal.record(orchestrator)
+    orchestrator.session_state.add_user_message("uno")
+    journal.record(orchestrator)
+    stored = sqlite_log.load("s1")
+    await log.flush()
+
+    # The same rows again, as after a flush that committed but reported an error
+    sqlite_log.write_batch([SessionWrite("s1", events=list(sqlite_log.load("s1").events))])
+
+    assert stored is None
+    resumed, _ = await aresume(log, "s1", use_stubs=True)
+    assert list(resumed.session_state.transcript.texts()) == ["uno"]
+    await log.close()